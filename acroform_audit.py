@@ -1,18 +1,19 @@
-from PyPDF2 import PdfReader
+from utils.parsed_pdf import as_parsed_pdf
 
-def list_form_fields(file_path: str) -> list:
+def list_form_fields(file_path) -> list:
     """
     Returns a list of all AcroForm field names.
+    file_path may be a path or a shared ParsedPdf context.
     """
-    reader = PdfReader(file_path)
-    root = reader.trailer.get("/Root", {})
+    pdf = as_parsed_pdf(file_path)
+    root = pdf.root
     if "/AcroForm" not in root:
         return []
-    acro = root["/AcroForm"]
+    acro = pdf.resolve(root["/AcroForm"])
     names = []
-    for fld in acro.get("/Fields", []):
+    for fld in pdf.resolve(acro.get("/Fields", [])):
         try:
-            obj = fld.get_object()
+            obj = pdf.resolve(fld)
             names.append(obj.get("/T"))
         except Exception:
             continue
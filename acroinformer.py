@@ -0,0 +1,74 @@
+# acroinformer.py
+"""
+Headless command-line entry point.
+
+    python acroinformer.py batch <dir> --output results.jsonl --workers 8
+"""
+
+import argparse
+import json
+import sys
+
+from report_logger import configure_logging
+from utils.result_cache import DEFAULT_CACHE_PATH
+
+
+def _cmd_batch(args) -> int:
+    from batch_runner import run_batch
+
+    summary = run_batch(
+        args.directory,
+        args.output,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        timeout=args.timeout or None,
+        static_mode=args.static,
+        cache_path=None if args.no_cache else args.cache,
+        summaries=args.summaries,
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def _cmd_cache_stats(args) -> int:
+    from utils.result_cache import ResultCache
+
+    cache = ResultCache(args.cache)
+    print(json.dumps(cache.stats(), indent=2))
+    cache.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="acroinformer", description="PDF metadata & tamper audit")
+    parser.add_argument("--log-level", default="INFO")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="Audit every PDF under a directory")
+    batch.add_argument("directory")
+    batch.add_argument("-o", "--output", default="acroinformer_results.jsonl",
+                       help="JSON Lines file, one record per PDF, written as files complete")
+    batch.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    batch.add_argument("--max-in-flight", type=int, default=None, help="Files submitted at once (default: 2x workers)")
+    batch.add_argument("--timeout", type=float, default=120.0, help="Per-file timeout in seconds (0 disables)")
+    batch.add_argument("--static", action="store_true", help="Static decoding (no fitz text pass)")
+    batch.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Result cache database")
+    batch.add_argument("--no-cache", action="store_true", help="Always re-run the pipeline")
+    batch.add_argument("--summaries", choices=("auto", "always", "never"), default="auto",
+                       help="LLM summaries: only for documents the trigger flags (auto), for all, or none")
+    batch.set_defaults(func=_cmd_batch)
+
+    cache = sub.add_parser("cache-stats", help="Show result cache counters")
+    cache.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    cache.set_defaults(func=_cmd_cache_stats)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,77 +1,195 @@
 # affidavit_writer.py
 
-from reportlab.lib.pagesizes import LETTER
-from reportlab.pdfgen import canvas
+import io
+import os
 from datetime import datetime
 import socket
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
-def write_affidavit(output_path, metadata, filename, sha256, findings, analyst_title="Founder, Forensix, LLC"):
-    c = canvas.Canvas(output_path, pagesize=LETTER)
-    width, height = LETTER
-    margin = 50
-    y = height - margin
-
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(margin, y, "Forensic Document Affidavit")
-    y -= 30
-
-    c.setFont("Helvetica", 10)
-    c.drawString(margin, y, f"Date of Analysis: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-    y -= 15
-    c.drawString(margin, y, f"Analyzed File: {filename}")
-    y -= 15
-    c.drawString(margin, y, f"SHA-256: {sha256}")
-    y -= 15
-    c.drawString(margin, y, f"Hostname: {socket.gethostname()}")
-    y -= 25
-
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(margin, y, "Findings:")
-    y -= 15
-
-    c.setFont("Helvetica", 10)
-    for line in findings:
-        for subline in split_line(line, width - 2 * margin, c):
+CERT_TEXT = (
+    "I hereby certify that the analysis above was conducted using industry-standard forensic methods "
+    "to the best of my ability. All observations are based on technical evidence recovered from the provided file. "
+    "\n\nCertified by Forensix, LLC"
+)
+
+# Per-layout bound on cached word widths; findings carry hashes and ids
+# that never repeat, so the cache is reset rather than left to grow.
+MAX_CACHED_WORDS = 50000
+
+_layouts: Dict[Tuple[str, float], "TextLayout"] = {}
+
+
+class TextLayout:
+    """
+    Word-wrapping for one font and size. Each distinct word is measured
+    once and its width cached, so wrapping a paragraph is linear in its
+    word count instead of re-measuring the growing line for every word.
+    Use text_layout() to share instances across documents.
+    """
+
+    def __init__(self, font_name: str, font_size: float):
+        from reportlab.pdfbase import pdfmetrics
+
+        self.font_name = font_name
+        self.font_size = font_size
+        self._font = pdfmetrics.getFont(font_name)
+        self._widths: Dict[str, float] = {}
+        self.space_width = self.width(" ")
+
+    def width(self, word: str) -> float:
+        w = self._widths.get(word)
+        if w is None:
+            if len(self._widths) >= MAX_CACHED_WORDS:
+                self._widths.clear()
+            w = self._widths[word] = self._font.stringWidth(word, self.font_size)
+        return w
+
+    def wrap(self, text: str, max_width: float) -> List[str]:
+        """
+        Split text into lines narrower than max_width, breaking on whitespace.
+        """
+        lines = []
+        line: List[str] = []
+        line_width = 0.0
+        space = self.space_width
+        for word in text.split():
+            w = self.width(word)
+            # same test as measuring line + " " + word in one piece
+            if line_width + space + w < max_width:
+                line_width = line_width + space + w if line else w
+                line.append(word)
+            else:
+                lines.append(" ".join(line))
+                line = [word]
+                line_width = w
+        if line:
+            lines.append(" ".join(line))
+        return lines
+
+
+def text_layout(font_name: str, font_size: float) -> TextLayout:
+    """
+    Process-wide TextLayout for font_name at font_size.
+    """
+    key = (font_name, font_size)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = _layouts[key] = TextLayout(font_name, font_size)
+    return layout
+
+
+class _AffidavitTemplate:
+    # Everything that is the same for every affidavit of a run: page
+    # geometry, fonts, the wrapped certification text and the host name.
+    def __init__(self, analyst_title: str):
+        from reportlab.lib.pagesizes import LETTER
+
+        self.analyst_title = analyst_title
+        self.pagesize = LETTER
+        self.width, self.height = LETTER
+        self.margin = 50
+        self.text_width = self.width - 2 * self.margin
+        self.body = text_layout("Helvetica", 10)
+        self.hostname = socket.gethostname()
+        # the certification is set in the heading font, like its title
+        self.cert_lines = text_layout("Helvetica-Bold", 12).wrap(CERT_TEXT, self.text_width)
+
+    def render(self, output, metadata, filename, sha256, findings) -> None:
+        from reportlab.pdfgen import canvas
+
+        c = canvas.Canvas(output, pagesize=self.pagesize)
+        width, height = self.width, self.height
+        margin = self.margin
+        y = height - margin
+
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(margin, y, "Forensic Document Affidavit")
+        y -= 30
+
+        c.setFont("Helvetica", 10)
+        c.drawString(margin, y, f"Date of Analysis: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
+        y -= 15
+        c.drawString(margin, y, f"Analyzed File: {filename}")
+        y -= 15
+        c.drawString(margin, y, f"SHA-256: {sha256}")
+        y -= 15
+        c.drawString(margin, y, f"Hostname: {self.hostname}")
+        y -= 25
+
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(margin, y, "Findings:")
+        y -= 15
+
+        c.setFont("Helvetica", 10)
+        for line in findings:
+            for subline in self.body.wrap(line, self.text_width):
+                c.drawString(margin, y, subline)
+                y -= 12
+                if y < margin:
+                    c.showPage()
+                    y = height - margin
+
+        y -= 20
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(margin, y, "Certification:")
+        y -= 15
+
+        for subline in self.cert_lines:
             c.drawString(margin, y, subline)
             y -= 12
-            if y < margin:
-                c.showPage()
-                y = height - margin
-
-    y -= 20
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(margin, y, "Certification:")
-    y -= 15
-
-    cert_text = (
-        f"I hereby certify that the analysis above was conducted using industry-standard forensic methods "
-        f"to the best of my ability. All observations are based on technical evidence recovered from the provided file. "
-        f"\n\nCertified by Forensix, LLC"
-    )
-    for subline in split_line(cert_text, width - 2 * margin, c):
-        c.drawString(margin, y, subline)
-        y -= 12
-
-    y -= 30
-    c.drawString(margin, y, "Signature: ____________________________")
-    y -= 15
-    c.drawString(margin, y, f"Title: {analyst_title}")
-    y -= 15
-    c.drawString(margin, y, "Date: _________________________________")
-
-    c.showPage()
-    c.save()
+
+        y -= 30
+        c.drawString(margin, y, "Signature: ____________________________")
+        y -= 15
+        c.drawString(margin, y, f"Title: {self.analyst_title}")
+        y -= 15
+        c.drawString(margin, y, "Date: _________________________________")
+
+        c.showPage()
+        c.save()
+
+
+def write_affidavit(output_path, metadata, filename, sha256, findings, analyst_title="Founder, Forensix, LLC"):
+    # reportlab is only loaded when an affidavit is actually written
+    _AffidavitTemplate(analyst_title).render(output_path, metadata, filename, sha256, findings)
+
+
+def render_affidavits(
+    documents: Iterable[Dict[str, Any]],
+    analyst_title: str = "Founder, Forensix, LLC",
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Render one affidavit per document dict { filename, sha256, findings,
+    metadata? }, sharing the page template and word-width caches across
+    the whole batch.
+    Yields (filename, PDF bytes) in input order.
+    """
+    template = _AffidavitTemplate(analyst_title)
+    for doc in documents:
+        buf = io.BytesIO()
+        template.render(buf, doc.get("metadata", {}), doc["filename"], doc.get("sha256"), doc.get("findings", []))
+        yield doc["filename"], buf.getvalue()
+
+
+def write_affidavits(
+    documents: Iterable[Dict[str, Any]],
+    output_dir: str,
+    analyst_title: str = "Founder, Forensix, LLC",
+) -> List[str]:
+    """
+    render_affidavits() to <output_dir>/<filename stem>_affidavit.pdf.
+    Returns the written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    template = _AffidavitTemplate(analyst_title)
+    paths = []
+    for doc in documents:
+        stem = os.path.splitext(os.path.basename(doc["filename"]))[0]
+        path = os.path.join(output_dir, f"{stem}_affidavit.pdf")
+        template.render(path, doc.get("metadata", {}), doc["filename"], doc.get("sha256"), doc.get("findings", []))
+        paths.append(path)
+    return paths
+
 
 def split_line(text, max_width, canvas_obj):
-    words = text.split()
-    lines = []
-    line = ""
-    for word in words:
-        if canvas_obj.stringWidth(line + " " + word) < max_width:
-            line += " " + word if line else word
-        else:
-            lines.append(line)
-            line = word
-    if line:
-        lines.append(line)
-    return lines
\ No newline at end of file
+    return text_layout(canvas_obj._fontname, canvas_obj._fontsize).wrap(text, max_width)
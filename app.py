@@ -1,10 +1,11 @@
 import streamlit as st
 import base64
-from utils.decode_controller import decode_pdf
+from utils.decode_controller import decode_pdf_cached
+from utils.parsed_pdf import ParsedPdf
+from utils.result_cache import ResultCache
 from utils.yaml_exporter import export_yaml
 from utils.affidavit_writer import generate_affidavit_pdf
 from utils.zip_bundle import bundle_results
-import hashlib
 
 st.set_page_config(
     page_title="AcroInformer – PDF Metadata & Tamper Audit",
@@ -14,6 +15,12 @@ st.set_page_config(
 st.title("AcroInformer – PDF Metadata & Tamper Audit")
 st.markdown("Upload one or more PDF documents for forensic analysis. Output includes decoded entities, metadata, risk scores, YAML, and affidavit generation.")
 
+@st.cache_resource
+def get_result_cache():
+    return ResultCache()
+
+result_cache = get_result_cache()
+
 uploaded_files = st.file_uploader("Upload PDF(s)", type=["pdf"], accept_multiple_files=True)
 
 decoding_mode = st.radio("Decoding Mode", ["PyMuPDF (fitz)", "Static (no fitz)"])
@@ -23,9 +30,10 @@ results = []
 if uploaded_files:
     for uploaded_file in uploaded_files:
         st.subheader(f"Analysis: {uploaded_file.name}")
-        file_bytes = uploaded_file.read()
-        sha256 = hashlib.sha256(file_bytes).hexdigest()
-        result = decode_pdf(file_bytes, static_mode=static_mode)
+        # Analysers read the upload's own buffer; nothing is copied out of it.
+        with ParsedPdf.from_file(uploaded_file) as pdf:
+            sha256 = pdf.sha256
+            result = decode_pdf_cached(pdf, static_mode=static_mode, cache=result_cache)
 
         st.markdown(f"**SHA-256:** `{sha256}`")
         st.markdown(f"**Error:** {result.get('error', 'None')}")
@@ -61,6 +69,10 @@ if uploaded_files:
             "affidavit": affidavit_pdf
         })
 
+with st.sidebar:
+    st.markdown("### Result Cache")
+    st.json(result_cache.stats())
+
 if results:
     if st.button("Bundle All Results into ZIP"):
         zip_bytes = bundle_results(results)
@@ -0,0 +1,309 @@
+# batch_runner.py
+
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from utils.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Extra time the parent allows past the per-file timeout before it assumes
+# the worker is wedged inside native code and recycles the pool.
+HARD_TIMEOUT_GRACE = 10.0
+
+
+class FileTimeout(Exception):
+    pass
+
+
+def iter_pdf_paths(root: str, recursive: bool = True) -> Iterator[str]:
+    """
+    Lazily yield PDF paths under root (sorted per directory for stable runs).
+    """
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(".pdf"):
+                yield os.path.join(dirpath, name)
+        if not recursive:
+            break
+
+
+def _raise_timeout(signum, frame):
+    raise FileTimeout()
+
+
+_worker_caches: Dict[str, ResultCache] = {}
+
+
+def _worker_cache(cache_path: Optional[str]) -> Optional[ResultCache]:
+    # One connection per worker process, reused across files.
+    if not cache_path:
+        return None
+    if cache_path not in _worker_caches:
+        _worker_caches[cache_path] = ResultCache(cache_path)
+    return _worker_caches[cache_path]
+
+
+def analyze_file(
+    path: str,
+    static_mode: bool = False,
+    timeout: Optional[float] = None,
+    cache_path: Optional[str] = None,
+    summarize: str = "auto",
+    decode: Optional[Callable[..., Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Worker entry point: run decode_pdf on one file and never raise.
+    With cache_path set, results are served from / stored in a ResultCache.
+    summarize is passed through to decode_pdf.
+    decode replaces decode_pdf_cached (same keyword arguments).
+    Returns { path, status, elapsed, result?, error? } where status is
+    "ok", "error" or "timeout".
+    """
+    if decode is None:
+        from utils.decode_controller import decode_pdf_cached as decode
+    start = time.perf_counter()
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = decode(path, static_mode=static_mode, cache=_worker_cache(cache_path), summarize=summarize)
+        record = {"path": path, "status": "ok", "result": result}
+    except FileTimeout:
+        record = {"path": path, "status": "timeout", "error": f"exceeded {timeout}s"}
+    except Exception as e:
+        record = {"path": path, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+class _SummaryQueue:
+    """
+    LLM summaries for the flagged subset of a batch, run concurrently on an
+    event loop in a background thread while the pool keeps decoding.
+    Records come back through ready() in completion order.
+    """
+
+    def __init__(self, service, cache: Optional[ResultCache] = None):
+        import asyncio
+        self.service = service
+        self.cache = cache
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="summary-queue", daemon=True)
+        self._thread.start()
+        self._pending = []  # (record, concurrent future)
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        import asyncio
+        from utils.decode_controller import complete_summaries_async
+        future = asyncio.run_coroutine_threadsafe(
+            complete_summaries_async([record["result"]], self.service, self.cache), self._loop
+        )
+        self._pending.append((record, future))
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def ready(self, wait_all: bool = False) -> Iterator[Dict[str, Any]]:
+        still = []
+        for record, future in self._pending:
+            if wait_all or future.done():
+                try:
+                    future.result()
+                except Exception as e:
+                    record["result"].pop("cache_key", None)
+                    record["result"]["gpt_status"] = "error"
+                    record["result"]["gpt_summary"] = f"GPT summary failed: {e}"
+                yield record
+            else:
+                still.append((record, future))
+        self._pending = still
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def _new_pool(workers: int, max_tasks_per_child: Optional[int]) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=max_tasks_per_child)
+
+
+def _kill_pool(executor: ProcessPoolExecutor) -> None:
+    # ProcessPoolExecutor has no public way to stop a busy worker.
+    for proc in list((getattr(executor, "_processes", None) or {}).values()):
+        try:
+            proc.terminate()
+        except Exception:
+            logger.debug("Terminating worker %s failed", proc, exc_info=True)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batch(
+    root: str,
+    output_path: str,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    timeout: Optional[float] = 120.0,
+    static_mode: bool = False,
+    max_tasks_per_child: Optional[int] = 100,
+    cache_path: Optional[str] = None,
+    summaries: str = "auto",
+    decode: Optional[Callable[..., Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Analyse every PDF under root with decode_pdf in a process pool.
+
+    - At most max_in_flight files are submitted at any time (default 2x workers).
+    - Each file gets `timeout` seconds; a worker stuck past that is killed.
+    - A worker crash (e.g. a segfault in native PDF code) takes the pool down
+      with it. The files that were in flight are re-run one at a time on a
+      fresh pool, so only the file that actually crashes is recorded as
+      "crashed" and the run carries on.
+    - Each result is appended to output_path (JSON Lines) as soon as it completes.
+    - With cache_path set, previously analysed files (same SHA-256 and
+      pipeline fingerprint) are served from the ResultCache at that path.
+    - LLM summaries: with summaries="auto" workers only run the trigger gate;
+      the flagged files are summarised concurrently in this process by the
+      SummaryService (bounded, cached in the same ResultCache) and written
+      once their summary is in. "always"/"never" bypass the gate and run in
+      the workers like decode_pdf does.
+    - decode is handed to analyze_file in the workers, so it must be
+      picklable (a module-level function).
+
+    Returns run statistics: counts per status plus total and elapsed seconds,
+    gpt_<status> counts (done, skipped, error) and the cache counters when a
+    cache is in use.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    hard_timeout = timeout + HARD_TIMEOUT_GRACE if timeout else None
+
+    paths = iter_pdf_paths(root)
+    resubmit = deque()    # innocent bystanders of a pool recycle
+    quarantine = deque()  # files in flight when a worker crashed
+    stats = Counter()
+    started = time.perf_counter()
+
+    worker_summarize = "defer" if summaries == "auto" else summaries
+    summary_cache = ResultCache(cache_path) if cache_path and summaries == "auto" else None
+    summary_queue = None
+    if summaries == "auto":
+        from utils.summary_service import SummaryService, get_summary_service
+        summary_queue = _SummaryQueue(SummaryService(get_summary_service().backend, cache=summary_cache), summary_cache)
+
+    executor = _new_pool(workers, max_tasks_per_child)
+    in_flight = {}  # future -> (path, isolated, deadline once running)
+
+    with open(output_path, "w", encoding="utf-8") as out:
+
+        def write(record):
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            stats[record["status"]] += 1
+            stats["total"] += 1
+            gpt_status = (record.get("result") or {}).get("gpt_status")
+            if gpt_status:
+                stats[f"gpt_{gpt_status}"] += 1
+
+        def emit(record):
+            if summary_queue is not None and (record.get("result") or {}).get("gpt_status") == "pending":
+                summary_queue.submit(record)
+            else:
+                write(record)
+
+        try:
+            while True:
+                if quarantine:
+                    # Suspects run alone so a repeat crash names the culprit.
+                    if not in_flight:
+                        path = quarantine.popleft()
+                        future = executor.submit(analyze_file, path, static_mode, timeout, cache_path, worker_summarize, decode)
+                        in_flight[future] = (path, True, None)
+                else:
+                    while len(in_flight) < max_in_flight:
+                        path = resubmit.popleft() if resubmit else next(paths, None)
+                        if path is None:
+                            break
+                        future = executor.submit(analyze_file, path, static_mode, timeout, cache_path, worker_summarize, decode)
+                        in_flight[future] = (path, False, None)
+
+                if summary_queue is not None:
+                    for record in summary_queue.ready():
+                        write(record)
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, timeout=1.0, return_when=FIRST_COMPLETED)
+                pool_broken = False
+                for future in done:
+                    path, isolated, _ = in_flight.pop(future)
+                    try:
+                        emit(future.result())
+                    except BrokenProcessPool:
+                        pool_broken = True
+                        if isolated:
+                            emit({"path": path, "status": "crashed", "error": "worker process crashed", "elapsed": None})
+                        else:
+                            quarantine.append(path)
+                    except Exception as e:
+                        emit({"path": path, "status": "error", "error": f"{type(e).__name__}: {e}", "elapsed": None})
+
+                # The clock starts once the pool hands a file to a worker, so
+                # files waiting behind a slow one are not charged for it.
+                now = time.monotonic()
+                expired = []
+                for future, (path, isolated, deadline) in list(in_flight.items()):
+                    if not hard_timeout:
+                        break
+                    if deadline is None:
+                        if future.running():
+                            in_flight[future] = (path, isolated, now + hard_timeout)
+                    elif deadline < now:
+                        expired.append(future)
+                for future in expired:
+                    path, _, _ = in_flight.pop(future)
+                    emit({"path": path, "status": "timeout", "error": f"killed after {hard_timeout}s", "elapsed": None})
+
+                if pool_broken or expired:
+                    # Everything still in flight dies with the pool.
+                    for path, isolated, _ in in_flight.values():
+                        (quarantine if pool_broken else resubmit).append(path)
+                    in_flight.clear()
+                    logger.warning("Recycling process pool (crash=%s, timeouts=%d)", pool_broken, len(expired))
+                    _kill_pool(executor)
+                    executor = _new_pool(workers, max_tasks_per_child)
+            if summary_queue is not None:
+                for record in summary_queue.ready(wait_all=True):
+                    write(record)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if summary_queue is not None:
+                summary_queue.close()
+            if summary_cache is not None:
+                summary_cache.close()
+
+    summary = dict(stats)
+    summary["elapsed"] = round(time.perf_counter() - started, 3)
+    if cache_path:
+        cache = ResultCache(cache_path)
+        summary["cache"] = cache.stats()["lifetime"]
+        cache.close()
+    return summary
@@ -0,0 +1,144 @@
+# benchmarks/bench_affidavit_writer.py
+"""
+Affidavit rendering: the original per-document canvas with quadratic line
+measuring vs the cached TextLayout and the batch API.
+
+Generates --docs findings-heavy documents (long free-text findings with
+hashes and amounts), checks that TextLayout wraps every finding exactly
+like the original split_line, then times wrapping alone and full
+rendering of the batch both ways.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_affidavit_writer --docs 1000
+"""
+
+import argparse
+import io
+import random
+import time
+
+from reportlab.pdfgen import canvas
+
+from affidavit_writer import CERT_TEXT, render_affidavits, text_layout
+
+WORDS = [
+    "grantor", "grantee", "parcel", "recorded", "deed", "notary", "county", "signature", "overlay",
+    "timestamp", "mismatch", "producer", "iText", "ghostscript", "incremental", "revision", "object",
+]
+
+
+def legacy_split_line(text, max_width, canvas_obj):
+    words = text.split()
+    lines = []
+    line = ""
+    for word in words:
+        if canvas_obj.stringWidth(line + " " + word) < max_width:
+            line += " " + word if line else word
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def legacy_write_affidavit(output_path, metadata, filename, sha256, findings, analyst_title="Founder, Forensix, LLC"):
+    # The original renderer: a fresh setup and quadratic wrapping per document.
+    from datetime import datetime
+    import socket
+    from reportlab.lib.pagesizes import LETTER
+
+    c = canvas.Canvas(output_path, pagesize=LETTER)
+    width, height = LETTER
+    margin = 50
+    y = height - margin
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(margin, y, "Forensic Document Affidavit")
+    y -= 30
+    c.setFont("Helvetica", 10)
+    c.drawString(margin, y, f"Date of Analysis: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    y -= 15
+    c.drawString(margin, y, f"Analyzed File: {filename}")
+    y -= 15
+    c.drawString(margin, y, f"SHA-256: {sha256}")
+    y -= 15
+    c.drawString(margin, y, f"Hostname: {socket.gethostname()}")
+    y -= 25
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(margin, y, "Findings:")
+    y -= 15
+    c.setFont("Helvetica", 10)
+    for line in findings:
+        for subline in legacy_split_line(line, width - 2 * margin, c):
+            c.drawString(margin, y, subline)
+            y -= 12
+            if y < margin:
+                c.showPage()
+                y = height - margin
+    y -= 20
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(margin, y, "Certification:")
+    y -= 15
+    for subline in legacy_split_line(CERT_TEXT, width - 2 * margin, c):
+        c.drawString(margin, y, subline)
+        y -= 12
+    y -= 30
+    c.drawString(margin, y, "Signature: ____________________________")
+    y -= 15
+    c.drawString(margin, y, f"Title: {analyst_title}")
+    y -= 15
+    c.drawString(margin, y, "Date: _________________________________")
+    c.showPage()
+    c.save()
+
+
+def make_documents(count: int, findings: int, rng: random.Random):
+    docs = []
+    for i in range(count):
+        items = []
+        for _ in range(findings):
+            words = rng.choices(WORDS, k=rng.randint(20, 120))
+            words.insert(rng.randrange(len(words)), f"{rng.getrandbits(128):032x}")
+            words.append(f"${rng.randint(1, 10**7):,}.00")
+            items.append(" ".join(words))
+        docs.append({"filename": f"doc{i}.pdf", "sha256": f"{i:064x}", "metadata": {}, "findings": items})
+    return docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--findings", type=int, default=40)
+    args = parser.parse_args()
+
+    docs = make_documents(args.docs, args.findings, random.Random(7))
+    probe = canvas.Canvas(io.BytesIO())
+    probe.setFont("Helvetica", 10)
+    max_width = 612 - 100
+    layout = text_layout("Helvetica", 10)
+
+    findings = [f for doc in docs for f in doc["findings"]]
+    start = time.perf_counter()
+    legacy = [legacy_split_line(f, max_width, probe) for f in findings]
+    legacy_wrap = time.perf_counter() - start
+    start = time.perf_counter()
+    cached = [layout.wrap(f, max_width) for f in findings]
+    cached_wrap = time.perf_counter() - start
+    assert cached == legacy, "TextLayout wrapping differs from split_line"
+    print(f"wrap {len(findings)} findings: legacy {legacy_wrap:.2f} s, cached {cached_wrap:.2f} s"
+          f" ({legacy_wrap / cached_wrap:.1f}x), identical lines")
+
+    start = time.perf_counter()
+    for doc in docs:
+        legacy_write_affidavit(io.BytesIO(), doc["metadata"], doc["filename"], doc["sha256"], doc["findings"])
+    per_doc = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rendered = sum(1 for _ in render_affidavits(docs))
+    batch = time.perf_counter() - start
+    print(f"render {rendered} affidavits: original {per_doc:.2f} s, batch {batch:.2f} s"
+          f" ({per_doc / batch:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
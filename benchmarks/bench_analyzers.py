@@ -0,0 +1,407 @@
+# benchmarks/bench_analyzers.py
+"""
+Before/after timings for the analyzer stages, on synthetic inputs.
+
+Each case builds its own input and times the old way of doing the work
+against the current one (best of --repeat), checking the answers agree
+where both sides compute the same thing. --scale multiplies every case's
+input size.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_analyzers                 # every case
+    python -m benchmarks.bench_analyzers near_duplicates --scale 4
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict
+
+CASES: Dict[str, Callable[[float, int], None]] = {}
+
+
+def case(fn):
+    CASES[fn.__name__] = fn
+    return fn
+
+
+def best_of(fn, repeat: int):
+    """
+    Fastest of repeat calls, in seconds, and the last call's value.
+    """
+    best, value = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def row(label: str, seconds: float, baseline: float = None) -> None:
+    speedup = f"  ({baseline / seconds:.1f}x)" if baseline else ""
+    print(f"  {label:<44} {seconds * 1000:10.1f} ms{speedup}")
+
+
+# -- cases ---------------------------------------------------------------
+
+@case
+def near_duplicates(scale: float, repeat: int) -> None:
+    """MinHash/LSH lookup vs an exact Jaccard scan of every stored document."""
+    from near_duplicates import NearDuplicateIndex, text_shingles
+
+    rng = random.Random(5)
+    vocab = [f"w{i}" for i in range(5000)]
+    templates = [" ".join(rng.choices(vocab, k=120)) for _ in range(int(2000 * scale))]
+    docs = [f"grantor {rng.randrange(10**6)} " + rng.choice(templates) + f" recorded {rng.randrange(10**6)}"
+            for _ in range(int(20000 * scale))]
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NearDuplicateIndex(os.path.join(tmp, "nd.sqlite"))
+        shingles = [text_shingles(doc) for doc in docs]
+        start = time.perf_counter()
+        for i, s in enumerate(shingles):
+            index.add(f"doc{i}", s)
+        print(f"  {len(docs)} documents, add {(time.perf_counter() - start) / len(docs) * 1000:.2f} ms/doc")
+        probes = rng.sample(range(len(docs)), 5)
+
+        def scan():
+            return [{f"doc{j}" for j, s in enumerate(shingles) if len(shingles[p] & s) / len(shingles[p] | s) >= 0.7}
+                    for p in probes]
+
+        def lsh():
+            return [{m["doc_key"] for m in index.query(shingles[p], threshold=0.7, limit=None)} for p in probes]
+
+        exact, truth = best_of(scan, repeat)
+        fast, found = best_of(lsh, repeat)
+        index.close()
+    recall = sum(len(f & t) for f, t in zip(found, truth)) / sum(len(t) for t in truth)
+    row("pairwise Jaccard scan, 5 queries", exact)
+    row(f"LSH index, 5 queries (recall {recall:.0%})", fast, exact)
+
+
+@case
+def metadata_comparator(scale: float, repeat: int) -> None:
+    """N^2 compare_metadata calls vs the vectorised compare_batch matrix."""
+    from metadata_comparator import compare_batch, compare_metadata
+
+    rng = random.Random(3)
+    fields = {
+        "producer": ["Acrobat PDFMaker 11", "Microsoft Word", "iText 7.1.2"],
+        "creator": ["Word", "Acrobat", "Recorder 4.2"],
+        "xmp_toolkit": ["Adobe XMP Core 5.1", "Adobe XMP Core 5.6", None],
+        "has_acroform": [True, False],
+        "has_signature_field": [True, False],
+        "tamper_risk": [None, "Timestamp mismatch"],
+    }
+    n = int(300 * scale)
+    docs = []
+    for i in range(n):
+        md = {field: rng.choice(values) for field, values in fields.items()}
+        md["document_id"] = f"uuid:{rng.randrange(n // 2)}"
+        md["creation_date"] = f"D:202401{1 + i % 28:02d}1030{rng.randrange(60):02d}"
+        md["mod_date"] = md["creation_date"] if rng.random() < 0.8 else "D:20240301120000"
+        docs.append(md)
+    print(f"  {n} documents, {len(docs[0])} fields")
+    pairwise, _ = best_of(lambda: [compare_metadata(a, b) for a in docs for b in docs], repeat)
+    batch, _ = best_of(lambda: compare_batch(docs), repeat)
+    row("compare_metadata x N^2", pairwise)
+    row("compare_batch", batch, pairwise)
+
+
+@case
+def bundle_writer(scale: float, repeat: int) -> None:
+    """Streaming BundleWriter vs building the archive in memory with zipfile."""
+    import io
+    import json
+    import tracemalloc
+    import zipfile
+
+    from bundle_writer import BundleWriter
+
+    rng = random.Random(1)
+    words = ["grantor", "grantee", "parcel", "trust", "amount", "recorded", "deed", "notary", "county", "assessor"]
+    pdf = os.urandom(256 * 1024)
+    docs = []
+    for i in range(int(200 * scale)):
+        text = " ".join(rng.choices(words, k=4000))
+        docs.append([
+            (f"doc{i}/metadata.json", json.dumps({"producer": "iText", "index": i, "words": text[:2000]}, indent=2)),
+            (f"doc{i}/decoded.txt", text),
+            (f"doc{i}/original.pdf", pdf),
+        ])
+
+    def in_memory(path):
+        mem = io.BytesIO()
+        with zipfile.ZipFile(mem, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in (entry for entries in docs for entry in entries):
+                zf.writestr(name, data)
+        with open(path, "wb") as f:
+            f.write(mem.getvalue())
+
+    def streaming(path, workers):
+        with BundleWriter(path, workers=workers) as writer:
+            for name, data in (entry for entries in docs for entry in entries):
+                writer.add(name, data)
+
+    cores = os.cpu_count() or 1
+    print(f"  {len(docs)} documents, {cores} cores")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bundle.zip")
+        runs = [("zipfile + BytesIO", in_memory), ("BundleWriter, 1 worker", lambda p: streaming(p, 1))]
+        if cores > 1:
+            runs.append((f"BundleWriter, {cores} workers", lambda p: streaming(p, cores)))
+        for label, write in runs:
+            tracemalloc.start()
+            seconds, _ = best_of(lambda: write(path), repeat)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            row(f"{label} (heap peak {peak / 2**20:.1f} MB)", seconds, baseline)
+            baseline = baseline or seconds
+
+
+_REPORT_CHILD = """
+import resource, sys, time
+import report_generator
+mode, docs, path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+items = ({
+    "filename": f"doc{i}.pdf", "sha256": f"{i:064x}", "producer": "iText 5.5", "creator": "Word",
+    "entities": {"grantors": ["Jane Doe", "John Roe"], "grantees": ["Acme Trust"]},
+    "cid_font": i % 3 == 0, "fraud_flags": ["Timestamp mismatch", "Missing XMP toolkit"][: i % 3],
+} for i in range(docs))
+start = time.perf_counter()
+if mode == "serial":
+    report_generator.generate_affidavit(list(items), path)
+else:
+    report_generator.generate_affidavit_sharded(items, path)
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+@case
+def report_generator(scale: float, repeat: int) -> None:
+    """One SimpleDocTemplate for the whole report vs shards on a process pool."""
+    import subprocess
+    import sys
+
+    docs = int(2000 * scale)
+    print(f"  {docs} documents, {os.cpu_count()} cores")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("serial", "sharded"):
+            # a fresh interpreter per run, so peak RSS is the mode's own
+            path = os.path.join(tmp, f"{mode}.pdf")
+            runs = [subprocess.run([sys.executable, "-c", _REPORT_CHILD, mode, str(docs), path],
+                                   capture_output=True, text=True, check=True).stdout.split()[-2:]
+                    for _ in range(repeat)]
+            seconds = min(float(elapsed) for elapsed, _ in runs)
+            rss = max(int(rss_kb) for _, rss_kb in runs)
+            row(f"{mode} (peak RSS {rss / 1024:.0f} MB)", seconds, baseline)
+            baseline = baseline or seconds
+
+
+def _fitz_pdf(pages: int, draw, **save) -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for p in range(pages):
+        draw(doc.new_page(), p)
+    data = doc.tobytes(garbage=1, deflate=True, **save)
+    doc.close()
+    return data
+
+
+def _on_fresh_context(fn, data: bytes, repeat: int):
+    # best_of over a new ParsedPdf each run; flattening the page tree is
+    # shared by every stage, so it is not timed
+    from utils.parsed_pdf import ParsedPdf
+
+    best, value = float("inf"), None
+    for _ in range(repeat):
+        with ParsedPdf(data) as pdf:
+            pdf.pages
+            seconds, value = best_of(lambda: fn(pdf), 1)
+            best = min(best, seconds)
+    return best, value
+
+
+@case
+def object_inventory(scale: float, repeat: int) -> None:
+    """PyPDF2 object-graph walks vs building and querying the object inventory."""
+    import fitz  # PyMuPDF
+
+    def draw(page, p):
+        page.insert_text((72, 72), f"Recorded deed page {p}", fontname="helv")
+        if p % 10 == 0:
+            page.insert_text((72, 120), "登记", fontname="china-s")
+        if p % 25 == 0:
+            widget = fitz.Widget()
+            widget.field_name = f"sig_{p}"
+            widget.field_type = fitz.PDF_WIDGET_TYPE_SIGNATURE if p % 50 == 0 else fitz.PDF_WIDGET_TYPE_TEXT
+            widget.rect = fitz.Rect(72, 200, 272, 240)
+            page.add_widget(widget)
+        if p % 20 == 0:
+            page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 300, 200, 320), "uri": "https://example.com"})
+
+    def graph_walk(pdf):
+        cid = False
+        for page in pdf.pages:
+            resources = pdf.resolve(page.get("/Resources", {}))
+            for font_ref in pdf.resolve(resources.get("/Font", {})).values():
+                for descendant in pdf.resolve(pdf.resolve(font_ref).get("/DescendantFonts", [])):
+                    cid = cid or "/CIDFont" in str(pdf.resolve(descendant).get("/Subtype"))
+        acroform = pdf.resolve(pdf.root.get("/AcroForm", {}))
+        signatures = sum(pdf.resolve(field).get("/FT") == "/Sig" for field in pdf.resolve(acroform.get("/Fields", [])))
+        actions = sum("/A" in pdf.resolve(annot) or "/AA" in pdf.resolve(annot)
+                      for page in pdf.pages for annot in pdf.resolve(page.get("/Annots", [])))
+        return cid, signatures, actions
+
+    def inventory(pdf):
+        inv = pdf.inventory
+        return bool(inv.cid_fonts().size), len(inv.signature_fields()), len(inv.find(action=sorted(inv.counts("action"))))
+
+    pages = int(2000 * scale)
+    data = _fitz_pdf(pages, draw, use_objstms=1)
+    print(f"  {pages} pages, {len(data) / 1e6:.1f} MB")
+    walk, expected = _on_fresh_context(graph_walk, data, repeat)
+    indexed, answer = _on_fresh_context(inventory, data, repeat)
+    assert answer == expected, "inventory disagrees with the object graph"
+    row("graph walk", walk)
+    row("build inventory + query", indexed, walk)
+
+
+@case
+def fonts(scale: float, repeat: int) -> None:
+    """Font summaries for every font on every page vs memoised per font object."""
+    from utils.fonts import document_fonts, summarize_font
+    from utils.parsed_pdf import ParsedPdf
+
+    def draw(page, p):
+        page.insert_text((72, 72), f"Recorded deed page {p}", fontname="helv")
+        page.insert_text((72, 120), "登记", fontname="china-s")
+
+    def page_fonts(pdf, page):
+        return (pdf.resolve(pdf.resolve(page.get("/Resources") or {}).get("/Font")) or {}).values()
+
+    def per_page(pdf):
+        return sum(summarize_font(pdf, ref)["cid"] for page in pdf.pages for ref in page_fonts(pdf, page))
+
+    def memoised(pdf):
+        return sum(pdf.font_summary(ref)["cid"] for page in pdf.pages for ref in page_fonts(pdf, page))
+
+    pages = int(3000 * scale)
+    data = _fitz_pdf(pages, draw)
+    print(f"  {pages} pages sharing two fonts, {len(data) / 1e6:.1f} MB")
+    before, expected = _on_fresh_context(per_page, data, repeat)
+    after, answer = _on_fresh_context(memoised, data, repeat)
+    assert answer == expected == pages
+    row("summaries per page", before)
+    row("ParsedPdf.font_summary", after, before)
+    with ParsedPdf(data) as pdf:
+        built, _ = best_of(lambda: pdf.inventory, 1)
+        listed, unique = best_of(lambda: document_fonts(pdf), 1)
+    row(f"document_fonts ({len(unique)} unique fonts)", listed)
+    row("  + building the shared inventory", built)
+
+
+@case
+def signature_verifier(scale: float, repeat: int) -> None:
+    """Hashing signed byte ranges from the mapped file vs reading and concatenating."""
+    import hashlib
+
+    from signature_verifier import hash_ranges, verify_signatures
+    from utils.parsed_pdf import as_parsed_pdf
+
+    size = int(100 * 2**20 * scale)
+    out = bytearray(b"%%PDF-1.7\n1 0 obj\n<< /Length %d >>\nstream\n" % size)
+    out += os.urandom(size) + b"\nendstream\nendobj\n"
+    out += b"2 0 obj\n<< /Type /Sig /SubFilter /adbe.pkcs7.detached /ByteRange ["
+    range_at = len(out)
+    out += b" " * 40 + b"] /Contents <"
+    gap_start = len(out) - 1
+    out += b"0" * 16384 + b">"
+    gap_end = len(out)
+    out += b" >>\nendobj\ntrailer\n<< /Size 3 >>\n%%EOF\n"
+    ranges = [(0, gap_start), (gap_end, len(out) - gap_end)]
+    out[range_at:range_at + 40] = b" ".join(b"%d %d" % r for r in ranges).ljust(40)
+
+    def read_and_join(path):
+        with open(path, "rb") as f:
+            data = f.read()
+        signed = b"".join(data[start:start + length] for start, length in ranges)
+        return {name: hashlib.new(name, signed).digest() for name in ("sha256", "sha1")}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "signed.pdf")
+        with open(path, "wb") as f:
+            f.write(out)
+        del out
+        print(f"  {os.path.getsize(path) / 1e6:.0f} MB file, one signature")
+        naive, expected = best_of(lambda: read_and_join(path), repeat)
+        with as_parsed_pdf(path) as pdf:
+            mapped, digests = best_of(lambda: hash_ranges(pdf.data, ranges, ["sha256", "sha1"]), repeat)
+        assert digests == expected
+        verify, result = best_of(lambda: verify_signatures(path), repeat)
+        assert result["error"] is None and len(result["signatures"]) == 1
+    row("read + concatenate + hash", naive)
+    row("hash_ranges on the map", mapped, naive)
+    row("verify_signatures (no CMS to hash)", verify)
+
+
+@case
+def content_interpreter(scale: float, repeat: int) -> None:
+    """Hidden-text and overlay scan per page vs text extraction and rasterising."""
+    import fitz  # PyMuPDF
+
+    from utils.content_interpreter import scan_document
+    from utils.parsed_pdf import ParsedPdf
+
+    stamp = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), False)
+    stamp.clear_with(200)
+
+    def draw(page, p):
+        for line in range(50):
+            page.insert_text((72, 60 + 14 * line), f"Line {line} of recorded instrument page {p}, parcel {p * 50 + line}",
+                             fontname="helv", fontsize=10)
+        if p % 10 == 0:
+            page.insert_text((72, 770), f"hidden note {p}", fontname="helv", fontsize=10, color=(1, 1, 1))
+            page.insert_image(fitz.Rect(68, 49, 400, 64), pixmap=stamp)  # over line 0
+
+    pages = int(500 * scale)
+    data = _fitz_pdf(pages, draw, clean=True)  # one content stream per page
+    marked = len(range(0, pages, 10))
+    print(f"  {pages} pages of 50 lines, {marked} with planted layers, {len(data) / 1e6:.1f} MB")
+    scan, result = _on_fresh_context(scan_document, data, repeat)
+    assert result["errors"] == [], result["errors"][:3]
+    assert sum(e["reason"] == "white" for e in result["invisible_text"]) == marked
+    assert len(result["overlays"]) == marked
+
+    # the alternatives on a 50-page sample, scaled to the whole document
+    sample = min(50, pages)
+    with ParsedPdf(data) as pdf:
+        extract, _ = best_of(lambda: [page.extract_text() for page in pdf.pages[:sample]], 1)
+    doc = fitz.open(stream=data, filetype="pdf")
+    raster, _ = best_of(lambda: [doc[i].get_pixmap(dpi=72) for i in range(sample)], 1)
+    doc.close()
+    row("PyPDF2 extract_text (static mode)", extract * pages / sample)
+    row("rasterising at 72 dpi", raster * pages / sample)
+    row("scan_document (vs extract_text)", scan, extract * pages / sample)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    for name in args.cases or CASES:
+        print(f"{name}: {CASES[name].__doc__}")
+        CASES[name](args.scale, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
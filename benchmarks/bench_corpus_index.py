@@ -0,0 +1,91 @@
+# benchmarks/bench_corpus_index.py
+"""
+Incremental CorpusIndex vs recomputing detect_mass_fraud /
+detect_producer_override over the whole corpus.
+
+Builds a synthetic corpus of metadata records (a few percent forged: same
+minute, different XMP toolkit, or a reused DocumentID under another
+producer), streams it into the index in batches and reports insert rate and
+query latency at each checkpoint, next to the cost of one full in-memory
+recomputation at that size.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_corpus_index --records 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from corpus_index import CorpusIndex
+from fraud_detector import detect_mass_fraud, detect_producer_override
+
+TOOLKITS = ["Adobe XMP Core 5.1.0", "Adobe XMP Core 5.6-c015", "iText 7.1", None]
+PRODUCERS = ["Acrobat PDFMaker 11", "Microsoft Word", "iText 7.1.2", "Ghostscript 9.50"]
+
+
+def synthetic_records(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    for i in range(n):
+        day = 1 + i % 28
+        minute = rng.randrange(24 * 60)
+        forged = rng.random() < 0.02
+        document_id = f"uuid:{rng.randrange(n // 4 + 1)}" if forged else f"uuid:doc-{i}"
+        yield {
+            "filename": f"doc_{i:07d}.pdf",
+            "creation_date": f"D:2024{1 + (i // 28) % 12:02d}{day:02d}{minute // 60:02d}{minute % 60:02d}{rng.randrange(60):02d}",
+            "xmp_toolkit": rng.choice(TOOLKITS) if forged else TOOLKITS[0],
+            "document_id": document_id,
+            "producer": rng.choice(PRODUCERS) if forged else PRODUCERS[0],
+        }
+
+
+def query_latency(index: CorpusIndex, sample_minute: str, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        index.cluster(sample_minute, include_docs=False)
+        index.producers("uuid:1")
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--checkpoints", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CorpusIndex(os.path.join(tmp, "corpus.sqlite"))
+        corpus = []
+        step = max(args.batch, args.records // args.checkpoints)
+        inserted = events = 0
+        insert_time = 0.0
+        records = synthetic_records(args.records)
+        while inserted < args.records:
+            batch = [md for _, md in zip(range(args.batch), records)]
+            if not batch:
+                break
+            start = time.perf_counter()
+            events += len(index.add_many(batch))
+            insert_time += time.perf_counter() - start
+            corpus.extend(batch)
+            inserted += len(batch)
+            if inserted % step == 0 or inserted >= args.records:
+                start = time.perf_counter()
+                detect_mass_fraud(corpus)
+                detect_producer_override(corpus)
+                recompute = time.perf_counter() - start
+                latency = query_latency(index, "202401011000")
+                print(
+                    f"{inserted:>9,} docs | insert {inserted / insert_time:>8,.0f} docs/s"
+                    f" | query {latency:.3f} ms | full recompute {recompute:.2f}s | events {events:,}"
+                )
+        print(index.stats())
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/bench_entity_engine.py
+"""
+Per-pattern finditer passes vs the entity engine.
+
+Generates multi-megabyte OCR/CID-like text and times one finditer pass per
+entity pattern (what the previous extract_entities did with re.findall)
+against EntityEngine.scan, after checking both find the same matches. Also
+times a single alternation of all patterns used as the candidate search
+(each kind then matched at the hit), the simplest one-pass design, to show
+what the engine's per-pattern prefilters buy.
+The stand-in patterns below have the shapes of the project ones; pass
+--project-patterns to use utils.patterns instead.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_entity_engine --mb 8
+"""
+
+import argparse
+import random
+import re
+import time
+
+from utils.entity_engine import EntityEngine, default_patterns
+
+BENCH_PATTERNS = [
+    ("email", r"[\w.+-]+@[\w-]+\.[\w.]+"),
+    ("amount", r"\$\s?\d[\d,]*(?:\.\d{2})?"),
+    ("address", r"\b\d{1,5}\s+(?:[A-Z][a-z]+\s+)+(?:Street|St|Avenue|Ave|Road|Rd)\b"),
+    ("registry_key", r"\b0[015679]\d{8}\b"),
+    ("phone", r"\(?\b\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b"),
+    ("foreign_script", r"(?P<russian>[\u0400-\u04FF]+)|(?P<arabic>[\u0600-\u06FF]+)"),
+]
+
+FILLER = (
+    "THIS INDENTURE made between the Grantor and the Grantee witnesseth that for and in "
+    "consideration of the sum stated the receipt whereof is hereby acknowledged "
+).split()
+
+
+def synthetic_text(mb: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    target = int(mb * 1024 * 1024)
+    while size < target:
+        roll = rng.random()
+        if roll < 0.02:
+            token = f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+        elif roll < 0.03:
+            token = f"0{rng.randint(100000000, 999999999)}"
+        elif roll < 0.04:
+            token = f"${rng.randint(1, 999)},{rng.randint(100, 999)}.00"
+        elif roll < 0.045:
+            token = f"agent{rng.randint(1, 999)}@escrow-example.com"
+        elif roll < 0.05:
+            token = f"{rng.randint(1, 9999)} Main Street"
+        elif roll < 0.052:
+            token = "Тегеран"
+        else:
+            token = rng.choice(FILLER)
+        parts.append(token)
+        size += len(token) + 1
+    return " ".join(parts)
+
+
+def per_pattern(patterns, text):
+    return {kind: [(m.start(), m.end()) for m in pattern.finditer(text)] for kind, pattern in patterns}
+
+
+def alternation_scan(patterns, text):
+    union = re.compile("|".join(f"(?:{pattern.pattern})" for _, pattern in patterns))
+    found = {kind: [] for kind, _ in patterns}
+    resume = {kind: 0 for kind, _ in patterns}
+    pos = 0
+    while True:
+        c = union.search(text, pos)
+        if c is None:
+            return found
+        at = c.start()
+        for kind, pattern in patterns:
+            if resume[kind] > at:
+                continue
+            m = pattern.match(text, at)
+            if m is not None and m.end() > at:
+                found[kind].append((at, m.end()))
+                resume[kind] = m.end()
+        pos = max(at + 1, min(resume.values()))
+
+
+def engine_scan(engine, text):
+    found = {kind: [] for kind, _ in engine.patterns}
+    for span in engine.scan(text):
+        found[span.kind].append((span.start, span.end))
+    return found
+
+
+def timed(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=float, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--project-patterns", action="store_true")
+    args = parser.parse_args()
+
+    patterns = default_patterns() if args.project_patterns else BENCH_PATTERNS
+    engine = EntityEngine(patterns)
+    compiled = engine.patterns
+    text = synthetic_text(args.mb)
+    print(f"synthetic text: {len(text) / 1e6:.1f} M chars")
+    print("strategies:", ", ".join(f"{kind}={s}" for kind, s in engine.strategies.items()))
+    expected = per_pattern(compiled, text)
+    if engine_scan(engine, text) != expected or alternation_scan(compiled, text) != expected:
+        raise SystemExit("engine, alternation and per-pattern passes disagree")
+    passes = timed(lambda t: per_pattern(compiled, t), text, args.repeat)
+    alternation = timed(lambda t: alternation_scan(compiled, t), text, args.repeat)
+    scanned = timed(lambda t: engine_scan(engine, t), text, args.repeat)
+    print(f"per-pattern passes: {passes:.3f}s")
+    print(f"single alternation: {alternation:.3f}s ({passes / alternation:.2f}x)")
+    print(f"engine:             {scanned:.3f}s ({passes / scanned:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
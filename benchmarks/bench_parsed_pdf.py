@@ -0,0 +1,97 @@
+# benchmarks/bench_parsed_pdf.py
+"""
+Before/after timing for the shared ParsedPdf context.
+
+"before" hands the file path to every stage, so each one opens and parses
+the document itself (the pre-ParsedPdf behaviour); "after" builds one
+ParsedPdf and passes it to all stages.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_parsed_pdf --docs 3 --pages 300
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from acroform_audit import list_form_fields
+from extract_metadata import extract_metadata as extract_tamper_metadata
+from signature_validator import validate_signatures
+from utils.decode_streams import decode_streams
+from utils.metadata import extract_metadata
+from utils.parsed_pdf import ParsedPdf
+
+
+def build_corpus(out_dir: str, docs: int, pages: int) -> list:
+    paths = []
+    for d in range(docs):
+        doc = fitz.open()
+        for p in range(pages):
+            page = doc.new_page()
+            page.insert_text(
+                (72, 72),
+                f"Deed bundle {d} page {p}\nGrantor: Jane Doe  Grantee: John Roe\nConsideration: $1,250,000.00",
+                fontname="helv",
+            )
+            if p % 50 == 0:
+                widget = fitz.Widget()
+                widget.field_name = f"field_{d}_{p}"
+                widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+                widget.rect = fitz.Rect(72, 200, 272, 220)
+                page.add_widget(widget)
+        doc.set_metadata({"producer": "bench", "creationDate": "D:20240101120000Z"})
+        path = os.path.join(out_dir, f"bundle_{d}.pdf")
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def run_stages(source) -> None:
+    extract_metadata(source)
+    extract_tamper_metadata(source)
+    list_form_fields(source)
+    validate_signatures(source)
+    decode_streams(source, use_fitz=True)
+    decode_streams(source, use_fitz=False)
+
+
+def bench_before(paths: list) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        run_stages(path)
+    return time.perf_counter() - start
+
+
+def bench_after(paths: list) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        with ParsedPdf.from_path(path) as pdf:
+            run_stages(pdf)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = build_corpus(tmpdir, args.docs, args.pages)
+        size_mb = sum(os.path.getsize(p) for p in paths) / 1e6
+        print(f"corpus: {args.docs} docs x {args.pages} pages ({size_mb:.1f} MB)")
+
+        before = min(bench_before(paths) for _ in range(args.repeat))
+        after = min(bench_after(paths) for _ in range(args.repeat))
+        print(f"before (per-stage parse): {before:.3f}s")
+        print(f"after  (shared ParsedPdf): {after:.3f}s")
+        print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
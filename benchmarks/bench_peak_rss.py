@@ -0,0 +1,99 @@
+# benchmarks/bench_peak_rss.py
+"""
+Peak resident memory of decode_pdf on a large scanned-style PDF.
+
+Writes a PDF whose bulk is one uncompressed image stream of --size-mb,
+then decodes it in a fresh interpreter per case: the old way (the whole
+file read into bytes first) and the zero-copy way (a path, mapped by
+ParsedPdf). Reports, as multiples of the file size, peak RSS growth over
+the interpreter's baseline and the peak of Python heap allocations.
+Mapped file pages count towards RSS but are clean page cache the kernel
+can drop; heap copies cannot be.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_peak_rss --size-mb 500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+_CHILD = """
+import resource, sys, tracemalloc
+from utils.decode_controller import decode_pdf
+import fitz, PyPDF2
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+tracemalloc.start()
+path, mode, static = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+if mode == "bytes":
+    with open(path, "rb") as f:
+        source = f.read()
+else:
+    source = path
+result = decode_pdf(source, static_mode=static, summarize="never")
+assert result["error"] is None, result["error"]
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base, tracemalloc.get_traced_memory()[1] // 1024)
+"""
+
+
+def write_pdf(path: str, size_mb: int) -> None:
+    width = 4096
+    height = size_mb * 1024 * 1024 // (width * 3)
+    content = b"BT /F1 12 Tf 72 720 Td (Scanned exhibit) Tj ET q 540 0 0 700 36 40 cm /Im0 Do Q"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> /XObject << /Im0 6 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.7\n")
+        offsets = []
+        for i, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % i + body + b"\nendobj\n")
+        offsets.append(f.tell())
+        length = width * height * 3
+        f.write(b"6 0 obj\n<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB"
+                b" /BitsPerComponent 8 /Length %d >>\nstream\n" % (width, height, length))
+        row = os.urandom(width * 3)
+        for _ in range(height):
+            f.write(row)
+        f.write(b"\nendstream\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        for off in offsets:
+            f.write(b"%010d 00000 n \n" % off)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scan.pdf")
+        write_pdf(path, args.size_mb)
+        size_kb = os.path.getsize(path) / 1024
+        print(f"file: {size_kb / 1024:.0f} MB")
+        for static in (True, False):
+            for mode in ("bytes", "path"):
+                out = subprocess.run(
+                    [sys.executable, "-c", _CHILD, path, mode, "1" if static else "0"],
+                    capture_output=True, text=True,
+                )
+                if out.returncode != 0:
+                    print(f"{'static' if static else 'fitz':<7}{mode:<6} failed: {out.stderr.strip().splitlines()[-1]}")
+                    continue
+                growth_kb, heap_kb = map(int, out.stdout.split()[-2:])
+                print(f"{'static' if static else 'fitz':<7}{mode:<6} peak RSS +{growth_kb / 1024:5.0f} MB"
+                      f" ({growth_kb / size_kb:.2f}x)   heap peak {heap_kb / 1024:5.0f} MB ({heap_kb / size_kb:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of the entry points and of a fresh batch worker.
+
+For each module, runs `python -X importtime -c "import <module>"` in a clean
+interpreter and reports the total import time plus the heaviest top-level
+packages it pulled in. Then times a spawn-context worker process from
+creation to its first finished task (the worker imports batch_runner and
+the decode pipeline), against the sub-second target.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup
+"""
+
+import argparse
+import multiprocessing
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+MODULES = [
+    "batch_runner",
+    "acroinformer",
+    "utils.decode_controller",
+    "utils.summary_service",
+    "scoring_engine",
+    "report_generator",
+    "affidavit_writer",
+]
+
+WORKER_TARGET = 1.0
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(module: str):
+    """
+    (total seconds, {top-level package: cumulative seconds}) for importing module.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total = 0
+    packages = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        packages[name.split(".")[0]] += self_us
+        if len(indent) == 1:
+            total += cumulative_us
+    return total / 1e6, {k: v / 1e6 for k, v in packages.items()}
+
+
+def _worker_ready() -> float:
+    start = time.perf_counter()
+    import batch_runner  # noqa: F401
+    import utils.decode_controller  # noqa: F401
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=4)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        try:
+            total, packages = import_profile(module)
+        except RuntimeError as e:
+            print(f"{module:<26} import failed: {e}")
+            continue
+        heavy = sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]
+        print(f"{module:<26} {total * 1000:7.0f} ms   " + ", ".join(f"{k} {v * 1000:.0f}" for k, v in heavy))
+
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            imports = pool.submit(_worker_ready).result()
+            spin_up = time.perf_counter() - start
+    except Exception as e:
+        print(f"{'spawned worker':<26} failed: {type(e).__name__}: {e}")
+        return
+    verdict = "ok" if spin_up < WORKER_TARGET else "over target"
+    print(f"spawned worker ready in {spin_up * 1000:.0f} ms (pipeline imports {imports * 1000:.0f} ms)"
+          f" - target {WORKER_TARGET * 1000:.0f} ms: {verdict}")
+
+
+if __name__ == "__main__":
+    main()
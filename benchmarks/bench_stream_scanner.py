@@ -0,0 +1,90 @@
+# benchmarks/bench_stream_scanner.py
+"""
+Whole-file latin1 regex vs the incremental stream scanner.
+
+Builds a synthetic "scanned" PDF (one large image stream plus a small Flate
+text stream per page) and reports wall time and peak Python heap for:
+  - legacy: decode to latin1, re.findall(stream(.*?)endstream), zlib each body
+  - scanner: utils.stream_scanner.iter_decoded_streams over an mmap of the file
+
+Usage (from the repository root):
+    python -m benchmarks.bench_stream_scanner --size-mb 120
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+from utils.stream_scanner import iter_decoded_streams
+
+
+def build_scanned_pdf(path: str, size_mb: int, image_kb: int = 1024) -> int:
+    pages = max(1, size_mb * 1024 // image_kb)
+    image = os.urandom(image_kb * 1024)
+    obj = 1
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.7\n")
+        for p in range(pages):
+            f.write(b"%d 0 obj\n<< /Type /XObject /Subtype /Image /Width 2480 /Height 3508"
+                    b" /BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n" % (obj, len(image)))
+            f.write(image)
+            f.write(b"\nendstream\nendobj\n")
+            obj += 1
+            text = zlib.compress(b"BT /F1 12 Tf 72 720 Td (Recorded page %d) Tj ET" % p)
+            f.write(b"%d 0 obj\n<< /Filter /FlateDecode /Length %d >>\nstream\n" % (obj, len(text)))
+            f.write(text)
+            f.write(b"\nendstream\nendobj\n")
+            obj += 1
+        f.write(b"trailer\n<< /Size %d >>\n%%%%EOF\n" % obj)
+    return pages
+
+
+def legacy_scan(path: str) -> int:
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    raw = file_bytes.decode("latin1", errors="ignore")
+    found = 0
+    for stream in re.findall(r"stream(.*?)endstream", raw, re.DOTALL):
+        try:
+            zlib.decompress(stream.strip().encode("latin1", errors="ignore"))
+            found += 1
+        except Exception:
+            continue
+    return found
+
+
+def scanner_scan(path: str) -> int:
+    return sum(1 for _ in iter_decoded_streams(path))
+
+
+def measure(fn, path: str):
+    start = time.perf_counter()
+    found = fn(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return found, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "scanned.pdf")
+        pages = build_scanned_pdf(path, args.size_mb)
+        print(f"synthetic scan: {pages} pages, {os.path.getsize(path) / 1e6:.0f} MB")
+        for name, fn in (("legacy", legacy_scan), ("scanner", scanner_scan)):
+            found, elapsed, peak = measure(fn, path)
+            print(f"{name:8s} {elapsed:7.3f}s  peak heap {peak / 1e6:8.1f} MB  text streams {found}")
+
+
+if __name__ == "__main__":
+    main()
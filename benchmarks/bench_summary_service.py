@@ -0,0 +1,60 @@
+# benchmarks/bench_summary_service.py
+"""
+Sequential blocking summaries vs the concurrent SummaryService.
+
+Uses the offline StubBackend with a simulated round-trip latency, so it
+needs no API key. The sequential run is what decode_pdf used to do per
+file; the concurrent run is bounded by --concurrency. A second concurrent
+pass shows the prompt-hash cache.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_summary_service --docs 500 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import time
+
+from utils.summary_service import StubBackend, SummaryService
+
+
+def documents(n: int):
+    return [
+        {"entities": {"amounts": [f"${i},000.00"], "emails": [f"agent{i}@example.com"]},
+         "metadata": {"/Producer": "bench"}}
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    docs = documents(args.docs)
+
+    sequential = SummaryService(StubBackend(args.latency), max_concurrency=1)
+    start = time.perf_counter()
+    for doc in docs:
+        sequential.summarize_sync(**doc)
+    seq_time = time.perf_counter() - start
+
+    service = SummaryService(StubBackend(args.latency), max_concurrency=args.concurrency)
+    start = time.perf_counter()
+    asyncio.run(service.summarize_many(docs))
+    conc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    asyncio.run(service.summarize_many(docs))
+    cached_time = time.perf_counter() - start
+
+    print(f"{args.docs} documents, {args.latency * 1000:.0f} ms simulated latency")
+    print(f"sequential:              {seq_time:.2f}s")
+    print(f"concurrent ({args.concurrency:>3}):        {conc_time:.2f}s  ({seq_time / conc_time:.1f}x)")
+    print(f"concurrent, cached:      {cached_time:.3f}s")
+    print(f"counters: {service.stats()}")
+
+
+if __name__ == "__main__":
+    main()
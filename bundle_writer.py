@@ -0,0 +1,256 @@
+# bundle_writer.py
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Entries with these suffixes are already compressed; deflating them again
+# costs CPU for no gain, so they are stored by default.
+STORED_SUFFIXES = (".pdf", ".png", ".jpg", ".jpeg", ".gif", ".zip", ".gz", ".xz", ".bz2")
+
+# Large entry bodies are handed to the sink in slices of this size.
+WRITE_CHUNK = 1024 * 1024
+
+_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END = struct.Struct("<IHHHHIIH")
+_END64 = struct.Struct("<IQHHIIQQQQ")
+_LOCATOR64 = struct.Struct("<IIQI")
+
+_MAX32 = 0xFFFFFFFF
+_MAX16 = 0xFFFF
+_UTF8_FLAG = 0x800
+_STORED, _DEFLATED = 0, 8
+
+
+def _dos_time(timestamp: float) -> Tuple[int, int]:
+    t = time.localtime(timestamp)
+    year = min(max(t.tm_year, 1980), 2107)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+def _encode(data: Any):
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return data
+
+
+def _pack_entry(data, compress: bool, level: int) -> Tuple[Any, int, int, int]:
+    # Runs on a worker thread; crc32 and deflate release the GIL.
+    size = len(memoryview(data))
+    crc = zlib.crc32(data)
+    if not compress:
+        return data, crc, size, _STORED
+    deflater = zlib.compressobj(level, zlib.DEFLATED, -15)
+    body = deflater.compress(data) + deflater.flush()
+    return body, crc, size, _DEFLATED
+
+
+class _Entry:
+    __slots__ = ("name", "job", "release")
+
+    def __init__(self, name: str, job: Future, release: Optional[Callable[[], None]]):
+        self.name = name
+        self.job = job
+        self.release = release
+
+
+class BundleWriter:
+    """
+    Streaming ZIP writer for forensic bundles.
+
+    Entries are written straight to target (a path, a binary file object,
+    or any object with write(); it need not be seekable), in the order they
+    were added. Compression runs on a thread pool so independent entries
+    deflate in parallel, while at most max_pending entries are buffered,
+    keeping memory bounded however many documents a bundle holds.
+    Entries named with STORED_SUFFIXES (PDFs, images, archives) are stored
+    without recompression unless compress is given explicitly. Archives
+    past 4 GiB or 65535 entries are written as Zip64.
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        workers: Optional[int] = None,
+        level: int = 6,
+        max_pending: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ):
+        if isinstance(target, (str, os.PathLike)):
+            self._out = open(target, "wb")
+            self._owns_out = True
+        else:
+            self._out = target
+            self._owns_out = False
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.level = level
+        self.max_pending = max_pending or 2 * self.workers
+        self._time, self._date = _dos_time(time.time() if timestamp is None else timestamp)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bundle")
+        self._pending: deque = deque()
+        self._central: List[bytes] = []
+        self._offset = 0
+        self._closed = False
+
+    # -- adding entries ---------------------------------------------------
+
+    def add(self, name: str, data: Any, compress: Optional[bool] = None,
+            release: Optional[Callable[[], None]] = None) -> None:
+        """
+        Queue one entry. data may be str (written as UTF-8), bytes, or any
+        buffer such as a memoryview or mmap, which is read in place.
+        release, if given, is called once the entry has been written, e.g.
+        to close the file the buffer came from.
+        """
+        if self._closed:
+            raise ValueError("bundle is closed")
+        if compress is None:
+            compress = not name.lower().endswith(STORED_SUFFIXES)
+        job = self._pool.submit(_pack_entry, _encode(data), compress, self.level)
+        self._pending.append(_Entry(name, job, release))
+        while len(self._pending) > self.max_pending:
+            self._write_next()
+
+    def add_file(self, name: str, path: str, compress: Optional[bool] = None) -> None:
+        """
+        Queue a file from disk; it is mapped rather than read into memory.
+        """
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                self.add(name, b"", compress)
+                return
+        self.add(name, mm, compress, release=mm.close)
+
+    def flush(self) -> None:
+        """
+        Write every queued entry.
+        """
+        while self._pending:
+            self._write_next()
+
+    # -- output -----------------------------------------------------------
+
+    def _emit(self, data) -> None:
+        view = memoryview(data)
+        try:
+            for start in range(0, len(view), WRITE_CHUNK):
+                self._out.write(view[start:start + WRITE_CHUNK])
+            self._offset += len(view)
+        finally:
+            view.release()
+
+    def _write_next(self) -> None:
+        entry = self._pending.popleft()
+        try:
+            body, crc, size, method = entry.job.result()
+            self._write_entry(entry.name, body, crc, size, method)
+        finally:
+            if entry.release is not None:
+                entry.release()
+
+    def _write_entry(self, name: str, body, crc: int, size: int, method: int) -> None:
+        encoded = name.encode("utf-8")
+        flags = 0 if encoded.isascii() else _UTF8_FLAG
+        csize = len(memoryview(body))
+        offset = self._offset
+        large = size >= _MAX32 or csize >= _MAX32
+        version = 45 if large or offset >= _MAX32 else 20
+
+        extra = struct.pack("<HHQQ", 1, 16, size, csize) if large else b""
+        self._emit(_LOCAL.pack(
+            0x04034B50, version, flags, method, self._time, self._date, crc,
+            _MAX32 if large else csize, _MAX32 if large else size, len(encoded), len(extra),
+        ) + encoded + extra)
+        self._emit(body)
+
+        zip64 = []
+        if size >= _MAX32:
+            zip64.append(size)
+        if csize >= _MAX32:
+            zip64.append(csize)
+        if offset >= _MAX32:
+            zip64.append(offset)
+        central_extra = struct.pack(f"<HH{len(zip64)}Q", 1, 8 * len(zip64), *zip64) if zip64 else b""
+        self._central.append(_CENTRAL.pack(
+            0x02014B50, (3 << 8) | version, version, flags, method, self._time, self._date, crc,
+            min(csize, _MAX32), min(size, _MAX32), len(encoded), len(central_extra), 0, 0, 0,
+            0o100644 << 16, min(offset, _MAX32),
+        ) + encoded + central_extra)
+
+    def close(self) -> None:
+        """
+        Write the remaining entries and the central directory.
+        """
+        if self._closed:
+            return
+        try:
+            self.flush()
+            start = self._offset
+            for record in self._central:
+                self._emit(record)
+            size = self._offset - start
+            count = len(self._central)
+            if count >= _MAX16 or start >= _MAX32 or size >= _MAX32:
+                end64 = self._offset
+                self._emit(_END64.pack(0x06064B50, 44, 45 | (3 << 8), 45, 0, 0, count, count, size, start))
+                self._emit(_LOCATOR64.pack(0x07064B50, 0, end64, 1))
+            self._emit(_END.pack(
+                0x06054B50, 0, 0, min(count, _MAX16), min(count, _MAX16),
+                min(size, _MAX32), min(start, _MAX32), 0,
+            ))
+            if hasattr(self._out, "flush"):
+                self._out.flush()
+        finally:
+            self._closed = True
+            self._pool.shutdown()
+            for entry in self._pending:
+                if entry.release is not None:
+                    entry.release()
+            self._pending.clear()
+            if self._owns_out:
+                self._out.close()
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class _ChunkSink:
+    # Collects written chunks for a generator to hand out; copies each one,
+    # since the writer may release the buffer it came from right after.
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> List[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def iter_bundle(entries: Iterable[Tuple], **options) -> Iterator[bytes]:
+    """
+    Stream a ZIP as chunks of bytes, e.g. for a chunked HTTP response.
+    entries yields (name, data) or (name, data, compress) tuples and is
+    consumed lazily; options are passed to BundleWriter. Chunks are handed
+    out as entries complete, so memory stays bounded by the pending window
+    rather than the archive size.
+    """
+    sink = _ChunkSink()
+    with BundleWriter(sink, **options) as writer:
+        for entry in entries:
+            writer.add(*entry)
+            yield from sink.drain()
+    yield from sink.drain()
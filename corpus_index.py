@@ -0,0 +1,257 @@
+# corpus_index.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from fraud_detector import normalize_minute
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "acroinformer", "corpus.sqlite")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS docs ("
+    " id INTEGER PRIMARY KEY, doc_key TEXT UNIQUE NOT NULL, minute_key TEXT NOT NULL,"
+    " toolkit TEXT NOT NULL, document_id TEXT, producer TEXT NOT NULL, payload TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS docs_minute ON docs(minute_key)",
+    "CREATE INDEX IF NOT EXISTS docs_toolkit ON docs(toolkit)",
+    "CREATE INDEX IF NOT EXISTS docs_document_id ON docs(document_id)",
+    # minute_key -> toolkits seen in that minute, with doc counts
+    "CREATE TABLE IF NOT EXISTS minute_toolkits ("
+    " minute_key TEXT NOT NULL, toolkit TEXT NOT NULL, docs INTEGER NOT NULL,"
+    " PRIMARY KEY (minute_key, toolkit)) WITHOUT ROWID",
+    # DocumentID -> producers, in the order they were first seen
+    "CREATE TABLE IF NOT EXISTS document_producers ("
+    " document_id TEXT NOT NULL, producer TEXT NOT NULL, first_doc INTEGER NOT NULL, docs INTEGER NOT NULL,"
+    " PRIMARY KEY (document_id, producer)) WITHOUT ROWID",
+    # Detected findings, kept so listing them never rescans the corpus
+    "CREATE TABLE IF NOT EXISTS clusters (minute_key TEXT PRIMARY KEY, toolkits INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS overrides ("
+    " id INTEGER PRIMARY KEY, document_id TEXT NOT NULL, original_producer TEXT NOT NULL,"
+    " override_producer TEXT NOT NULL, doc_key TEXT NOT NULL)",
+)
+
+
+def _doc_key(md: Dict[str, Any]) -> str:
+    key = md.get("sha256") or md.get("filename") or md.get("path")
+    if key:
+        return str(key)
+    return hashlib.sha256(json.dumps(md, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _toolkit_value(stored: str) -> Optional[str]:
+    return stored or None
+
+
+class CorpusIndex:
+    """
+    Persistent, incrementally updated index behind detect_mass_fraud and
+    detect_producer_override, for corpora that outgrow one in-memory run.
+
+    Keeps minute_key -> toolkits, DocumentID -> producers and toolkit -> docs
+    in SQLite. Adding a document is a handful of indexed lookups, and it
+    reports any cluster or override it completes at once, so findings
+    spanning batches turn up as files stream in. Queries touch only the keys
+    they ask about, so their cost does not grow with the corpus.
+
+    Documents are the same metadata dicts the fraud_detector functions take
+    (creation_date, xmp_toolkit, document_id, producer, ...), keyed by sha256,
+    filename or path. Re-adding a known key is a no-op.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    # -- insertion -------------------------------------------------------------
+
+    def _add(self, md: Dict[str, Any], doc_key: Optional[str]) -> List[Dict[str, Any]]:
+        conn = self._conn
+        key = doc_key or _doc_key(md)
+        minute_key = normalize_minute(md.get("creation_date") or "")
+        toolkit = md.get("xmp_toolkit") or ""
+        document_id = md.get("document_id") or None
+        producer = md.get("producer") or ""
+
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO docs(doc_key, minute_key, toolkit, document_id, producer, payload)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, minute_key, toolkit, document_id, producer, json.dumps(md, default=str)),
+        )
+        if cur.rowcount == 0:
+            return []
+        doc_id = cur.lastrowid
+        events = []
+
+        new_toolkit = conn.execute(
+            "INSERT OR IGNORE INTO minute_toolkits(minute_key, toolkit, docs) VALUES (?, ?, 0)",
+            (minute_key, toolkit),
+        ).rowcount == 1
+        conn.execute(
+            "UPDATE minute_toolkits SET docs = docs + 1 WHERE minute_key = ? AND toolkit = ?",
+            (minute_key, toolkit),
+        )
+        if new_toolkit:
+            n = conn.execute("SELECT COUNT(*) FROM minute_toolkits WHERE minute_key = ?", (minute_key,)).fetchone()[0]
+            if n > 1:
+                conn.execute("INSERT OR REPLACE INTO clusters(minute_key, toolkits) VALUES (?, ?)", (minute_key, n))
+        in_cluster = conn.execute("SELECT 1 FROM clusters WHERE minute_key = ?", (minute_key,)).fetchone()
+        if in_cluster:
+            events.append({
+                "type": "cluster",
+                "minute_key": minute_key,
+                "toolkit": _toolkit_value(toolkit),
+                "new_toolkit": new_toolkit,
+                "doc_key": key,
+            })
+
+        if document_id:
+            first = conn.execute(
+                "SELECT producer FROM document_producers WHERE document_id = ? ORDER BY first_doc LIMIT 1",
+                (document_id,),
+            ).fetchone()
+            conn.execute(
+                "INSERT OR IGNORE INTO document_producers(document_id, producer, first_doc, docs) VALUES (?, ?, ?, 0)",
+                (document_id, producer, doc_id),
+            )
+            conn.execute(
+                "UPDATE document_producers SET docs = docs + 1 WHERE document_id = ? AND producer = ?",
+                (document_id, producer),
+            )
+            if first is not None and first[0] != producer:
+                conn.execute(
+                    "INSERT INTO overrides(document_id, original_producer, override_producer, doc_key)"
+                    " VALUES (?, ?, ?, ?)",
+                    (document_id, first[0], producer, key),
+                )
+                events.append({
+                    "type": "override",
+                    "document_id": document_id,
+                    "original_producer": first[0],
+                    "override_producer": producer,
+                    "doc_key": key,
+                })
+        return events
+
+    def add(self, md: Dict[str, Any], doc_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Index one document. Returns the findings it triggers: "cluster"
+        events when it lands in a minute with more than one toolkit and
+        "override" events when its DocumentID was seen under another producer.
+        """
+        with self._lock, self._conn:
+            return self._add(md, doc_key)
+
+    def add_many(self, metadatas: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Index a batch of documents in one transaction. Returns all their events.
+        """
+        events = []
+        with self._lock, self._conn:
+            for md in metadatas:
+                events.extend(self._add(md, None))
+        return events
+
+    # -- queries ---------------------------------------------------------------
+
+    def _docs(self, column: str, value: Any, limit: Optional[int]) -> List[Dict[str, Any]]:
+        sql = f"SELECT payload FROM docs WHERE {column} = ? ORDER BY id"
+        params: tuple = (value,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [json.loads(row[0]) for row in self._conn.execute(sql, params)]
+
+    def cluster(self, minute_key: str, include_docs: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        The cluster for one minute_key, shaped like a detect_mass_fraud entry
+        (plus doc_count), or None if that minute holds a single toolkit.
+        """
+        with self._lock:
+            if not self._conn.execute("SELECT 1 FROM clusters WHERE minute_key = ?", (minute_key,)).fetchone():
+                return None
+            rows = self._conn.execute(
+                "SELECT toolkit, docs FROM minute_toolkits WHERE minute_key = ?", (minute_key,)
+            ).fetchall()
+            entry = {
+                "minute_key": minute_key,
+                "toolkit_values": sorted((_toolkit_value(t) for t, _ in rows), key=lambda v: v or ""),
+                "doc_count": sum(n for _, n in rows),
+            }
+            if include_docs:
+                entry["docs"] = self._docs("minute_key", minute_key, None)
+        return entry
+
+    def clusters(self, include_docs: bool = False) -> List[Dict[str, Any]]:
+        """
+        Every cluster found so far, in detect_mass_fraud's format; docs are
+        only loaded with include_docs=True.
+        """
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute("SELECT minute_key FROM clusters ORDER BY minute_key")]
+        return [self.cluster(key, include_docs) for key in keys]
+
+    def overrides(self) -> List[Dict[str, Any]]:
+        """
+        Every producer override found so far, in detect_producer_override's format.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT document_id, original_producer, override_producer FROM overrides ORDER BY id"
+            ).fetchall()
+        return [
+            {"document_id": d, "original_producer": o, "override_producer": p}
+            for d, o, p in rows
+        ]
+
+    def producers(self, document_id: str) -> List[str]:
+        """
+        Producers seen for a DocumentID, first-seen first.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT producer FROM document_producers WHERE document_id = ? ORDER BY first_doc", (document_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def docs_for_toolkit(self, toolkit: Optional[str], limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._docs("toolkit", toolkit or "", limit)
+
+    def docs_for_minute(self, minute_key: str, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._docs("minute_key", minute_key, limit)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count = lambda table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            return {
+                "docs": count("docs"),
+                "minute_keys": self._conn.execute("SELECT COUNT(DISTINCT minute_key) FROM minute_toolkits").fetchone()[0],
+                "document_ids": self._conn.execute(
+                    "SELECT COUNT(DISTINCT document_id) FROM document_producers"
+                ).fetchone()[0],
+                "clusters": count("clusters"),
+                "overrides": count("overrides"),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
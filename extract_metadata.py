@@ -1,16 +1,22 @@
-from PyPDF2 import PdfReader
-from lxml import etree
 import re
+from revision_analyzer import RevisionHistory
+from signature_verifier import verify_signatures
+from utils.parsed_pdf import as_parsed_pdf
 
-def extract_metadata(file_path, file_bytes):
-    reader = PdfReader(file_path)
-    info = reader.metadata or {}
+def extract_metadata(file_path, file_bytes=None):
+    """
+    file_path may be a path or a shared ParsedPdf context.
+    """
+    pdf = as_parsed_pdf(file_path)
+    reader = pdf.reader
+    info = pdf.metadata or {}
     raw_xmp = reader.xmp_metadata
     xmp_toolkit = None
 
     # Attempt to parse XMP
     if raw_xmp:
         try:
+            from lxml import etree
             xml_root = etree.fromstring(raw_xmp)
             toolkit_el = xml_root.find(".//{adobe:ns:meta/}xmpmeta//{http://ns.adobe.com/xap/1.0/}Toolkit")
             if toolkit_el is not None:
@@ -19,18 +25,10 @@ def extract_metadata(file_path, file_bytes):
             xmp_toolkit = None
 
     # Detect form fields and signature fields
-    has_acroform = "/AcroForm" in reader.trailer["/Root"]
-    has_signature_field = False
-    if has_acroform:
-        acroform = reader.trailer["/Root"]["/AcroForm"]
-        fields = acroform.get("/Fields", [])
-        for field in fields:
-            try:
-                if "/Sig" in field.get_object().get("/FT", ""):
-                    has_signature_field = True
-                    break
-            except Exception:
-                continue
+    root = pdf.root
+    has_acroform = "/AcroForm" in root
+    # any field (top-level or kid) of type /Sig, from the object inventory
+    has_signature_field = has_acroform and bool(pdf.inventory.signature_fields().size)
 
     # Detect producer and creator
     producer = info.get("/Producer", None)
@@ -39,6 +37,19 @@ def extract_metadata(file_path, file_bytes):
     creation_date = info.get("/CreationDate", None)
     mod_date = info.get("/ModDate", None)
 
+    # Incremental saves, read from the xref chain alone
+    try:
+        history = RevisionHistory(pdf.data, pdf.xref_chain)
+        incremental_updates = history.incremental_updates
+        redefined_objects = history.redefined_objects
+    except Exception:
+        incremental_updates = redefined_objects = None
+
+    # Content saved after the newest signature
+    verified = verify_signatures(pdf)
+    signature_count = len(verified["signatures"])
+    modified_after_signing = verified["modified_after_signing"]
+
     # Flag possible tampering
     tamper_risk = None
     if creation_date and mod_date and creation_date != mod_date:
@@ -55,5 +66,9 @@ def extract_metadata(file_path, file_bytes):
         "mod_date": mod_date,
         "has_acroform": has_acroform,
         "has_signature_field": has_signature_field,
+        "incremental_updates": incremental_updates,
+        "redefined_objects": redefined_objects,
+        "signature_count": signature_count,
+        "modified_after_signing": modified_after_signing,
         "tamper_risk": tamper_risk,
     }
\ No newline at end of file
@@ -1,8 +1,56 @@
 # fraud_detector.py
 
+import calendar
 import re
-from collections import defaultdict
-from typing import List, Dict, Any
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Dict, Any, Deque, Iterable, Iterator, Optional, Tuple
+
+_PDF_DATE = re.compile(
+    r"(?:D:)?(\d{4})(\d{2})?(\d{2})?(\d{2})?(\d{2})?(\d{2})?"
+    r"\s*(?:(Z)|([+-])(\d{2})'?(?:(\d{2})'?)?)?"
+)
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?$")
+
+@lru_cache(maxsize=65536)
+def _day_epoch(year: int, month: int, day: int) -> Optional[int]:
+    # Corpora span few distinct days; cache their midnight instead of
+    # building a datetime per document.
+    if year < 1 or not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None
+    return calendar.timegm((year, month, day, 0, 0, 0))
+
+def parse_pdf_date(value: str) -> Optional[int]:
+    """
+    Parse a PDF date (D:YYYYMMDDHHmmSSOHH'mm', any trailing part optional)
+    or an ISO-8601 timestamp into UTC epoch seconds.
+    Dates without an offset are taken as UTC. Returns None if unparseable.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value[4:5] == "-" and _ISO_DATE.match(value):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+    m = _PDF_DATE.match(value)
+    if not m:
+        return None
+    year, month, day, hour, minute, second, _, sign, off_h, off_m = m.groups()
+    hour, minute, second = int(hour or 0), int(minute or 0), int(second or 0)
+    day_start = _day_epoch(int(year), int(month or 1), int(day or 1))
+    if day_start is None or hour > 23 or minute > 59 or second > 60:
+        return None
+    epoch = day_start + hour * 3600 + minute * 60 + second
+    if sign:
+        offset = int(off_h) * 3600 + int(off_m or 0) * 60
+        epoch -= offset if sign == "+" else -offset
+    return epoch
 
 def normalize_minute(creation_date: str) -> str:
     """
@@ -17,12 +65,93 @@ def normalize_minute(creation_date: str) -> str:
         return "".join(m2.groups())       # YYYYMMDDHHMM
     return (creation_date or "").replace("-", "").replace(":", "")[:12]
 
-def detect_mass_fraud(metadatas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _toolkit_cluster(docs: List[Dict[str, Any]], stamps: List[int]) -> Optional[Dict[str, Any]]:
+    tk_values = {doc.get("xmp_toolkit") for doc in docs}
+    if len(docs) < 2 or len(tk_values) < 2:
+        return None
+    return {
+        "minute_key": normalize_minute(docs[0].get("creation_date", "")),
+        "start": stamps[0],
+        "end": stamps[-1],
+        "toolkit_values": sorted(tk_values, key=lambda v: v or ""),
+        "docs": docs,
+    }
+
+def iter_time_clusters(
+    metadatas: Iterable[Dict[str, Any]],
+    window_seconds: int = 60,
+    presorted: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Sliding-window variant of detect_mass_fraud.
+
+    Creation dates are parsed once into timezone-normalised epoch seconds and
+    swept in time order with a two-pointer window: every maximal run of
+    documents no more than window_seconds apart from first to last is
+    checked, so 10:59:59 and 11:00:01 are grouped even though their minute
+    keys differ, wherever the surrounding documents fall. Windows holding
+    more than one XMP toolkit value are merged while they overlap and each
+    merged cluster is yielded as soon as the sweep moves past it.
+    O(n log n) for the sort, linear after. With presorted=True the input
+    must already be in creation-date order and is consumed as a stream.
+    Documents without a parseable CreationDate are skipped.
+    Yields { minute_key, start, end, toolkit_values, docs }.
+    """
+    stamped = ((parse_pdf_date(md.get("creation_date", "")), md) for md in metadatas)
+    stamped = ((ts, md) for ts, md in stamped if ts is not None)
+    if not presorted:
+        stamped = sorted(stamped, key=lambda pair: pair[0])
+
+    window: Deque[Tuple[int, int, Dict[str, Any]]] = deque()  # (index, ts, md)
+    toolkits: Counter = Counter()
+    docs: List[Dict[str, Any]] = []    # merged cluster under construction
+    stamps: List[int] = []
+    last = -1                          # index of its last document
+
+    def close_window():
+        nonlocal last
+        if len(toolkits) < 2:
+            return
+        # overlapping windows extend the open cluster
+        for index, ts, md in window:
+            if index > last:
+                docs.append(md)
+                stamps.append(ts)
+        last = window[-1][0]
+
+    for index, (ts, md) in enumerate(stamped):
+        if window and ts - window[0][1] > window_seconds:
+            # the window cannot grow without dropping its first document
+            close_window()
+            while window and ts - window[0][1] > window_seconds:
+                _, _, old = window.popleft()
+                tk = old.get("xmp_toolkit")
+                toolkits[tk] -= 1
+                if not toolkits[tk]:
+                    del toolkits[tk]
+            if docs and (not window or window[0][0] > last):
+                yield _toolkit_cluster(list(docs), list(stamps))
+                docs.clear()
+                stamps.clear()
+        window.append((index, ts, md))
+        toolkits[md.get("xmp_toolkit")] += 1
+    if window:
+        close_window()
+    if docs:
+        yield _toolkit_cluster(docs, stamps)
+
+def detect_mass_fraud(metadatas: List[Dict[str, Any]], window_seconds: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Identify clusters of PDFs produced in the same minute_key but
     carrying differing XMP toolkit values.
     Returns list of { minute_key, toolkit_values, docs }.
+    With window_seconds set, clusters come from iter_time_clusters instead
+    of exact minute buckets (and also carry start/end epoch seconds).
+    For corpora spanning many runs see corpus_index.CorpusIndex.
     """
+    if window_seconds is not None:
+        return list(iter_time_clusters(metadatas, window_seconds))
+
     groups = defaultdict(list)
     for md in metadatas:
         key = normalize_minute(md.get("creation_date", ""))
@@ -36,7 +165,8 @@ def detect_mass_fraud(metadatas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         if len(tk_values) > 1:
             fraud.append({
                 "minute_key": minute_key,
-                "toolkit_values": sorted(tk_values),
+                # documents without XMP carry None; sort it first
+                "toolkit_values": sorted(tk_values, key=lambda v: v or ""),
                 "docs": docs
             })
     return fraud
@@ -1,44 +1,66 @@
 # hidden_text.py
 
+import importlib
 import re
-from typing import List
-from PyPDF2 import PdfReader
+from typing import List, Optional
 from utils.xml_utils import parse_xmp_toolkit
+from utils.content_interpreter import scan_invisible_text
+from utils.parsed_pdf import ParsedPdf, as_parsed_pdf
 
-# These imports assume you’ve placed the kukatwo modules under kukatwo/
-from kukatwo.ascii85_stream_reconstructor import reconstruct_ascii85
-from kukatwo.hidden_layer_scanner import scan_invisible_text
-from kukatwo.unicode_mapper import map_zero_width
-from kukatwo.hidden_struct_scanner import scan_struct_tree
-from kukatwo.suppression_detector import detect_suppression_patterns
+def _optional(module: str, name: str):
+    # The kukatwo scanners are installed separately (under kukatwo/); a
+    # missing one only skips its step.
+    try:
+        return getattr(importlib.import_module(module), name)
+    except ImportError:
+        return None
 
-def extract_hidden_text(file_path: str, file_bytes: bytes) -> List[str]:
+reconstruct_ascii85 = _optional("kukatwo.ascii85_stream_reconstructor", "reconstruct_ascii85")
+map_zero_width = _optional("kukatwo.unicode_mapper", "map_zero_width")
+scan_struct_tree = _optional("kukatwo.hidden_struct_scanner", "scan_struct_tree")
+detect_suppression_patterns = _optional("kukatwo.suppression_detector", "detect_suppression_patterns")
+
+def extract_hidden_text(file_path, file_bytes: Optional[bytes] = None) -> List[str]:
     """
     Recover any hidden text fragments via multiple forensic methods.
+    file_path may also be a shared ParsedPdf context; file_bytes defaults to its data.
+    Steps whose kukatwo module is not installed are skipped.
     Returns a deduplicated list of strings.
     """
-    reader = PdfReader(file_path)
-    fragments = []
+    owns_context = not isinstance(file_path, ParsedPdf)
+    pdf = as_parsed_pdf(file_path)
+    try:
+        if file_bytes is None:
+            file_bytes = pdf.data
+        fragments = []
 
-    # 1) Reconstruct ASCII85 fragments from page streams
-    for page in reader.pages:
-        try:
-            raw = page.get("/Contents").get_object().get_data()
-            fragments.extend(reconstruct_ascii85(raw))
-        except Exception:
-            continue
+        # 1) Reconstruct ASCII85 fragments from page streams
+        if reconstruct_ascii85 is not None:
+            for page in pdf.pages:
+                try:
+                    raw = pdf.stream_data(page.get("/Contents"))
+                    fragments.extend(reconstruct_ascii85(raw))
+                except Exception:
+                    continue
 
-    # 2) Scan for invisible/off-page text
-    fragments.extend(scan_invisible_text(file_bytes))
+        # 2) Invisible, off-page, clipped, white and covered text, from the
+        #    content-stream interpreter over the shared context
+        fragments.extend(scan_invisible_text(pdf))
 
-    # 3) Map zero-width & homoglyph Unicode tricks
-    fragments.extend(map_zero_width(file_bytes))
+        # 3) Map zero-width & homoglyph Unicode tricks
+        if map_zero_width is not None:
+            fragments.extend(map_zero_width(file_bytes))
 
-    # 4) Walk StructTreeRoot/XFA for suppressed content
-    fragments.extend(scan_struct_tree(reader))
+        # 4) Walk StructTreeRoot/XFA for suppressed content
+        if scan_struct_tree is not None:
+            fragments.extend(scan_struct_tree(pdf.reader))
 
-    # 5) Known suppression patterns (ligatures, decoys)
-    fragments.extend(detect_suppression_patterns(reader))
+        # 5) Known suppression patterns (ligatures, decoys)
+        if detect_suppression_patterns is not None:
+            fragments.extend(detect_suppression_patterns(pdf.reader))
+    finally:
+        if owns_context:
+            pdf.close()
 
     # Deduplicate while preserving order
     seen = set()
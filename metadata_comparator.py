@@ -1,6 +1,10 @@
 # metadata_comparator.py
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Hashable, Optional, Sequence
+
+import numpy as np
+
+MISSING = -1
 
 def compare_metadata(md1: Dict[str, Any], md2: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -18,4 +22,111 @@ def compare_metadata(md1: Dict[str, Any], md2: Dict[str, Any]) -> List[Dict[str,
             "file2":    str(v2),
             "mismatch": v1 != v2
         })
-    return rows
\ No newline at end of file
+    return rows
+
+def _intern_key(value: Any) -> Hashable:
+    # Unhashable values (lists, dicts) are interned by their repr.
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("__repr__", repr(value))
+
+class MetadataTable:
+    """
+    Columnar view of N metadata dicts for bulk comparison.
+
+    Every field becomes an int32 column of interned category codes:
+    codes[i, j] is the index of document i's value for fields[j] in
+    categories[j], or MISSING (-1) when the field is absent or None, which
+    compare_metadata also treats as equal. Comparisons then run on the
+    code matrix in NumPy instead of one Python call per document pair.
+    """
+
+    def __init__(self, metadatas: Sequence[Dict[str, Any]], names: Optional[Sequence[str]] = None):
+        self.names = list(names) if names is not None else [str(i) for i in range(len(metadatas))]
+        self.fields = sorted(set().union(*metadatas)) if metadatas else []
+        self.categories: List[List[Any]] = []
+        self.codes = np.full((len(metadatas), len(self.fields)), MISSING, dtype=np.int32)
+        for j, field in enumerate(self.fields):
+            lookup: Dict[Hashable, int] = {}
+            values: List[Any] = []
+            column = self.codes[:, j]
+            for i, md in enumerate(metadatas):
+                value = md.get(field)
+                if value is None:
+                    continue
+                key = _intern_key(value)
+                code = lookup.get(key)
+                if code is None:
+                    code = lookup[key] = len(values)
+                    values.append(value)
+                column[i] = code
+            self.categories.append(values)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def value(self, i: int, j: int) -> Any:
+        code = self.codes[i, j]
+        return None if code == MISSING else self.categories[j][code]
+
+    def pairwise_mismatches(self, fields: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        N x N matrix: number of fields on which documents i and j differ.
+        """
+        columns = [self.fields.index(f) for f in fields] if fields is not None else range(len(self.fields))
+        n = len(self.names)
+        counts = np.zeros((n, n), dtype=np.int32)
+        for j in columns:
+            column = self.codes[:, j]
+            counts += column[:, None] != column[None, :]
+        return counts
+
+    def field_mismatches(self) -> np.ndarray:
+        """
+        N x field boolean matrix: True where a document's value differs from
+        the most common value of that field across the batch.
+        """
+        return self.codes != self._modes()[None, :]
+
+    def _modes(self) -> np.ndarray:
+        modes = np.empty(len(self.fields), dtype=np.int32)
+        for j in range(len(self.fields)):
+            counts = np.bincount(self.codes[:, j] + 1, minlength=1)  # shift MISSING to 0
+            modes[j] = int(counts.argmax()) - 1
+        return modes
+
+    def cardinality(self) -> List[Dict[str, Any]]:
+        """
+        Per-field summary: { field, distinct, missing, most_common, most_common_count }.
+        """
+        summary = []
+        for j, field in enumerate(self.fields):
+            counts = np.bincount(self.codes[:, j] + 1, minlength=len(self.categories[j]) + 1)
+            mode = int(counts.argmax()) - 1
+            summary.append({
+                "field": field,
+                "distinct": len(self.categories[j]),
+                "missing": int(counts[0]),
+                "most_common": None if mode == MISSING else self.categories[j][mode],
+                "most_common_count": int(counts.max()) if len(counts) else 0,
+            })
+        return summary
+
+def compare_batch(metadatas: Sequence[Dict[str, Any]], names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Bulk counterpart of compare_metadata for a batch of documents (e.g. all
+    recordings from one filer).
+    Returns { names, fields, pairwise (N x N mismatch counts),
+    field_mismatch (N x field, differs from the batch's most common value),
+    cardinality (per-field summary) }.
+    """
+    table = MetadataTable(metadatas, names)
+    return {
+        "names": table.names,
+        "fields": table.fields,
+        "pairwise": table.pairwise_mismatches(),
+        "field_mismatch": table.field_mismatches(),
+        "cardinality": table.cardinality(),
+    }
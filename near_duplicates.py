@@ -0,0 +1,231 @@
+# near_duplicates.py
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from utils.pdf_objects import parse_dictionary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "acroinformer", "near_duplicates.sqlite")
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: pairs above ~0.7 Jaccard almost always share a band
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_CHUNK = 4096
+
+_WORD = re.compile(r"\w+")
+_OBJ_DICT = re.compile(rb"\d+\s+\d+\s+obj\s*(?=<<)")
+_STRUCTURE_KEYS = ("/Type", "/Subtype", "/FT", "/S", "/Filter")
+
+
+# -- shingles ----------------------------------------------------------------
+
+def text_shingles(text: str, k: int = 5) -> Set[str]:
+    """
+    Word k-grams of the lower-cased text. Returns a set of strings.
+    """
+    words = _WORD.findall((text or "").lower())
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def _object_token(dictionary: Dict[str, Any]) -> str:
+    parts = []
+    for key in _STRUCTURE_KEYS:
+        value = dictionary.get(key)
+        if isinstance(value, str):
+            parts.append(f"{key}{value}")
+    parts.append(",".join(sorted(dictionary)))
+    return "|".join(parts)
+
+
+def structure_shingles(data: bytes, k: int = 3) -> Set[str]:
+    """
+    Shingles over the file's object layout: each top-level dictionary object
+    becomes a token of its /Type, /Subtype, /FT, /S, /Filter and key names,
+    and runs of k tokens in file order form the shingles. Values such as
+    names, amounts or dates do not enter, so swapping a grantor keeps the
+    structure identical. Returns a set of strings prefixed "s:".
+    """
+    tokens = [_object_token(parse_dictionary(data, m.end())) for m in _OBJ_DICT.finditer(data)]
+    shingles = {"s:" + t for t in tokens}
+    shingles.update("s:" + "\n".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1))
+    return shingles
+
+
+def document_shingles(result: Dict[str, Any], data: Optional[bytes] = None) -> Set[str]:
+    """
+    Shingles for one decode_pdf result: text shingles of its decoded_text,
+    plus structure shingles when the raw file bytes are given.
+    """
+    shingles = {"t:" + s for s in text_shingles(result.get("decoded_text", ""))}
+    if data is not None:
+        shingles |= structure_shingles(data)
+    return shingles
+
+
+# -- MinHash -----------------------------------------------------------------
+
+class MinHasher:
+    """
+    MinHash signatures with NUM_PERM universal hash functions
+    h(x) = (a*x + b) mod (2^61 - 1), evaluated for all shingles at once in
+    NumPy. Shingles are first reduced to 32-bit CRCs so signatures are
+    stable across processes and runs.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # a < 2^29 and x < 2^32 keep a*x + b inside uint64
+        self._a = rng.integers(1, 1 << 29, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: Iterable[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+        sig = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        for i in range(0, len(hashes), _CHUNK):
+            chunk = hashes[i:i + _CHUNK]
+            values = (self._a[:, None] * chunk[None, :] + self._b[:, None]) % _MERSENNE & _MAX_HASH
+            np.minimum(sig, values.min(axis=1), out=sig)
+        return sig.astype(np.uint32)
+
+
+def estimate_similarity(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """
+    Estimated Jaccard similarity of the two shingle sets.
+    """
+    return float(np.count_nonzero(sig1 == sig2)) / len(sig1)
+
+
+def _band_keys(sig: np.ndarray, bands: int) -> List[int]:
+    rows = len(sig) // bands
+    return [
+        int.from_bytes(hashlib.blake2b(sig[i * rows:(i + 1) * rows].tobytes(), digest_size=8).digest(), "big", signed=True)
+        for i in range(bands)
+    ]
+
+
+# -- index -------------------------------------------------------------------
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index of document shingle sets.
+
+    Each signature is cut into BANDS bands and every band is hashed to a
+    bucket in SQLite. A query only compares against documents sharing at
+    least one bucket, so matching a new file against hundreds of
+    thousands of earlier ones costs a few indexed lookups plus a
+    signature comparison per candidate, not a pass over the corpus.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.bands = bands
+        self.hasher = MinHasher(num_perm)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, doc_key TEXT UNIQUE NOT NULL,"
+            " signature BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket INTEGER NOT NULL,"
+            " doc INTEGER NOT NULL, PRIMARY KEY (band, bucket, doc)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def signature(self, shingles: Iterable[str]) -> np.ndarray:
+        return self.hasher.signature(shingles)
+
+    def _query(self, sig: np.ndarray, threshold: float, limit: Optional[int]) -> List[Dict[str, Any]]:
+        candidates = set()
+        for band, bucket in enumerate(_band_keys(sig, self.bands)):
+            candidates.update(
+                row[0] for row in self._conn.execute(
+                    "SELECT doc FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)
+                )
+            )
+        matches = []
+        for doc in candidates:
+            doc_key, blob = self._conn.execute("SELECT doc_key, signature FROM docs WHERE id = ?", (doc,)).fetchone()
+            similarity = estimate_similarity(sig, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= threshold:
+                matches.append({"doc_key": doc_key, "similarity": round(similarity, 4)})
+        matches.sort(key=lambda m: (-m["similarity"], m["doc_key"]))
+        return matches[:limit] if limit else matches
+
+    def query(self, shingles: Iterable[str], threshold: float = 0.7, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """
+        Indexed documents whose estimated Jaccard similarity to the shingle
+        set is at least threshold, best first: [{ doc_key, similarity }].
+        An empty shingle set matches nothing.
+        """
+        shingles = set(shingles)
+        if not shingles:
+            return []
+        sig = self.signature(shingles)
+        with self._lock:
+            return self._query(sig, threshold, limit)
+
+    def add(
+        self,
+        doc_key: str,
+        shingles: Iterable[str],
+        threshold: float = 0.7,
+        limit: Optional[int] = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Match a document against the index, then add it. Returns its
+        near-duplicates among earlier documents (see query). Re-adding a
+        known doc_key only queries. A document without shingles (no text
+        and no structure) is neither matched nor indexed: its signature
+        would be all _MAX_HASH and collide with every other empty one.
+        """
+        shingles = set(shingles)
+        if not shingles:
+            return []
+        sig = self.signature(shingles)
+        with self._lock, self._conn:
+            matches = [m for m in self._query(sig, threshold, None) if m["doc_key"] != doc_key]
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO docs(doc_key, signature) VALUES (?, ?)", (doc_key, sig.tobytes())
+            )
+            if cur.rowcount:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO buckets(band, bucket, doc) VALUES (?, ?, ?)",
+                    [(band, bucket, cur.lastrowid) for band, bucket in enumerate(_band_keys(sig, self.bands))],
+                )
+        return matches[:limit] if limit else matches
+
+    def add_result(self, doc_key: str, result: Dict[str, Any], data: Optional[bytes] = None, **kwargs) -> List[Dict[str, Any]]:
+        """
+        add() for a decode_pdf result (and optionally the raw file bytes).
+        """
+        return self.add(doc_key, document_shingles(result, data), **kwargs)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,23 +1,40 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib import colors
 import hashlib
 import os
 import datetime
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Documents per shard in generate_affidavit_sharded.
+SHARD_SIZE = 50
+
+
+def _report_flowables(now, items, with_header=True, anchors=None):
+    # The story of the audit report: the title block, then one section per
+    # document, each ending in a page break. anchors, if given, collects
+    # (filename, page) as each section starts on the page.
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, Spacer, PageBreak
+    from reportlab.platypus.flowables import CallerMacro
+    from reportlab.lib import colors
 
-def generate_affidavit(report_data, output_path):
-    doc = SimpleDocTemplate(output_path, pagesize=letter)
     styles = getSampleStyleSheet()
     flow = []
 
-    now = datetime.datetime.now().strftime("%B %d, %Y %H:%M")
-
-    flow.append(Paragraph("<b>Forensic Audit Report</b>", styles["Title"]))
-    flow.append(Paragraph(f"<b>Date:</b> {now}", styles["Normal"]))
-    flow.append(Spacer(1, 12))
+    if with_header:
+        flow.append(Paragraph("<b>Forensic Audit Report</b>", styles["Title"]))
+        flow.append(Paragraph(f"<b>Date:</b> {now}", styles["Normal"]))
+        flow.append(Spacer(1, 12))
 
-    for item in report_data:
+    for item in items:
+        if anchors is not None:
+            # zero-size marker, drawn on the page the section starts on
+            flow.append(CallerMacro(
+                lambda macro, name=item["filename"]: anchors.append((name, macro.canv.getPageNumber()))
+            ))
         flow.append(Paragraph(f"<b>Filename:</b> {item['filename']}", styles["Heading2"]))
         flow.append(Paragraph(f"<b>SHA-256:</b> {item['sha256']}", styles["Code"]))
         flow.append(Spacer(1, 6))
@@ -52,5 +69,122 @@ def generate_affidavit(report_data, output_path):
 
         flow.append(PageBreak())
 
-    doc.build(flow)
-    return output_path
\ No newline at end of file
+    return flow
+
+
+def generate_affidavit(report_data, output_path):
+    # reportlab is only loaded when a report is actually written
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+
+    doc = SimpleDocTemplate(output_path, pagesize=letter)
+    now = datetime.datetime.now().strftime("%B %d, %Y %H:%M")
+    doc.build(_report_flowables(now, report_data))
+    return output_path
+
+
+def _render_shard(items, output_path, now, with_header) -> Tuple[str, int, List[Tuple[str, int]]]:
+    # Worker entry point: one shard of the report to its own PDF.
+    # Returns (path, page count, [(filename, first page in shard)]).
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+
+    anchors: List[Tuple[str, int]] = []
+    doc = SimpleDocTemplate(output_path, pagesize=letter)
+    doc.build(_report_flowables(now, items, with_header=with_header, anchors=anchors))
+    return output_path, doc.page, anchors
+
+
+def _iter_shards(report_data: Iterable[Dict[str, Any]], shard_size: int):
+    it = iter(report_data)
+    first = True
+    while True:
+        shard = list(islice(it, shard_size))
+        if not shard and not first:
+            return
+        yield shard
+        first = False
+
+
+def _merge_shards(shards: List[Tuple[str, int, List[Tuple[str, int]]]], output_path: str) -> None:
+    import fitz  # PyMuPDF
+
+    toc = []
+    offset = 0
+    with fitz.open() as merged:
+        for path, pages, anchors in shards:
+            with fitz.open(path) as part:
+                merged.insert_pdf(part)
+            toc.extend([1, name, offset + page] for name, page in anchors)
+            offset += pages
+        merged.set_toc(toc)
+        merged.save(output_path, garbage=1, deflate=True)
+
+
+def _write_index(shards: List[Tuple[str, int, List[Tuple[str, int]]]], output_path: str, now: str) -> None:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+
+    styles = getSampleStyleSheet()
+    rows = [["#", "Filename", "Part", "Page"]]
+    for path, _, anchors in shards:
+        for name, page in anchors:
+            rows.append([str(len(rows)), name, os.path.basename(path), str(page)])
+    flow = [
+        Paragraph("<b>Forensic Audit Report – Index</b>", styles["Title"]),
+        Paragraph(f"<b>Date:</b> {now}", styles["Normal"]),
+        Spacer(1, 12),
+        Table(rows, repeatRows=1, hAlign="LEFT"),
+    ]
+    SimpleDocTemplate(output_path, pagesize=letter).build(flow)
+
+
+def generate_affidavit_sharded(
+    report_data: Iterable[Dict[str, Any]],
+    output_path: str,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+    merge: bool = True,
+    max_in_flight: Optional[int] = None,
+):
+    """
+    generate_affidavit for large batches. Documents are rendered in shards
+    of shard_size on a process pool, each shard to its own PDF, so no
+    process ever holds more than one shard's flowables. report_data may be
+    a generator; at most max_in_flight shards (default 2x workers) are
+    pending at any time.
+
+    With merge the shards are concatenated into output_path, with an
+    outline entry per document. Without it, the shards are kept next to
+    output_path as <stem>_partNNNN.pdf and output_path becomes an index
+    listing every document's part and page.
+    Returns output_path.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    now = datetime.datetime.now().strftime("%B %d, %Y %H:%M")
+    stem = os.path.splitext(output_path)[0]
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    shard_dir = tempfile.mkdtemp(prefix=".report_shards_", dir=out_dir) if merge else out_dir
+
+    done: List[Tuple[str, int, List[Tuple[str, int]]]] = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for index, shard in enumerate(_iter_shards(report_data, shard_size)):
+                name = f"part{index:04d}.pdf" if merge else f"{os.path.basename(stem)}_part{index:04d}.pdf"
+                pending.append(pool.submit(_render_shard, shard, os.path.join(shard_dir, name), now, index == 0))
+                while len(pending) >= max_in_flight:
+                    done.append(pending.popleft().result())
+            while pending:
+                done.append(pending.popleft().result())
+
+        if merge:
+            _merge_shards(done, output_path)
+        else:
+            _write_index(done, output_path, now)
+    finally:
+        if merge:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+    return output_path
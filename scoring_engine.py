@@ -2,14 +2,275 @@
 
 import json
 import logging
-from typing import Dict, Any
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# NumPy is imported by the batch path only: single-record scoring, and the
+# workers and entry points that import this module, never load it.
 
 logger = logging.getLogger(__name__)
 
+# The five checks this engine used to hardcode, keyed by their weight name.
+# A rules file that only holds weights (the original format) gets these.
+DEFAULT_RULES = [
+    {
+        "id": "timestamp_mismatch",
+        "flag": "Timestamp mismatch",
+        "when": {"all": [
+            {"field": "creation_date", "op": "truthy"},
+            {"field": "mod_date", "op": "truthy"},
+            {"field": "creation_date", "op": "ne_field", "value": "mod_date"},
+        ]},
+    },
+    {
+        "id": "acroform_without_signature",
+        "flag": "AcroForm without cryptographic signature",
+        "when": {"all": [
+            {"field": "has_acroform", "op": "truthy"},
+            {"field": "has_signature_field", "op": "falsy"},
+        ]},
+    },
+    {
+        "id": "signature_overlay",
+        "flag": "Signature overlay detected",
+        "when": {"field": "signature_overlay_detected", "op": "truthy"},
+    },
+    {
+        "id": "missing_xmp_toolkit",
+        "flag": "Missing XMP toolkit",
+        "when": {"field": "xmp_toolkit", "op": "falsy"},
+    },
+    {
+        "id": "hidden_lib_usage",
+        "flag": "Programmatic manipulation detected (hidden PDF library)",
+        "when": {"field": "hidden_lib_usage", "op": "truthy"},
+    },
+]
+
+# How often (seconds) a hot-reloading engine stats the rules file.
+RELOAD_CHECK_INTERVAL = 1.0
+
+
+class RuleError(ValueError):
+    pass
+
+
+# -- predicate compilation ------------------------------------------------------
+# Every predicate compiles to a pair: a per-record function md -> bool and a
+# columnar function columns -> bool array, where columns(field) returns the
+# field's values across the batch as a NumPy object array.
+
+def _truthy(values: "np.ndarray") -> "np.ndarray":
+    # object -> bool casts apply Python truthiness in C
+    return values.astype(bool)
+
+
+def _bools(test, values: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+    return np.fromiter((test(v) for v in values), dtype=bool, count=len(values))
+
+
+def _compile_leaf(spec: Dict[str, Any]):
+    field = spec["field"]
+    op = spec.get("op", "truthy")
+    value = spec.get("value")
+
+    if op == "truthy":
+        return (lambda md: bool(md.get(field))), (lambda cols: _truthy(cols(field)))
+    if op == "falsy":
+        return (lambda md: not md.get(field)), (lambda cols: ~_truthy(cols(field)))
+    if op == "exists":
+        return (lambda md: md.get(field) is not None), (lambda cols: cols(field) != None)  # noqa: E711
+    if op == "missing":
+        return (lambda md: md.get(field) is None), (lambda cols: cols(field) == None)  # noqa: E711
+    if op == "eq":
+        return (lambda md: md.get(field) == value), (lambda cols: cols(field) == value)
+    if op == "ne":
+        return (lambda md: md.get(field) != value), (lambda cols: cols(field) != value)
+    if op == "ne_field":
+        return (lambda md: md.get(field) != md.get(value)), (lambda cols: cols(field) != cols(value))
+    if op == "eq_field":
+        return (lambda md: md.get(field) == md.get(value)), (lambda cols: cols(field) == cols(value))
+    if op == "in":
+        options = set(value)
+        return (
+            (lambda md: md.get(field) in options),
+            (lambda cols: _bools(options.__contains__, cols(field))),
+        )
+    if op == "regex":
+        pattern = re.compile(value, re.IGNORECASE if spec.get("ignorecase") else 0)
+
+        def match(v) -> bool:
+            return v is not None and pattern.search(str(v)) is not None
+
+        return (
+            (lambda md: match(md.get(field))),
+            (lambda cols: _bools(match, cols(field))),
+        )
+    if op in ("gt", "ge", "lt", "le"):
+        compare = {
+            "gt": lambda a, b: a > b, "ge": lambda a, b: a >= b,
+            "lt": lambda a, b: a < b, "le": lambda a, b: a <= b,
+        }[op]
+
+        def check(v) -> bool:
+            try:
+                return v is not None and compare(float(v), value)
+            except (TypeError, ValueError):
+                return False
+
+        return (
+            (lambda md: check(md.get(field))),
+            (lambda cols: _bools(check, cols(field))),
+        )
+    raise RuleError(f"unknown operator {op!r} in rule predicate {spec}")
+
+
+def compile_predicate(spec: Dict[str, Any]):
+    """
+    Compile a declarative predicate into (record_fn, column_fn).
+
+    A predicate is a leaf {"field", "op", "value"?} or a combinator
+    {"all": [...]}, {"any": [...]}, {"not": {...}}. Leaf operators:
+    truthy, falsy, exists, missing, eq, ne, in, regex (with optional
+    "ignorecase"), gt/ge/lt/le (numeric threshold), eq_field/ne_field
+    (compare with the field named in "value").
+    """
+    if not isinstance(spec, dict):
+        raise RuleError(f"rule predicate must be an object, got {spec!r}")
+    if "all" in spec or "any" in spec:
+        combine_all = "all" in spec
+        parts = [compile_predicate(p) for p in spec["all" if combine_all else "any"]]
+        record_fns = [p[0] for p in parts]
+        column_fns = [p[1] for p in parts]
+        if combine_all:
+            def record(md):
+                return all(f(md) for f in record_fns)
+
+            def columns(cols):
+                import numpy as np
+                mask = np.ones(cols.size, dtype=bool)
+                for f in column_fns:
+                    mask &= f(cols)
+                return mask
+        else:
+            def record(md):
+                return any(f(md) for f in record_fns)
+
+            def columns(cols):
+                import numpy as np
+                mask = np.zeros(cols.size, dtype=bool)
+                for f in column_fns:
+                    mask |= f(cols)
+                return mask
+        return record, columns
+    if "not" in spec:
+        inner_record, inner_columns = compile_predicate(spec["not"])
+        return (lambda md: not inner_record(md)), (lambda cols: ~inner_columns(cols))
+    if "field" in spec:
+        return _compile_leaf(spec)
+    raise RuleError(f"unrecognised rule predicate {spec!r}")
+
+
+class _Columns:
+    """
+    Lazily materialised columns of a batch: each field is pulled out of the
+    records once and shared by every rule that reads it.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self._records = records
+        self._cache: Dict[str, "np.ndarray"] = {}
+        self.size = len(records)
+
+    def __call__(self, field: str) -> "np.ndarray":
+        column = self._cache.get(field)
+        if column is None:
+            import numpy as np
+            column = np.empty(self.size, dtype=object)
+            column[:] = [md.get(field) for md in self._records]
+            self._cache[field] = column
+        return column
+
+
+class CompiledRule:
+    def __init__(self, spec: Dict[str, Any], weight: float):
+        self.id = spec.get("id") or spec.get("flag")
+        self.flag = spec.get("flag") or self.id
+        self.weight = weight
+        if "when" not in spec:
+            raise RuleError(f"rule {self.id!r} has no 'when' predicate")
+        self.matches, self.matches_columns = compile_predicate(spec["when"])
+
+
+def load_rules(config: Any) -> List[CompiledRule]:
+    """
+    Compile a rules config. Accepts the declarative form
+    {"rules": [{"id", "flag", "weight", "when"}]} or the original flat
+    {rule_id: weight} mapping, which applies those weights to DEFAULT_RULES.
+    """
+    if isinstance(config, dict) and "rules" in config:
+        specs = config["rules"]
+        weights = {spec.get("id"): spec.get("weight", 0) for spec in specs}
+    elif isinstance(config, dict):
+        specs = DEFAULT_RULES
+        weights = config
+    else:
+        raise RuleError("scoring rules must be a JSON object")
+    return [CompiledRule(spec, weights.get(spec.get("id"), 0) or 0) for spec in specs]
+
+
 class ScoringEngine:
-    def __init__(self, rules_path: str = "config/scoring_rules.json"):
-        with open(rules_path, "r") as f:
-            self.rules = json.load(f)
+    """
+    Data-driven risk scoring.
+
+    Rules are read from rules_path and compiled once into closures (for
+    single records) and NumPy column evaluators (for score_batch). With
+    hot_reload the file's mtime is checked at most every
+    RELOAD_CHECK_INTERVAL seconds and the rules are recompiled when it
+    changes; a broken edit is logged and the previous rules stay active.
+    """
+
+    def __init__(self, rules_path: str = "config/scoring_rules.json", hot_reload: bool = False):
+        self.rules_path = rules_path
+        self.hot_reload = hot_reload
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self.rules: List[CompiledRule] = []
+        self._load()
+
+    def _load(self) -> None:
+        mtime = os.path.getmtime(self.rules_path)
+        with open(self.rules_path, "r") as f:
+            config = json.load(f)
+        self.rules = load_rules(config)
+        self._mtime = mtime
+
+    def _maybe_reload(self) -> None:
+        if not self.hot_reload:
+            return
+        now = time.monotonic()
+        if now - self._checked < RELOAD_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked = now
+            try:
+                if os.path.getmtime(self.rules_path) != self._mtime:
+                    self._load()
+                    logger.info("Reloaded scoring rules from %s", self.rules_path)
+            except (OSError, ValueError) as e:
+                logger.warning("Keeping previous scoring rules; reload of %s failed: %s", self.rules_path, e)
+
+    @staticmethod
+    def _total(score: float):
+        return int(score) if float(score).is_integer() else score
 
     def score(self, md: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -18,32 +279,69 @@ class ScoringEngine:
           - risk_score: int
           - risk_flags: List[str]
         """
+        self._maybe_reload()
         score = 0
         flags = []
+        for rule in self.rules:
+            if rule.matches(md):
+                score += rule.weight
+                flags.append(rule.flag)
+        return {"risk_score": self._total(score), "risk_flags": flags}
+
+    def score_batch(self, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        score() for many records at once. Each rule is evaluated over whole
+        columns into a record x rule hit matrix; scores and flag lists are
+        computed once per distinct row of that matrix.
+        Returns one { risk_score, risk_flags } per record.
+        """
+        self._maybe_reload()
+        if not records:
+            return []
+        import numpy as np
+        rules = self.rules
+        if not rules:
+            return [{"risk_score": 0, "risk_flags": []} for _ in records]
+        weights = np.array([r.weight for r in rules], dtype=float)
+        columns = _Columns(records)
+        hits = np.column_stack([rule.matches_columns(columns) for rule in rules])
+        # Records share few distinct hit patterns; build each result once.
+        patterns, inverse = np.unique(np.packbits(hits, axis=1), axis=0, return_inverse=True)
+        outcomes = []
+        for packed in patterns:
+            row = np.unpackbits(packed, count=len(rules)).astype(bool)
+            outcomes.append((self._total(row @ weights), [rules[j].flag for j in np.flatnonzero(row)]))
+        return [
+            {"risk_score": outcomes[k][0], "risk_flags": list(outcomes[k][1])}
+            for k in inverse.ravel().tolist()
+        ]
+
 
-        # 1) Timestamp mismatch
-        if md.get("creation_date") and md.get("mod_date") and md["creation_date"] != md["mod_date"]:
-            score += self.rules.get("timestamp_mismatch", 0)
-            flags.append("Timestamp mismatch")
+_engines: Dict[str, ScoringEngine] = {}
+_engines_lock = threading.Lock()
 
-        # 2) AcroForm without cryptographic signature
-        if md.get("has_acroform") and not md.get("has_signature_field"):
-            score += self.rules.get("acroform_without_signature", 0)
-            flags.append("AcroForm without cryptographic signature")
 
-        # 3) Signature-overlay annotation
-        if md.get("signature_overlay_detected"):
-            score += self.rules.get("signature_overlay", 0)
-            flags.append("Signature overlay detected")
+def get_scoring_engine(rules_path: str = "config/scoring_rules.json") -> ScoringEngine:
+    """
+    Process-wide hot-reloading engine per rules file, so workers compile the
+    rules once instead of re-reading the JSON for every ScoringEngine.
+    """
+    with _engines_lock:
+        engine = _engines.get(rules_path)
+        if engine is None:
+            engine = _engines[rules_path] = ScoringEngine(rules_path, hot_reload=True)
+        return engine
 
-        # 4) Missing XMP toolkit
-        if not md.get("xmp_toolkit"):
-            score += self.rules.get("missing_xmp_toolkit", 0)
-            flags.append("Missing XMP toolkit")
 
-        # 5) Hidden PDF-library usage (iText, PDFBox, BFO, ABCpdf, etc.)
-        if md.get("hidden_lib_usage"):
-            score += self.rules.get("hidden_lib_usage", 0)
-            flags.append("Programmatic manipulation detected (hidden PDF library)")
+def score_document(source, signature_overlay_detected: bool = False, engine: Optional[ScoringEngine] = None) -> Dict[str, Any]:
+    """
+    score() for one PDF: the rules read the tamper metadata of
+    extract_metadata.extract_metadata (source is a path or a shared
+    ParsedPdf), plus the interpreter's signature overlay verdict.
+    Returns { risk_score, risk_flags }.
+    """
+    from extract_metadata import extract_metadata
 
-        return {"risk_score": score, "risk_flags": flags}
\ No newline at end of file
+    record = dict(extract_metadata(source))
+    record["signature_overlay_detected"] = signature_overlay_detected
+    return (engine or get_scoring_engine()).score(record)
@@ -1,21 +1,51 @@
 # signature_validator.py
 
-from PyPDF2 import PdfReader
+from utils.parsed_pdf import as_parsed_pdf
 
 def validate_signatures(file_path):
+    """
+    file_path may be a path or a shared ParsedPdf context.
+    """
+    from signature_verifier import verify_signatures
+    from utils.object_inventory import RISKY_ACTIONS
+
     results = []
     try:
-        reader = PdfReader(file_path)
-        root = reader.trailer["/Root"]
+        pdf = as_parsed_pdf(file_path)
+        root = pdf.root
         if "/AcroForm" in root:
-            form = root["/AcroForm"]
+            form = pdf.resolve(root["/AcroForm"])
             if "/SigFlags" in form:
                 results.append("PDF includes signature flags.")
             if "/Fields" in form and len(form["/Fields"]) > 0:
                 results.append(f"{len(form['/Fields'])} AcroForm fields found – inspect for overlays.")
 
-        if "/Annots" in root:
+        # annotations hang off the pages, not the catalog; ask the inventory
+        inventory = pdf.inventory
+        signatures = inventory.signature_fields()
+        if signatures.size:
+            results.append(f"{len(signatures)} signature field(s) found.")
+        if inventory.annotations().size:
             results.append("Page annotations present – potential for invisible overlays.")
+        for kind in RISKY_ACTIONS:
+            nums = inventory.actions(kind)
+            if nums.size:
+                listed = ", ".join(str(n) for n in nums[:10].tolist())
+                results.append(f"{len(nums)} {kind[1:]} action(s) found (objects {listed}{', ...' if len(nums) > 10 else ''}).")
+
+        # what the signatures actually cover, not just that they exist
+        verified = verify_signatures(pdf)
+        for entry in verified["signatures"]:
+            if entry["digest_matches"] and entry["signature_valid"]:
+                results.append((
+                    f"Signature object {entry['object']} over {entry['signed_bytes']} byte(s) is consistent "
+                    "with the embedded certificate (chain not validated)."
+                ))
+        results.extend(verified["flags"])
+        if verified["modified_after_signing"]:
+            results.append("Document was saved after its last signature.")
+        if verified["error"]:
+            results.append(verified["error"])
 
     except Exception as e:
         results.append(f"Signature validation failed: {e}")
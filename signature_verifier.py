@@ -0,0 +1,291 @@
+# signature_verifier.py
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.cms import CmsError, parse_signed_data, tst_message_imprint, verify_rsa
+from utils.parsed_pdf import ParsedPdf, as_parsed_pdf
+from utils.pdf_objects import parse_object
+
+# Signed ranges are fed to the hashes in slices of this size, straight
+# from the mapped file.
+HASH_CHUNK = 1024 * 1024
+
+# How far before a /ByteRange to look for the header of the object holding
+# it; /Contents (often 16-64 KiB of hex) may come first.
+HEADER_WINDOW = 512 * 1024
+
+_BYTE_RANGE = re.compile(rb"/ByteRange\s*\[([\d\s]*)\]")
+_OBJ_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_HEX_STRING = re.compile(rb"<[0-9A-Fa-f\s]*>")
+
+
+def hash_ranges(buf, ranges: Iterable[Tuple[int, int]], algorithms: Iterable[str]) -> Dict[str, bytes]:
+    """
+    {algorithm: digest} of the concatenated (start, length) ranges of buf,
+    every algorithm fed in the same pass over zero-copy slices.
+    """
+    hashers = {name: hashlib.new(name) for name in set(algorithms)}
+    view = memoryview(buf)
+    try:
+        for start, length in ranges:
+            for at in range(start, start + length, HASH_CHUNK):
+                chunk = view[at:min(at + HASH_CHUNK, start + length)]
+                for hasher in hashers.values():
+                    hasher.update(chunk)
+                chunk.release()
+    finally:
+        view.release()
+    return {name: hasher.digest() for name, hasher in hashers.items()}
+
+
+def _find_signature_dict(obj: Any) -> Optional[dict]:
+    # The dictionary carrying /ByteRange: the object itself, or a field's
+    # inline /V.
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, dict):
+            if "/ByteRange" in item:
+                return item
+            pending.extend(item.values())
+        elif isinstance(item, list):
+            pending.extend(item)
+    return None
+
+
+def _locate(buf, match) -> Tuple[Optional[int], Optional[int], Optional[dict]]:
+    # (object number, object offset, signature dictionary) for a /ByteRange hit
+    lo = max(0, match.start() - HEADER_WINDOW)
+    headers = list(_OBJ_HEADER.finditer(buf, lo, match.start()))
+    for header in reversed(headers):
+        try:
+            obj, end = parse_object(buf, header.end())
+        except ValueError:
+            continue
+        if end <= match.start():
+            continue  # an earlier object; keep looking further back
+        return int(header.group(1)), header.start(), _find_signature_dict(obj)
+    return None, None, None
+
+
+def _ranges(value: Any, file_size: int) -> Tuple[List[Tuple[int, int]], List[str]]:
+    problems = []
+    if not isinstance(value, list) or len(value) < 2 or len(value) % 2 or not all(isinstance(v, int) for v in value):
+        return [], ["/ByteRange is not a list of offset/length pairs"]
+    ranges = list(zip(value[0::2], value[1::2]))
+    if ranges[0][0] != 0:
+        problems.append(f"/ByteRange starts at byte {ranges[0][0]}, not 0")
+    for (start, length), (next_start, _) in zip(ranges, ranges[1:]):
+        if next_start < start + length:
+            problems.append("/ByteRange ranges overlap or are out of order")
+            break
+    if any(start < 0 or length < 0 or start + length > file_size for start, length in ranges):
+        problems.append("/ByteRange reaches past the end of the file")
+    return ranges, problems
+
+
+def _gaps(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    return [(start + length, next_start) for (start, length), (next_start, _) in zip(ranges, ranges[1:])
+            if next_start > start + length]
+
+
+def _check_digests(buf, ranges, signed, subfilter: str) -> Dict[str, Any]:
+    # Recompute what the signer hashed and compare. Returns
+    # { digest_algorithm, digest_matches, signature_valid, timestamp_time }.
+    result: Dict[str, Any] = {"digest_algorithm": None, "digest_matches": None,
+                              "signature_valid": None, "timestamp_time": None}
+    if not signed.signers:
+        return result
+    signer = signed.signers[0]
+    cert = signed.signer_certificate(signer)
+    algorithm = signer.digest_algorithm
+    result["digest_algorithm"] = algorithm
+    if algorithm is None:
+        return result
+
+    content = signed.content
+    if subfilter == "/adbe.pkcs7.sha1" and content is not None:
+        # the encapsulated content is the SHA-1 of the ranges
+        document_ok = content == hash_ranges(buf, ranges, ["sha1"])["sha1"]
+        signed_message = content
+    elif subfilter == "/ETSI.RFC3161" and content is not None:
+        imprint_algorithm, imprint, result["timestamp_time"] = tst_message_imprint(content)
+        document_ok = imprint_algorithm is not None and imprint == hash_ranges(buf, ranges, [imprint_algorithm])[imprint_algorithm]
+        signed_message = content
+    else:
+        document_ok = None
+        signed_message = None
+
+    if signer.signed_attrs is not None:
+        if signed_message is None:
+            expected = hash_ranges(buf, ranges, [algorithm])[algorithm]
+        else:
+            expected = hashlib.new(algorithm, signed_message).digest()
+        attrs_ok = signer.message_digest == expected
+        result["digest_matches"] = attrs_ok if document_ok is None else attrs_ok and document_ok
+        attrs = signer.signed_attrs
+        result["signature_valid"] = verify_rsa(signer, cert, lambda name: hashlib.new(name, attrs).digest())
+    else:
+        # no signed attributes: the signature is over the content directly
+        result["digest_matches"] = document_ok
+        if signed_message is None:
+            result["signature_valid"] = verify_rsa(signer, cert, lambda name: hash_ranges(buf, ranges, [name])[name])
+        else:
+            result["signature_valid"] = verify_rsa(signer, cert, lambda name: hashlib.new(name, signed_message).digest())
+    return result
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, bytes):
+        if value[:2] in (b"\xfe\xff", b"\xff\xfe"):
+            return value.decode("utf-16", "replace")
+        return value.decode("latin1")
+    return value if isinstance(value, str) else None
+
+
+def _verify_one(buf, file_size: int, match, revisions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    num, offset, sig = _locate(buf, match)
+    if sig is None:
+        return None
+    subfilter = _text(sig.get("/SubFilter")) or ""
+    entry: Dict[str, Any] = {
+        "object": num,
+        "offset": offset,
+        "type": _text(sig.get("/Type")) or "/Sig",
+        "subfilter": subfilter,
+        "name": _text(sig.get("/Name")),
+        "reason": _text(sig.get("/Reason")),
+        "claimed_time": _text(sig.get("/M")),
+        "byte_range": sig.get("/ByteRange"),
+        "signed_bytes": 0,
+        "covers_whole_file": False,
+        "unsigned_gaps": [],
+        "contents_in_gap": False,
+        "digest_algorithm": None,
+        "digest_matches": None,
+        "signature_valid": None,
+        "signer": None,
+        "signing_time": None,
+        "timestamp_time": None,
+        "timestamped": False,
+        "signed_revision": None,
+        "revisions_after": 0,
+        "objects_changed_after": 0,
+        "problems": [],
+    }
+    ranges, problems = _ranges(sig.get("/ByteRange"), file_size)
+    entry["problems"].extend(problems)
+    if not ranges or problems:
+        return entry
+
+    signed_end = ranges[-1][0] + ranges[-1][1]
+    entry["signed_bytes"] = sum(length for _, length in ranges)
+    entry["covers_whole_file"] = signed_end == file_size
+
+    # the only unsigned bytes allowed are the /Contents hex string itself
+    contents = sig.get("/Contents")
+    gaps = _gaps(ranges)
+    for start, end in gaps:
+        hole = buf[start:end]
+        if _HEX_STRING.fullmatch(hole) and isinstance(contents, bytes) and \
+                bytes.fromhex(bytes(hole[1:-1]).decode("ascii")) == contents:
+            entry["contents_in_gap"] = True
+        else:
+            entry["unsigned_gaps"].append([start, end])
+    if not entry["contents_in_gap"]:
+        entry["problems"].append("/Contents is not the unsigned gap of /ByteRange")
+
+    # the revision this signature closed, and what was saved after it
+    later = [r for r in revisions if r["end_offset"] is not None and r["end_offset"] > signed_end]
+    closed = [r for r in revisions if r["end_offset"] == signed_end]
+    entry["signed_revision"] = closed[0]["revision"] if closed else None
+    entry["revisions_after"] = len(later)
+    entry["objects_changed_after"] = sum(sum(r["counts"].values()) for r in later)
+
+    if not isinstance(contents, bytes) or not contents.strip(b"\x00"):
+        entry["problems"].append("signature /Contents is empty")
+        return entry
+    try:
+        signed = parse_signed_data(contents)
+        entry.update(_check_digests(buf, ranges, signed, subfilter))
+        if signed.signers:
+            signer = signed.signers[0]
+            cert = signed.signer_certificate(signer)
+            entry["signer"] = cert.summary() if cert else None
+            entry["signing_time"] = signer.signing_time
+            entry["timestamped"] = signer.has_timestamp or subfilter == "/ETSI.RFC3161"
+        else:
+            entry["problems"].append("SignedData has no signer")
+    except CmsError as e:
+        entry["problems"].append(f"signature container unreadable: {e}")
+    return entry
+
+
+def _flags(entry: Dict[str, Any], index: int, file_size: int) -> List[str]:
+    label = f"Signature {index}" + (f" ({entry['name']})" if entry["name"] else "")
+    flags = [f"{label}: {p}" for p in entry["problems"]]
+    if entry["digest_matches"] is False:
+        flags.append(f"{label}: signed content digest does not match the document")
+    if entry["signature_valid"] is False:
+        flags.append(f"{label}: cryptographic signature is invalid")
+    if entry["unsigned_gaps"]:
+        size = sum(end - start for start, end in entry["unsigned_gaps"])
+        flags.append(f"{label}: {size} byte(s) inside the signed span are not covered")
+    if entry["byte_range"] and not entry["problems"] and not entry["covers_whole_file"]:
+        if entry["revisions_after"]:
+            flags.append(f"{label}: {entry['revisions_after']} revision(s) saved after signing,"
+                         f" changing {entry['objects_changed_after']} object(s)")
+        else:
+            ranges = entry["byte_range"]
+            flags.append(f"{label}: {file_size - ranges[-2] - ranges[-1]} unsigned byte(s) after the signed range")
+    return flags
+
+
+def verify_signatures(source) -> Dict[str, Any]:
+    """
+    Locate every signature dictionary (anything carrying /ByteRange, live
+    or left behind by an earlier revision), hash its byte ranges straight
+    from the mapped file, parse its PKCS#7/CMS container and check digest,
+    RSA signature, coverage and later revisions. source is a path, bytes,
+    buffer or ParsedPdf.
+    Returns { signatures (one dict each, in file order), flags,
+    modified_after_signing (anything saved after the newest signature), error }.
+    """
+    from revision_analyzer import RevisionHistory
+
+    result: Dict[str, Any] = {"signatures": [], "flags": [], "modified_after_signing": False, "error": None}
+    owns_context = not isinstance(source, ParsedPdf)
+    pdf = as_parsed_pdf(source)
+    try:
+        buf = pdf.data
+        matches = list(_BYTE_RANGE.finditer(buf))
+        if not matches:
+            return result
+        file_size = pdf.size
+        try:
+            history = RevisionHistory(buf, pdf.xref_chain)
+            revisions = [r.summary(max_listed=0) for r in history.revisions]
+        except Exception:
+            revisions = []
+        seen = set()
+        for match in matches:
+            entry = _verify_one(buf, file_size, match, revisions)
+            if entry is None or entry["offset"] in seen:
+                continue
+            seen.add(entry["offset"])
+            result["signatures"].append(entry)
+            result["flags"].extend(_flags(entry, len(result["signatures"]), file_size))
+        # earlier signatures are always followed by the later ones' saves;
+        # what matters is whether anything came after the newest one
+        signed = [s for s in result["signatures"] if s["signed_bytes"]]
+        if signed:
+            newest = max(signed, key=lambda s: s["byte_range"][-2] + s["byte_range"][-1])
+            result["modified_after_signing"] = not newest["covers_whole_file"]
+    except Exception as e:
+        result["error"] = f"Signature verification failed: {e}"
+    finally:
+        if owns_context:
+            pdf.close()
+    return result
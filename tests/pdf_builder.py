@@ -0,0 +1,69 @@
+# tests/pdf_builder.py
+
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+# Hand-built PDFs for the tests: object bodies go in, the object headers,
+# xref sections and trailers are written here.
+
+
+def add_objects(out: bytearray, objects: Dict[int, bytes]) -> Dict[int, int]:
+    """
+    Append "N 0 obj ... endobj" for each body; returns their offsets.
+    """
+    offsets = {}
+    for num, body in objects.items():
+        offsets[num] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+    return offsets
+
+
+def add_xref_table(out: bytearray, entries: Dict[int, Optional[int]], trailer: bytes) -> int:
+    """
+    Append a classic xref section (entries: object number -> offset, None
+    for a free entry), its trailer and startxref; returns the section offset.
+    """
+    start = len(out)
+    out += b"xref\n"
+    nums = sorted(entries)
+    run_start = 0
+    for i in range(1, len(nums) + 1):
+        if i < len(nums) and nums[i] == nums[i - 1] + 1:
+            continue
+        run = nums[run_start:i]
+        out += b"%d %d\n" % (run[0], len(run))
+        for num in run:
+            offset = entries[num]
+            out += b"%010d 00000 n \n" % offset if offset is not None else b"0000000000 65535 f \n"
+        run_start = i
+    out += b"trailer\n" + trailer + b"\nstartxref\n%d\n%%%%EOF\n" % start
+    return start
+
+
+def add_xref_stream(out: bytearray, num: int, rows: Iterable[Tuple[int, int, int]], trailer_extra: bytes = b"") -> int:
+    """
+    Append xref stream object num listing (type, field 2, field 3) rows for
+    objects 0, 1, ... and its startxref; returns the stream's offset.
+    """
+    rows = list(rows)
+    body = zlib.compress(b"".join(bytes([t]) + f.to_bytes(4, "big") + g.to_bytes(2, "big") for t, f, g in rows))
+    start = len(out)
+    out += b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R %s/Filter /FlateDecode /Length %d >>\nstream\n" % (
+        num, len(rows), trailer_extra + b" " if trailer_extra else b"", len(body))
+    out += body + b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % start
+    return start
+
+
+def build_pdf(objects: Dict[int, bytes], trailer_extra: bytes = b"", version: bytes = b"1.4") -> bytes:
+    """
+    A single-revision PDF with a classic xref; object 1 is the /Root and
+    unused object numbers are listed as free. trailer_extra is added to the
+    trailer dictionary (e.g. b"/Info 4 0 R").
+    """
+    out = bytearray(b"%PDF-" + version + b"\n")
+    offsets = add_objects(out, objects)
+    size = max(objects) + 1
+    entries = {n: offsets.get(n) for n in range(size)}
+    extra = trailer_extra + b" " if trailer_extra else b""
+    add_xref_table(out, entries, b"<< /Size %d /Root 1 0 R %s>>" % (size, extra))
+    return bytes(out)
@@ -0,0 +1,41 @@
+import io
+
+from reportlab.pdfgen import canvas
+
+from affidavit_writer import render_affidavits, split_line, text_layout
+
+def _measured_split(text, max_width, c):
+    # Reference wrapping: measure the whole candidate line every time.
+    lines, line = [], ""
+    for word in text.split():
+        if c.stringWidth(line + " " + word) < max_width:
+            line += " " + word if line else word
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+def test_cached_wrap_matches_measured_wrap():
+    c = canvas.Canvas(io.BytesIO())
+    c.setFont("Helvetica", 10)
+    texts = [
+        "AcroForm without cryptographic signature " * 12,
+        "Supercalifragilisticexpialidocious" * 6 + " then short words follow here",
+        "Amount $1,250,000.00 wired to account ...4821 via Mashreq",
+        "",
+    ]
+    for text in texts:
+        for width in (40, 200, 512):
+            assert split_line(text, width, c) == _measured_split(text, width, c)
+    assert text_layout("Helvetica", 10) is text_layout("Helvetica", 10)
+
+def test_render_affidavits_batch():
+    docs = [
+        {"filename": f"doc{i}.pdf", "sha256": "0" * 64, "findings": ["Timestamp mismatch " * 30] * 40}
+        for i in range(3)
+    ]
+    rendered = list(render_affidavits(docs))
+    assert [name for name, _ in rendered] == ["doc0.pdf", "doc1.pdf", "doc2.pdf"]
+    assert all(pdf.startswith(b"%PDF") for _, pdf in rendered)
@@ -0,0 +1,72 @@
+import json
+import os
+import signal
+import time
+
+import batch_runner
+from batch_runner import analyze_file, run_batch
+
+def stub_decode(path, static_mode=False, cache=None, summarize="auto"):
+    # The file name says how the worker behaves.
+    name = os.path.basename(path)
+    if name.startswith("hang"):
+        time.sleep(30)
+    elif name.startswith("wedge"):
+        # Native code that never returns to the interpreter: the alarm cannot fire.
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(30)
+    elif name.startswith("crash"):
+        os.kill(os.getpid(), signal.SIGKILL)
+    elif name.startswith("bad"):
+        raise ValueError("unreadable xref")
+    return {"file": name, "static": static_mode, "summarize": summarize}
+
+def _corpus(tmp_path, *names):
+    for name in names:
+        (tmp_path / f"{name}.pdf").write_bytes(b"%PDF-1.4\n")
+    (tmp_path / "notes.txt").write_text("not a pdf")
+    return str(tmp_path)
+
+def _run(tmp_path, root, **kwargs):
+    out = tmp_path / "out" / "results.jsonl"
+    out.parent.mkdir()
+    stats = run_batch(root, str(out), workers=2, summaries="never", decode=stub_decode, **kwargs)
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    return stats, {os.path.basename(r["path"]): r for r in records}
+
+def test_analyze_file_never_raises():
+    ok = analyze_file("ok.pdf", static_mode=True, summarize="never", decode=stub_decode)
+    assert ok["status"] == "ok" and ok["result"] == {"file": "ok.pdf", "static": True, "summarize": "never"}
+    bad = analyze_file("bad.pdf", decode=stub_decode)
+    assert bad["status"] == "error" and bad["error"] == "ValueError: unreadable xref"
+    start = time.perf_counter()
+    hung = analyze_file("hang.pdf", timeout=0.2, decode=stub_decode)
+    assert hung["status"] == "timeout" and time.perf_counter() - start < 5
+
+def test_results_are_written_as_json_lines(tmp_path):
+    root = _corpus(tmp_path, "a", "b", "bad", "hang")
+    stats, records = _run(tmp_path, root, timeout=0.5)
+    assert sorted(records) == ["a.pdf", "b.pdf", "bad.pdf", "hang.pdf"]
+    assert records["a.pdf"]["result"]["file"] == "a.pdf"
+    assert records["bad.pdf"]["status"] == "error"
+    assert records["hang.pdf"] == {**records["hang.pdf"], "status": "timeout", "error": "exceeded 0.5s"}
+    assert stats["ok"] == 2 and stats["error"] == 1 and stats["timeout"] == 1 and stats["total"] == 4
+
+def test_wedged_worker_is_killed_at_the_hard_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, "HARD_TIMEOUT_GRACE", 0.5)
+    root = _corpus(tmp_path, "a", "wedge", "z")
+    stats, records = _run(tmp_path, root, timeout=0.5)
+    assert records["wedge.pdf"]["status"] == "timeout"
+    assert records["wedge.pdf"]["error"] == "killed after 1.0s"
+    # files recycled along with the wedged worker are re-run, not lost
+    assert records["a.pdf"]["status"] == records["z.pdf"]["status"] == "ok"
+    assert stats["total"] == 3
+
+def test_crash_is_quarantined_to_the_culprit(tmp_path):
+    root = _corpus(tmp_path, "a", "b", "crash", "y", "z")
+    stats, records = _run(tmp_path, root, timeout=None)
+    assert records["crash.pdf"]["status"] == "crashed"
+    assert {name: r["status"] for name, r in records.items() if name != "crash.pdf"} == dict.fromkeys(
+        ["a.pdf", "b.pdf", "y.pdf", "z.pdf"], "ok"
+    )
+    assert stats == {**stats, "ok": 4, "crashed": 1, "total": 5}
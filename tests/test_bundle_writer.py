@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+from bundle_writer import BundleWriter, iter_bundle
+
+def test_entries_round_trip_through_zipfile(tmp_path):
+    pdf = b"%PDF-1.4\n" + bytes(range(256)) * 64
+    source = tmp_path / "exhibit.pdf"
+    source.write_bytes(pdf)
+    target = tmp_path / "bundle.zip"
+    with BundleWriter(str(target), workers=4, max_pending=2) as writer:
+        writer.add("a/metadata.yaml", "producer: iText\n" * 200)
+        writer.add("a/entities.json", b'{"grantors": []}')
+        writer.add("a/exhibit.pdf", memoryview(pdf))
+        writer.add_file("b/exhibit.pdf", str(source))
+        writer.add("b/résumé.txt", "unicode name")
+
+    with zipfile.ZipFile(target) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["a/metadata.yaml", "a/entities.json", "a/exhibit.pdf", "b/exhibit.pdf", "b/résumé.txt"]
+        assert zf.getinfo("a/metadata.yaml").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("a/exhibit.pdf").compress_type == zipfile.ZIP_STORED
+        assert zf.read("b/exhibit.pdf") == pdf
+        assert zf.read("a/metadata.yaml") == b"producer: iText\n" * 200
+
+def test_iter_bundle_streams_same_archive():
+    entries = [(f"doc{i}/summary.md", f"# Document {i}\n" * 50) for i in range(20)]
+    streamed = b"".join(iter_bundle(iter(entries), timestamp=0, workers=2))
+    buffered = io.BytesIO()
+    with BundleWriter(buffered, timestamp=0, workers=2) as writer:
+        for entry in entries:
+            writer.add(*entry)
+    assert streamed == buffered.getvalue()
+    with zipfile.ZipFile(io.BytesIO(streamed)) as zf:
+        assert zf.read("doc7/summary.md") == b"# Document 7\n" * 50
+
+def test_zip64_entry_count():
+    count = 70000
+    out = io.BytesIO()
+    with BundleWriter(out, workers=2) as writer:
+        for i in range(count):
+            writer.add(f"{i}.txt", b"", compress=False)
+    with zipfile.ZipFile(out) as zf:
+        names = zf.namelist()
+    assert len(names) == count and names[-1] == f"{count - 1}.txt"
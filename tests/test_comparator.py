@@ -9,4 +9,24 @@ def test_compare_diff():
     md1 = {"a": 1}
     md2 = {"a": 2}
     rows = compare_metadata(md1, md2)
-    assert any(r["mismatch"] for r in rows)
\ No newline at end of file
+    assert any(r["mismatch"] for r in rows)
+
+def test_compare_batch_matches_pairwise():
+    from metadata_comparator import compare_batch
+
+    mds = [
+        {"producer": "Acrobat", "xmp_toolkit": "XMP 5", "pages": 2},
+        {"producer": "Acrobat", "xmp_toolkit": "XMP 5", "pages": 3, "author": None},
+        {"producer": "iText", "xmp_toolkit": None, "keywords": ["a", "b"]},
+    ]
+    result = compare_batch(mds, names=["a.pdf", "b.pdf", "c.pdf"])
+    for i, md1 in enumerate(mds):
+        for j, md2 in enumerate(mds):
+            expected = sum(r["mismatch"] for r in compare_metadata(md1, md2))
+            assert result["pairwise"][i, j] == expected
+
+    producer = result["fields"].index("producer")
+    assert result["field_mismatch"][:, producer].tolist() == [False, False, True]
+    card = {c["field"]: c for c in result["cardinality"]}
+    assert card["producer"]["distinct"] == 2 and card["producer"]["most_common"] == "Acrobat"
+    assert card["author"]["missing"] == 3
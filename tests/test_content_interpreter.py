@@ -0,0 +1,82 @@
+from pdf_builder import build_pdf
+from utils.content_interpreter import scan_document, signature_overlay_detected
+from utils.page_pipeline import analyze_page
+from utils.parsed_pdf import ParsedPdf
+
+PAGE = b"""
+BT /F1 12 Tf 72 700 Td (Visible heading) Tj ET
+q BT /F1 12 Tf 3 Tr 72 680 Td (Ghost line) Tj ET Q
+q BT 1 1 1 rg /F1 12 Tf 72 660 Td [(White) -250 (words)] TJ ET Q
+BT /F1 12 Tf -900 640 Td (Off the page) Tj ET
+BT /F1 0.2 Tf 72 620 Td (Tiny print) Tj ET
+q 0 0 10 10 re W n BT /F1 12 Tf 300 600 Td (Clipped away) Tj ET Q
+BT /F1 12 Tf 72 500 Td (Amount due 100) Tj ET
+q 120 0 0 20 70 496 cm /Im1 Do Q
+BT /F1 12 Tf 72 450 Td (Whited out) Tj ET
+q 1 g 70 446 80 16 re f Q
+q 200 0 0 40 300 300 cm /Im1 Do Q
+q BT /F1 10 Tf 3 Tr 305 310 Td (scanned words) Tj ET Q
+BT /F1 12 Tf 72 400 Td (Signed by) Tj ET
+/Fm1 Do
+"""
+
+FORM = b"BT /F1 12 Tf 7 Tr 72 200 Td (Inside a form) Tj ET"
+
+def _pdf() -> bytes:
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Annots [8 0 R 9 0 R 12 0 R 13 0 R]"
+           b" /Resources << /Font << /F1 5 0 R >> /XObject << /Im1 6 0 R /Fm1 7 0 R >> >> >>",
+        4: b"<< /Length %d >>\nstream\n%s\nendstream" % (len(PAGE), PAGE),
+        5: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        6: b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray /BitsPerComponent 8"
+           b" /Length 1 >>\nstream\n\x00\nendstream",
+        7: b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 5 0 R >> >>"
+           b" /Length %d >>\nstream\n%s\nendstream" % (len(FORM), FORM),
+        8: b"<< /Type /Annot /Subtype /Widget /FT /Sig /T (Sig1) /Rect [70 396 140 412] /AP << /N 11 0 R >> >>",
+        9: b"<< /Type /Annot /Subtype /Link /Rect [0 0 612 792] /AP << /N 10 0 R >> >>",
+        10: b"<< /Type /XObject /Subtype /Form /BBox [0 0 1 1] /Length 0 >>\nstream\n\nendstream",
+        11: b"<< /Type /XObject /Subtype /Form /BBox [0 0 70 16] /Length 20 >>\nstream\n1 g 0 0 70 16 re f\nendstream",
+        # translucent markup and a widget with no background leave the heading readable
+        12: b"<< /Type /Annot /Subtype /Highlight /Rect [70 696 170 714] /AP << /N 11 0 R >> >>",
+        13: b"<< /Type /Annot /Subtype /Widget /FT /Tx /Rect [70 696 170 714] /AP << /N 10 0 R >> >>",
+    }
+    return build_pdf(objects)
+
+def test_invisible_text_reasons():
+    result = scan_document(_pdf())
+    assert result["errors"] == []
+    found = {(e["reason"], e["text"]) for e in result["invisible_text"]}
+    assert ("render_mode", "Ghost line") in found
+    assert ("white", "White words") in found  # TJ pieces merged with the kerned gap as a space
+    assert ("off_page", "Off the page") in found
+    assert ("tiny", "Tiny print") in found
+    assert ("clipped", "Clipped away") in found
+    assert ("render_mode", "Inside a form") in found
+    texts = [e["text"] for e in result["invisible_text"]]
+    assert "Visible heading" not in texts
+    assert "scanned words" not in texts  # OCR layer over a page image
+
+def test_overlays_cover_text():
+    result = scan_document(_pdf())
+    overlays = {o["kind"]: o for o in result["overlays"]}
+    assert set(overlays) == {"image", "fill", "annotation"}
+    assert overlays["image"]["name"] == "/Im1" and overlays["image"]["covered_text"] == "Amount due 100"
+    assert overlays["fill"]["covered_text"] == "Whited out"
+    assert overlays["annotation"]["signature"] and overlays["annotation"]["covered_text"] == "Signed by"
+    assert not overlays["image"]["signature"] and not overlays["fill"]["signature"]
+    covered = [e["text"] for e in result["invisible_text"] if e["reason"] == "covered"]
+    assert covered == ["Amount due 100", "Whited out", "Signed by"]
+    assert result["signature_overlay_detected"] is True
+    assert signature_overlay_detected([o for o in result["overlays"] if o["kind"] != "annotation"]) is False
+    assert any(f.startswith("Image covering text: 1 overlay(s) on page(s) 1") for f in result["flags"])
+
+def test_page_records_carry_layers():
+    with ParsedPdf(_pdf()) as pdf:
+        record = analyze_page(pdf, 0, static_mode=True, ocr=False)
+        assert record["error"] is None
+        assert len(record["overlays"]) == 3
+        assert {e["reason"] for e in record["invisible_text"]} >= {"render_mode", "white", "covered"}
+        # Helvetica is looked up once for the page and once more from the form's resources
+        assert len(pdf._font_metrics) == 1
@@ -0,0 +1,34 @@
+from corpus_index import CorpusIndex
+from fraud_detector import detect_mass_fraud, detect_producer_override
+
+DOCS = [
+    {"filename": "a.pdf", "creation_date": "D:20240102103000", "xmp_toolkit": "Adobe XMP Core 5.1", "document_id": "uuid:1", "producer": "Acrobat"},
+    {"filename": "b.pdf", "creation_date": "D:20240102103059", "xmp_toolkit": "Adobe XMP Core 5.1", "document_id": "uuid:2", "producer": "Acrobat"},
+    {"filename": "c.pdf", "creation_date": "D:20240102103012", "xmp_toolkit": "iText 7", "document_id": "uuid:1", "producer": "iText"},
+    {"filename": "d.pdf", "creation_date": "D:20240309090000", "xmp_toolkit": None, "document_id": "uuid:3", "producer": "Word"},
+]
+
+def test_incremental_matches_batch_detection():
+    index = CorpusIndex(":memory:")
+    assert index.add_many(DOCS[:2]) == []
+    events = index.add(DOCS[2])
+    assert {e["type"] for e in events} == {"cluster", "override"}
+    index.add(DOCS[3])
+
+    batch = detect_mass_fraud(DOCS)
+    indexed = index.clusters(include_docs=True)
+    assert [c["minute_key"] for c in indexed] == [c["minute_key"] for c in batch]
+    assert indexed[0]["toolkit_values"] == batch[0]["toolkit_values"]
+    assert indexed[0]["docs"] == batch[0]["docs"]
+    assert index.overrides() == detect_producer_override(DOCS)
+    assert index.producers("uuid:1") == ["Acrobat", "iText"]
+
+def test_readding_is_idempotent_and_persistent(tmp_path):
+    path = str(tmp_path / "corpus.sqlite")
+    index = CorpusIndex(path)
+    index.add_many(DOCS)
+    assert index.add_many(DOCS) == []
+    index.close()
+    reopened = CorpusIndex(path)
+    assert len(reopened) == 4
+    assert reopened.stats()["clusters"] == 1 and reopened.stats()["overrides"] == 1
@@ -0,0 +1,73 @@
+import re
+
+from utils.entity_engine import EntityEngine
+
+# Stand-ins with the shapes of the project patterns: digit-, "$"- and
+# script-led kinds share the prefix scan, email goes through its "@" anchor.
+PATTERNS = [
+    ("email", re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")),
+    ("amount", re.compile(r"\$\s?\d[\d,]*(?:\.\d{2})?")),
+    ("address", re.compile(r"\b\d{1,5}\s+(?:[A-Z][a-z]+\s+)+(?:Street|St|Avenue|Ave|Road|Rd)\b")),
+    ("registry_key", re.compile(r"\b0[015679]\d{8}\b")),
+    ("phone", re.compile(r"\(?\b\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b")),
+    ("foreign_script", re.compile(r"(?P<russian>[\u0400-\u04FF]+)|(?P<arabic>[\u0600-\u06FF]+)")),
+]
+
+ENGINE = EntityEngine(PATTERNS)
+
+def _per_pattern(text):
+    return {kind: [m.group() for m in p.finditer(text)] for kind, p in PATTERNS}
+
+def _engine(text):
+    found = {kind: [] for kind, _ in PATTERNS}
+    for span in ENGINE.scan(text):
+        assert text[span.start:span.end] == span.text
+        found[span.kind].append(span.text)
+    return found
+
+def test_strategies():
+    assert ENGINE.anchors == {"email": "@"}
+    assert {k for k, s in ENGINE.strategies.items() if s == "prefix"} == {
+        "amount", "address", "registry_key", "phone", "foreign_script"}
+
+def test_overlapping_kinds_are_all_found():
+    cases = {
+        "Tel 555-123-4567 Elm Street": ("address", "4567 Elm Street"),
+        "Wire $5551234567": ("phone", "5551234567"),
+        "Unit 415 555 1234 Oak Ave": ("address", "1234 Oak Ave"),
+    }
+    for text, (kind, expected) in cases.items():
+        found = _engine(text)
+        assert found == _per_pattern(text)
+        assert expected in found[kind]
+
+def test_matches_per_pattern_passes():
+    text = (
+        "Call (212) 555-0199 or 0512345678, wire $12,500.00 to 88 North Main Street; "
+        "agent7@escrow-example.com cc: a.b+c@x-y.org Тегеран طهران 0612345678x "
+        "$ 5 1234 Oak Ave 99999 Long Lake Road 555.123.4567"
+    ) * 3
+    assert _engine(text) == _per_pattern(text)
+
+def test_languages_and_unsupported_patterns():
+    engine = EntityEngine([
+        ("foreign_script", PATTERNS[-1][1]),
+        ("backref", re.compile(r"(\d)\1")),
+        ("verbose", re.compile(r"\d+ \s* kg", re.VERBOSE)),
+    ])
+    assert engine.strategies == {"foreign_script": "prefix", "backref": "full", "verbose": "full"}
+    spans = list(engine.scan("Тегеран 1 22 kg طهران"))
+    assert [(s.kind, s.language) for s in spans] == [
+        ("foreign_script", "russian"), ("backref", None), ("verbose", None), ("foreign_script", "arabic")]
+
+def test_patterns_looking_past_the_token_are_not_anchored():
+    patterns = [
+        ("lookahead", re.compile(r"[\w.]+@[\w.]+(?=\s)")),
+        ("end", re.compile(r"[\w.]+@[\w.]+$")),
+        ("plain", re.compile(r"[\w.]+@[\w.]+")),
+    ]
+    engine = EntityEngine(patterns)
+    assert engine.strategies == {"lookahead": "full", "end": "full", "plain": "anchor"}
+    text = "mail a@b.com now or c@d.org"
+    found = [(s.kind, s.text) for s in engine.scan(text)]
+    assert found == [("lookahead", "a@b.com"), ("plain", "a@b.com"), ("end", "c@d.org"), ("plain", "c@d.org")]
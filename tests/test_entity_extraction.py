@@ -0,0 +1,46 @@
+import re
+
+from utils.entity_engine import EntityEngine
+from utils.entity_extraction import entity_context, extract_entities
+
+# Stand-ins for the project patterns (utils.patterns).
+ENGINE = EntityEngine([
+    ("email", re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")),
+    ("amount", re.compile(r"\$\s?\d[\d,]*(?:\.\d{2})?")),
+    ("registry_key", re.compile(r"\b0[015679]\d{8}\b")),
+    ("phone", re.compile(r"\(?\b\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b")),
+    ("foreign_script", re.compile(r"(?P<russian>[\u0400-\u04FF]+)")),
+])
+
+TEXT = "Pay $1,200.00 to ops@shell.co, call 555-123-4567 or 0512345678. Получатель"
+
+def test_spans_point_into_the_text():
+    entities = extract_entities(TEXT, engine=ENGINE)
+    assert entities["spans"] == [
+        ["amount", 4, 13],
+        ["email", 17, 29],
+        ["phone", 36, 48],
+        ["registry_key", 52, 62],
+        ["phone", 52, 62],
+        ["foreign_script", 64, 74],
+    ]
+    assert [TEXT[start:end] for _, start, end in entities["spans"]] == [
+        "$1,200.00", "ops@shell.co", "555-123-4567", "0512345678", "0512345678", "Получатель"]
+    # the phone-shaped registry key is reported once, as a registry key
+    assert entities["amounts"] == ["$1,200.00"] and entities["emails"] == ["ops@shell.co"]
+    assert entities["phones"] == ["555-123-4567"] and entities["registry_keys"] == ["0512345678"]
+    assert entities["foreign_scripts"] == [{"language": "russian", "text": "Получатель"}]
+    assert "snippets" not in entities
+
+def test_snippets_carry_offsets_and_context():
+    entities = extract_entities(TEXT, context_chars=4, engine=ENGINE)
+    snippets = entities["snippets"]
+    assert [(s["kind"], s["start"], s["end"]) for s in snippets] == [tuple(span) for span in entities["spans"]]
+    assert snippets[0]["context"] == "Pay $1,200.00 to "
+    assert snippets[2]["context"] == "all 555-123-4567 or "
+    assert snippets[-1]["context"] == "78. Получатель"
+
+def test_entity_context_clamps_to_the_text():
+    assert entity_context("abc $5 def", ("amount", 4, 6), context_chars=2) == "c $5 d"
+    assert entity_context("$5", ("amount", 0, 2)) == "$5"
+    assert entity_context(TEXT, ["email", 17, 29], context_chars=0) == "ops@shell.co"
@@ -0,0 +1,73 @@
+from PyPDF2.generic import IndirectObject
+
+from pdf_builder import build_pdf
+from utils.fonts import document_fonts
+from utils.metadata import extract_metadata
+from utils.page_pipeline import analyze_page
+from utils.parsed_pdf import ParsedPdf
+
+def _pdf_with_shared_fonts(pages: int = 3) -> bytes:
+    # Every page shares one resource dictionary naming a subset Type0 font
+    # and a simple font with a /Differences encoding.
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % (20 + i) for i in range(pages)), pages),
+        3: b"<< /Font << /F1 4 0 R /F2 8 0 R >> >>",
+        4: b"<< /Type /Font /Subtype /Type0 /BaseFont /ABCDEF+Gothic /Encoding /Identity-H /DescendantFonts [5 0 R] /ToUnicode 7 0 R >>",
+        5: b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /ABCDEF+Gothic /FontDescriptor 6 0 R >>",
+        6: b"<< /Type /FontDescriptor /FontName /ABCDEF+Gothic /FontFile2 9 0 R >>",
+        7: b"<< /Length 0 >>\nstream\n\nendstream",
+        8: b"<< /Type /Font /Subtype /Type1 /BaseFont /Times-Roman /Encoding << /BaseEncoding /WinAnsiEncoding /Differences [32 /space] >> >>",
+        9: b"<< /Length 0 >>\nstream\n\nendstream",
+    }
+    for i in range(pages):
+        objects[20 + i] = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources 3 0 R >>"
+    return build_pdf(objects)
+
+def test_fonts_are_summarised_once_per_object():
+    with ParsedPdf(_pdf_with_shared_fonts()) as pdf:
+        fonts = document_fonts(pdf)
+        assert [f["object"] for f in fonts] == [4, 8]  # descendant 5 folded into 4
+        composite, simple = fonts
+        assert composite["subtype"] == "/Type0" and composite["descendant_subtype"] == "/CIDFontType2"
+        assert composite["subset_prefix"] == "ABCDEF"
+        assert composite["encoding"] == "/Identity-H"
+        assert composite["to_unicode"] and composite["embedded"] and composite["cid"]
+        assert simple["encoding"] == "/WinAnsiEncoding with /Differences"
+        assert not simple["to_unicode"] and not simple["embedded"] and not simple["cid"]
+
+        records = [analyze_page(pdf, i, static_mode=True, ocr=False) for i in range(3)]
+        assert all(r["cid_font"] for r in records)
+        # the pages shared both fonts; each was summarised once
+        assert len(pdf._fonts) == 2
+        font_ref = pdf.pages[0]["/Resources"]["/Font"].raw_get("/F1")
+        assert pdf.font_summary(font_ref) is pdf.font_summary(font_ref)
+
+def test_metadata_reports_fonts():
+    result = extract_metadata(_pdf_with_shared_fonts())
+    assert result["error"] is None
+    assert result["cid_font_usage"] is True
+    assert [f["base_font"] for f in result["fonts"]] == ["/ABCDEF+Gothic", "/Times-Roman"]
+
+def test_font_metrics_read_widths_and_to_unicode():
+    cmap = (b"1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+            b"1 beginbfchar <0003> <0020> endbfchar\n"
+            b"2 beginbfrange <0010> <0012> <0041> <0020> <0021> [<00E9> <00DF>] endbfrange")
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [] /Count 0 >>",
+        3: b"<< /Type /Font /Subtype /Type0 /BaseFont /Gothic /Encoding /Identity-H /DescendantFonts [4 0 R] /ToUnicode 5 0 R >>",
+        4: b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Gothic /DW 600 /W [16 [500 700] 32 33 250] >>",
+        5: b"<< /Length %d >>\nstream\n%s\nendstream" % (len(cmap), cmap),
+        6: b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /FirstChar 65 /Widths [600 610] >>",
+    }
+
+    with ParsedPdf(build_pdf(objects)) as pdf:
+        composite = pdf.font_metrics(IndirectObject(3, 0, pdf.reader))
+        assert composite is pdf.font_metrics(IndirectObject(3, 0, pdf.reader))
+        string = b"\x00\x10\x00\x11\x00\x03\x00\x12\x00\x20\x00\x21"
+        assert composite.decode(string) == "AB Céß"
+        assert composite.width(composite.codes(string)) == 0.5 + 0.7 + 0.6 + 0.6 + 0.25 + 0.25
+        simple = pdf.font_metrics(IndirectObject(6, 0, pdf.reader))
+        assert simple.width(simple.codes(b"AB")) == 0.6 + 0.61
+        assert simple.decode(b"AB\x93") == "AB“"
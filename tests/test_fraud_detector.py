@@ -0,0 +1,61 @@
+from fraud_detector import detect_mass_fraud, iter_time_clusters, parse_pdf_date
+
+def test_parse_pdf_date_normalises_timezones():
+    utc = parse_pdf_date("D:20240102095959Z")
+    assert parse_pdf_date("D:20240102105959+01'00'") == utc
+    assert parse_pdf_date("D:20240102045959-05'00") == utc
+    assert parse_pdf_date("2024-01-02T09:59:59+00:00") == utc
+    assert parse_pdf_date("not a date") is None
+
+def test_window_groups_across_minute_boundary():
+    docs = [
+        {"creation_date": "D:20240102105959", "xmp_toolkit": "Adobe XMP Core"},
+        {"creation_date": "D:20240102110001", "xmp_toolkit": "iText"},
+        {"creation_date": "D:20240102180000", "xmp_toolkit": "Other"},
+    ]
+    assert detect_mass_fraud(docs) == []
+    clusters = detect_mass_fraud(docs, window_seconds=60)
+    assert len(clusters) == 1
+    assert clusters[0]["toolkit_values"] == ["Adobe XMP Core", "iText"]
+    assert clusters[0]["end"] - clusters[0]["start"] == 2
+
+def test_window_respects_timezone_offsets():
+    docs = [
+        {"creation_date": "D:20240102120000+02'00'", "xmp_toolkit": "A"},
+        {"creation_date": "D:20240102100030Z", "xmp_toolkit": "B"},
+    ]
+    assert len(list(iter_time_clusters(docs, window_seconds=60))) == 1
+
+def test_window_slides_past_earlier_documents():
+    # an earlier A must not anchor the window away from the A/B pair
+    docs = [
+        {"creation_date": "D:20240102105900", "xmp_toolkit": "A"},
+        {"creation_date": "D:20240102105959", "xmp_toolkit": "A"},
+        {"creation_date": "D:20240102110001", "xmp_toolkit": "B"},
+    ]
+    clusters = detect_mass_fraud(docs, window_seconds=60)
+    assert len(clusters) == 1
+    assert clusters[0]["docs"] == docs[1:]
+    assert clusters[0]["end"] - clusters[0]["start"] == 2
+
+def test_window_clusters_stay_near_the_mixed_documents():
+    # a steady stream of A every 30 seconds with one B in the middle
+    docs = [
+        {"creation_date": f"D:2024010210{i * 30 // 60:02d}{i * 30 % 60:02d}", "xmp_toolkit": "B" if i == 5 else "A"}
+        for i in range(10)
+    ]
+    clusters = list(iter_time_clusters(docs, window_seconds=60))
+    assert len(clusters) == 1
+    # overlapping windows around B are merged; the rest of the stream is not chained in
+    assert clusters[0]["docs"] == docs[3:8]
+    assert clusters[0]["toolkit_values"] == ["A", "B"]
+
+def test_separate_clusters_are_not_merged():
+    docs = [
+        {"creation_date": "D:20240102100000", "xmp_toolkit": "A"},
+        {"creation_date": "D:20240102100010", "xmp_toolkit": "B"},
+        {"creation_date": "D:20240102100500", "xmp_toolkit": "A"},
+        {"creation_date": "D:20240102100510", "xmp_toolkit": "C"},
+    ]
+    clusters = list(iter_time_clusters(docs, window_seconds=60, presorted=True))
+    assert [c["toolkit_values"] for c in clusters] == [["A", "B"], ["A", "C"]]
@@ -0,0 +1,46 @@
+import json
+
+from pdf_builder import build_pdf
+from utils.gpt_trigger_controller import GATE_COUNTERS, gate_summary, should_trigger_gpt
+
+def test_low_risk_document_is_skipped():
+    summary = {"risk_score": 5, "suppression_flags": [], "extracted_entities": ["Email: a@b.c"]}
+    assert should_trigger_gpt(summary, [{"text": "a long enough page of ordinary text"}]) is False
+
+def test_entity_and_block_triggers():
+    assert should_trigger_gpt({"extracted_entities": ["Amount: $79"]}, [])
+    assert should_trigger_gpt({"extracted_entities": ["Registry Key: 0512345678"]}, [])
+    assert should_trigger_gpt({"extracted_entities": ["Phone: 555"] * 25}, [])
+    assert should_trigger_gpt({}, [{"chars": 3}, {"chars": 5}, {"cid_font_used": True}])
+
+def test_gate_counts_decisions():
+    before = GATE_COUNTERS.copy()
+    entities = {"emails": ["a@b.c"], "amounts": ["$1"]}
+    assert gate_summary(entities, [], [{"page": 1, "cid_font": False, "chars": 400}]) is True
+    assert gate_summary({"emails": ["a@b.c"]}, [], [{"page": 1, "cid_font": False, "chars": 400}]) is False
+    assert GATE_COUNTERS["triggered"] - before["triggered"] == 1
+    assert GATE_COUNTERS["skipped"] - before["skipped"] == 1
+
+def _tampered_pdf() -> bytes:
+    # Modified after creation, with a form but no signature field.
+    return build_pdf({
+        1: b"<< /Type /Catalog /Pages 2 0 R /AcroForm << /Fields [] >> >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>",
+        4: b"<< /CreationDate (D:20240102100000Z) /ModDate (D:20240301120000Z) >>",
+    }, b"/Info 4 0 R")
+
+def test_risk_score_alone_triggers_the_summary(tmp_path):
+    from scoring_engine import ScoringEngine, score_document
+    from utils.parsed_pdf import ParsedPdf
+
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"timestamp_mismatch": 25, "acroform_without_signature": 10}))
+    with ParsedPdf(_tampered_pdf()) as pdf:
+        risk = score_document(pdf, engine=ScoringEngine(str(rules)))
+    assert risk["risk_score"] == 35
+    assert risk["risk_flags"][:2] == ["Timestamp mismatch", "AcroForm without cryptographic signature"]
+
+    bland = ({"emails": ["a@b.c"]}, [], [{"page": 1, "cid_font": False, "chars": 400}])
+    assert gate_summary(*bland, risk_score=risk["risk_score"]) is True
+    assert gate_summary(*bland, risk_score=0) is False
@@ -0,0 +1,31 @@
+import hidden_text
+from hidden_text import extract_hidden_text
+from pdf_builder import build_pdf
+from utils.parsed_pdf import ParsedPdf
+
+CONTENT = b"BT /F1 12 Tf 72 700 Td (Visible) Tj ET q BT /F1 12 Tf 3 Tr 72 680 Td (Ghost line) Tj ET Q"
+
+def _pdf() -> bytes:
+    return build_pdf({
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        4: b"<< /Length %d >>\nstream\n%s\nendstream" % (len(CONTENT), CONTENT),
+        5: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    })
+
+def test_path_input_is_read_and_released(tmp_path, monkeypatch):
+    path = tmp_path / "hidden.pdf"
+    path.write_bytes(_pdf())
+    opened = []
+    def tracking(source):
+        opened.append(ParsedPdf.from_path(source))
+        return opened[0]
+    monkeypatch.setattr(hidden_text, "as_parsed_pdf", tracking)
+    assert "Ghost line" in extract_hidden_text(str(path))
+    assert opened[0]._owned is None and opened[0]._view is None
+
+def test_shared_context_is_left_open():
+    with ParsedPdf(_pdf()) as pdf:
+        assert "Ghost line" in extract_hidden_text(pdf)
+        assert bytes(pdf.data[:5]) == b"%PDF-"
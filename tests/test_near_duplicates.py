@@ -0,0 +1,30 @@
+from near_duplicates import NearDuplicateIndex, structure_shingles, text_shingles
+
+DEED = (
+    "This warranty deed is made between {grantor} as grantor and the county trust as grantee. "
+    "For the sum of ten dollars the grantor conveys the parcel described in exhibit A, "
+    "together with all improvements, easements and rights of way appurtenant thereto, "
+    "free of encumbrances except those of record. Witness the hand of the grantor this day."
+)
+
+def test_template_reuse_is_found():
+    index = NearDuplicateIndex(":memory:")
+    assert index.add("original.pdf", text_shingles(DEED.format(grantor="Alice Smith"))) == []
+    index.add("unrelated.pdf", text_shingles("Quarterly water bill for the municipal utility district account"))
+    matches = index.add("forged.pdf", text_shingles(DEED.format(grantor="Robert Jones")))
+    assert [m["doc_key"] for m in matches] == ["original.pdf"]
+    assert matches[0]["similarity"] >= 0.7
+
+def test_structure_shingles_ignore_values():
+    a = b"1 0 obj << /Type /Page /Contents 2 0 R >> endobj 2 0 obj << /Length 3 >> stream\nabc\nendstream"
+    b = b"1 0 obj << /Type /Page /Contents 9 0 R >> endobj 2 0 obj << /Length 7 >> stream\nabcdefg\nendstream"
+    assert structure_shingles(a) == structure_shingles(b)
+    assert structure_shingles(a) != structure_shingles(b"1 0 obj << /Type /Catalog >> endobj")
+
+def test_empty_shingle_sets_are_not_indexed():
+    index = NearDuplicateIndex(":memory:")
+    assert index.add("blank1.pdf", set()) == []
+    assert index.add("blank2.pdf", text_shingles("")) == []
+    assert len(index) == 0
+    index.add("original.pdf", text_shingles(DEED.format(grantor="Alice Smith")))
+    assert index.query(set(), threshold=0.0) == []
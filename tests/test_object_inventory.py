@@ -0,0 +1,93 @@
+import io
+import zlib
+
+from pdf_builder import add_objects, add_xref_stream
+from signature_validator import validate_signatures
+from utils.metadata import extract_metadata
+from utils.object_inventory import build_inventory
+from utils.parsed_pdf import ParsedPdf
+from utils.stream_filters import DecodeBudget
+
+def _pdf_with_object_stream() -> bytes:
+    # Objects 1-4 and 7 are plain, 5 and 6 live in object stream 7,
+    # and the xref is a stream (object 8).
+    out = bytearray(b"%PDF-1.5\n")
+    offsets = add_objects(out, {
+        1: b"<< /Type /Catalog /Pages 2 0 R /AcroForm << /Fields [5 0 R] /SigFlags 3 >>"
+           b" /OpenAction << /S /JavaScript /JS (x) /Next << /S /Launch /F (cmd.exe) >> >> >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        3: b"<< /Type /Page /Parent 2 0 R /Annots [5 0 R 6 0 R] /Resources << /Font << /F1 4 0 R >> >> >>",
+        4: b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Dummy >>",
+    })
+
+    members = [
+        b"<< /FT /Sig /T (Signature1) /Subtype /Widget /Rect [0 0 10 10] >>",
+        b"<< /Subtype /Link /A << /S /URI /URI (http://example.com) >> /AA << /O << /S /JavaScript /JS (app.alert(1)) >> >> >>",
+    ]
+    header = b"5 0 6 %d " % (len(members[0]) + 1)
+    body = zlib.compress(header + members[0] + b" " + members[1])
+    offsets.update(add_objects(out, {
+        7: b"<< /Type /ObjStm /N 2 /First %d /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream" % (len(header), len(body), body),
+    }))
+
+    rows = [(0, 0, 65535)] + [(1, offsets[n], 0) for n in (1, 2, 3, 4)] + [(2, 7, 0), (2, 7, 1), (1, offsets[7], 0)]
+    add_xref_stream(out, 8, rows)
+    return bytes(out)
+
+def test_inventory_indexes_plain_and_compressed_objects():
+    with ParsedPdf(_pdf_with_object_stream()) as pdf:
+        inventory = pdf.inventory
+        assert inventory.errors == []
+        assert inventory.nums.tolist() == [1, 2, 3, 4, 5, 6, 7]
+        assert inventory.cid_fonts().tolist() == [4]
+        assert inventory.signature_fields().tolist() == [5]
+        assert inventory.annotations().tolist() == [5, 6]
+        # every inline action is recorded, not just the riskiest
+        assert inventory.actions().tolist() == [1, 6]
+        assert inventory.actions("/Launch").tolist() == [1]
+        assert inventory.actions("/URI").tolist() == [6]
+        assert inventory.counts("action") == {"/JavaScript": 2, "/Launch": 1, "/URI": 1}
+        assert inventory.entry(1)["actions"] == ["/JavaScript", "/Launch"]
+        assert inventory.counts("type") == {"/Catalog": 1, "/Pages": 1, "/Page": 1, "/Font": 1, "/ObjStm": 1}
+
+        stream = inventory.entry(7)
+        assert stream["filter"] == "/FlateDecode" and stream["length"] > 0 and stream["container"] == -1
+        signature = inventory.entry(5)
+        assert signature["container"] == 7 and signature["offset"] == -1 and signature["length"] == -1
+        assert inventory.entry(99) is None
+
+def test_structure_streams_share_the_document_budget():
+    data = _pdf_with_object_stream()
+    with ParsedPdf(data) as pdf:
+        assert pdf.inventory.errors == []
+        # 8 xref rows of 7 bytes, then the object stream, charged to one budget
+        assert pdf.decode_budget.used == 8 * 7 + 191
+    budget = DecodeBudget(max_document_bytes=60)
+    inventory = build_inventory(data, budget=budget)
+    assert budget.used == 60
+    assert inventory.errors[0].startswith("object stream 7 failed to decode")
+
+def test_stages_answer_from_the_inventory():
+    with ParsedPdf(_pdf_with_object_stream()) as pdf:
+        assert extract_metadata(pdf)["cid_font_usage"] is True
+        results = validate_signatures(pdf)
+    assert "1 signature field(s) found." in results
+    assert "Page annotations present – potential for invisible overlays." in results
+    assert "2 JavaScript action(s) found (objects 1, 6)." in results
+    assert "1 Launch action(s) found (objects 1)." in results
+
+def test_objects_are_found_by_scanning_without_xref():
+    data = _pdf_with_object_stream()
+    data = data[:data.rfind(b"8 0 obj")]
+    with ParsedPdf(data) as pdf:
+        inventory = pdf.inventory
+        assert inventory.nums.tolist() == [1, 2, 3, 4, 7]
+        assert inventory.cid_fonts().tolist() == [4]
+        assert any("scanning" in e for e in inventory.errors)
+
+def test_uploads_are_indexed_in_place():
+    # in-memory uploads reach the parsers as a memoryview, not bytes
+    with ParsedPdf.from_file(io.BytesIO(_pdf_with_object_stream())) as pdf:
+        assert isinstance(pdf.data, memoryview)
+        assert pdf.inventory.errors == []
+        assert pdf.inventory.signature_fields().tolist() == [5]
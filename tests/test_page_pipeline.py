@@ -0,0 +1,45 @@
+from pdf_builder import build_pdf
+from utils.page_pipeline import analyze_page, iter_pages
+from utils.parsed_pdf import ParsedPdf
+
+def _pdf(texts) -> bytes:
+    # One page per entry; an empty entry gives a page without a text layer.
+    pages = len(texts)
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % (10 + 2 * i) for i in range(pages)), pages),
+        3: b"<< /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> >> >>",
+    }
+    for i, text in enumerate(texts):
+        content = b"BT /F1 12 Tf 72 700 Td (%s) Tj ET" % text.encode() if text else b""
+        objects[10 + 2 * i] = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources 3 0 R /Contents %d 0 R >>" % (11 + 2 * i)
+        objects[11 + 2 * i] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+    return build_pdf(objects)
+
+def test_static_mode_never_opens_fitz():
+    with ParsedPdf(_pdf(["Invoice 4471", ""])) as pdf:
+        records = list(iter_pages(pdf, static_mode=True))
+        assert [(r["page"], r["source"]) for r in records] == [(1, "static"), (2, None)]
+        assert "Invoice 4471" in records[0]["text"]
+        # the blank page would need OCR, which static mode skips
+        assert not records[1]["ocr"] and records[1]["error"] is None
+        assert pdf._fitz_doc is None
+
+def test_fitz_mode_reads_the_text_layer():
+    with ParsedPdf(_pdf(["Wire to account 12"])) as pdf:
+        record = analyze_page(pdf, 0, ocr=False)
+        assert record["source"] == "fitz" and "Wire to account 12" in record["text"]
+
+def test_max_pages_limits_the_pages_read():
+    with ParsedPdf(_pdf(["one", "two", "three", "four"])) as pdf:
+        assert [r["page"] for r in iter_pages(pdf, static_mode=True, max_pages=2)] == [1, 2]
+        assert sorted(pdf._stream_data) == [(11, 0), (13, 0)]
+        assert len(list(iter_pages(pdf, static_mode=True, max_pages=10))) == 4
+
+def test_early_stop_leaves_later_pages_untouched():
+    with ParsedPdf(_pdf(["one", "two", "three"])) as pdf:
+        pages = iter_pages(pdf, static_mode=True)
+        assert next(pages)["page"] == 1
+        assert sorted(pdf._stream_data) == [(11, 0)]
+        pages.close()
+        assert sorted(pdf._stream_data) == [(11, 0)]
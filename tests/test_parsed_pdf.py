@@ -0,0 +1,82 @@
+import io
+
+from pdf_builder import build_pdf
+from utils.parsed_pdf import ParsedPdf, as_parsed_pdf
+
+def _minimal_pdf() -> bytes:
+    return build_pdf({
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>",
+        4: b"<< /Producer (Test Producer) >>",
+    }, b"/Info 4 0 R")
+
+def test_inputs_are_parsed_in_place(tmp_path):
+    raw = _minimal_pdf()
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(raw)
+    upload = io.BytesIO(raw)
+
+    with open(path, "rb") as fh:
+        sources = [raw, memoryview(raw), str(path), upload, fh]
+        for source in sources:
+            with as_parsed_pdf(source) as pdf:
+                assert pdf.size == len(raw)
+                assert len(pdf.pages) == 1
+                assert pdf.metadata["/Producer"] == "Test Producer"
+                assert bytes(pdf.view[:8]) == b"%PDF-1.4"
+
+    # closing released the upload's exported buffer, so it is writable again
+    upload.write(b"%% trailing comment\n")
+
+def test_from_path_maps_file(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(_minimal_pdf())
+    pdf = ParsedPdf.from_path(str(path))
+    assert not isinstance(pdf.data, bytes)
+    assert pdf.sha256 == ParsedPdf(path.read_bytes()).sha256
+    pdf.close()
+
+def test_facets_are_built_once(monkeypatch):
+    import PyPDF2
+    import utils.xref_index
+
+    calls = {"reader": 0, "xref": 0}
+    reader_cls, read_chain = PyPDF2.PdfReader, utils.xref_index.read_xref_chain
+    def counting_reader(*args, **kwargs):
+        calls["reader"] += 1
+        return reader_cls(*args, **kwargs)
+    def counting_chain(*args, **kwargs):
+        calls["xref"] += 1
+        return read_chain(*args, **kwargs)
+    monkeypatch.setattr(PyPDF2, "PdfReader", counting_reader)
+    monkeypatch.setattr(utils.xref_index, "read_xref_chain", counting_chain)
+
+    with ParsedPdf(_minimal_pdf()) as pdf:
+        assert pdf.pages is pdf.pages and pdf.inventory is pdf.inventory
+        assert pdf.fitz_doc is pdf.fitz_doc
+        page_ref = pdf.root.raw_get("/Pages")
+        assert pdf.resolve(page_ref) is pdf.resolve(page_ref)
+        assert pdf.metadata["/Producer"] == "Test Producer"
+        assert calls == {"reader": 1, "xref": 1}
+
+def test_close_releases_the_mapping(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(_minimal_pdf())
+    pdf = ParsedPdf.from_path(str(path))
+    mapping = pdf._owned
+    assert len(pdf.pages) == 1 and pdf.fitz_doc.page_count == 1
+    pdf.close()
+    assert mapping.closed and pdf._owned is None and pdf._view is None
+    assert pdf._reader is None and pdf._pages is None and pdf._fitz_doc is None
+    pdf.close()  # closing twice is harmless
+
+def test_existing_context_is_passed_through():
+    from revision_analyzer import analyze_revisions
+
+    with ParsedPdf(_minimal_pdf()) as pdf:
+        assert as_parsed_pdf(pdf) is pdf
+        pages = pdf.pages
+        # a stage handed the shared context must not close it
+        assert analyze_revisions(pdf)["revisions"] == 1
+        assert pdf.pages is pages and bytes(pdf.view[:5]) == b"%PDF-"
@@ -0,0 +1,35 @@
+import fitz
+
+from report_generator import generate_affidavit, generate_affidavit_sharded
+
+def _items(n):
+    return [
+        {
+            "filename": f"doc{i}.pdf",
+            "sha256": f"{i:064x}",
+            "producer": "iText",
+            "entities": {"grantors": ["Jane Doe"], "grantees": []},
+            "cid_font": i % 2 == 0,
+            "fraud_flags": ["Timestamp mismatch"] * (i % 3),
+        }
+        for i in range(n)
+    ]
+
+def test_sharded_report_matches_serial(tmp_path):
+    serial = generate_affidavit(_items(7), str(tmp_path / "serial.pdf"))
+    sharded = generate_affidavit_sharded(iter(_items(7)), str(tmp_path / "sharded.pdf"), workers=2, shard_size=3)
+    with fitz.open(serial) as a, fitz.open(sharded) as b:
+        assert a.page_count == b.page_count
+        assert [a[i].get_text() for i in range(a.page_count)] == [b[i].get_text() for i in range(b.page_count)]
+        toc = b.get_toc()
+        assert [entry[1] for entry in toc] == [f"doc{i}.pdf" for i in range(7)]
+        assert "doc4.pdf" in b[toc[4][2] - 1].get_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["serial.pdf", "sharded.pdf"]
+
+def test_unmerged_shards_get_an_index(tmp_path):
+    index = generate_affidavit_sharded(_items(5), str(tmp_path / "report.pdf"), workers=1, shard_size=2, merge=False)
+    parts = sorted(p.name for p in tmp_path.iterdir() if p.name != "report.pdf")
+    assert parts == ["report_part0000.pdf", "report_part0001.pdf", "report_part0002.pdf"]
+    with fitz.open(index) as doc:
+        text = doc[0].get_text()
+    assert "doc4.pdf" in text and "report_part0002.pdf" in text
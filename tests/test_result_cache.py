@@ -0,0 +1,38 @@
+from utils.result_cache import ResultCache, pipeline_fingerprint
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    key = ResultCache.make_key("abc", pipeline_fingerprint(static_mode=False))
+    assert cache.get(key) is None
+    cache.put(key, {"entities": {"emails": ["a@b.c"]}})
+    assert cache.get(key) == {"entities": {"emails": ["a@b.c"]}}
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["lifetime"]["hits"] == 1
+
+def test_fingerprint_tracks_options():
+    assert pipeline_fingerprint(static_mode=True) != pipeline_fingerprint(static_mode=False)
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), max_bytes=2000)
+    blob = "x" * 5000  # compresses to a few dozen bytes
+    for i in range(100):
+        cache.put(f"k{i}:fp", {"i": i, "text": blob + str(i)})
+        cache.get("k0:fp")  # keep k0 hot
+    assert cache.stats()["bytes"] <= 2000
+    assert cache.get("k0:fp") is not None
+    assert cache.get("k1:fp") is None
+    assert cache.evictions > 0
+
+def test_running_size_total(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(path, max_bytes=3000)
+    for i in range(60):
+        cache.put(f"k{i % 40}:fp", {"i": i, "text": "y" * (100 * i)})
+    cache.delete("k3:fp")
+    cache.delete("missing:fp")
+    counted = cache._conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+    assert counted == cache.stats()["bytes"] <= 3000
+    cache.close()
+    # a second connection picks up the same total
+    assert ResultCache(path, max_bytes=3000).stats()["bytes"] == counted
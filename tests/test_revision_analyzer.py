@@ -0,0 +1,60 @@
+from pdf_builder import add_objects, add_xref_stream, add_xref_table
+from revision_analyzer import analyze_revisions
+from utils.xref_index import COMPRESSED, FREE, IN_USE, read_xref_chain
+
+def _incremental_pdf():
+    out = bytearray(b"%PDF-1.4\n")
+    base = add_objects(out, {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        3: b"<< /Type /Page /Parent 2 0 R >>",
+        4: b"<< /Producer (Scanner) >>",
+    })
+    first = add_xref_table(out, {0: None, **base}, b"<< /Size 5 /Root 1 0 R /Info 4 0 R >>")
+    update = add_objects(out, {3: b"<< /Type /Page /Parent 2 0 R /Annots [5 0 R] >>", 5: b"<< /Type /Annot /Subtype /Widget >>"})
+    second = add_xref_table(out, update, b"<< /Size 6 /Root 1 0 R /Info 4 0 R /Prev %d >>" % first)
+    add_xref_table(out, {5: None}, b"<< /Size 6 /Root 1 0 R /Info 4 0 R /Prev %d >>" % second)
+    return bytes(out)
+
+def test_incremental_updates_are_reconstructed():
+    result = analyze_revisions(_incremental_pdf())
+    assert result["error"] is None
+    assert result["revisions"] == 3 and result["incremental_updates"] == 2
+    assert result["redefined_objects"] == 1
+    base, edit, removal = result["history"]
+    assert base["added"] == [1, 2, 3, 4]
+    assert edit["added"] == [5] and edit["modified"] == [3]
+    assert edit["changed_types"] == {"/Page": 1, "/Annot": 1}
+    assert removal["deleted"] == [5] and removal["objects"] == 4
+    assert base["end_offset"] < edit["end_offset"] < removal["end_offset"]
+    assert "2 incremental update(s) after the original revision" in result["flags"]
+
+def test_xref_stream_section():
+    out = bytearray(b"%PDF-1.5\n")
+    offsets = add_objects(out, {1: b"<< /Type /Catalog /Pages 2 0 R >>", 2: b"<< /Type /ObjStm /N 1 /First 4 /Length 0 >>\nstream\n\nendstream"})
+    add_xref_stream(out, 4, [(0, 0, 65535), (1, offsets[1], 0), (1, offsets[2], 0), (2, 2, 0)])
+    chain = read_xref_chain(bytes(out))
+    assert chain.errors == [] and len(chain.sections) == 1
+    section = chain.sections[0]
+    assert section.kind == "stream"
+    assert section.nums.tolist() == [0, 1, 2, 3]
+    assert section.types.tolist() == [FREE, IN_USE, IN_USE, COMPRESSED]
+    assert section.fields.tolist()[1:] == [offsets[1], offsets[2], 2]
+
+def test_broken_chain_is_recovered_by_scanning():
+    data = _incremental_pdf().replace(b"startxref\n", b"startxref\n9", 1)
+    data = data[:data.rfind(b"startxref")] + b"startxref\n99999999\n%%EOF\n"
+    result = analyze_revisions(data)
+    assert result["revisions"] >= 1
+    assert any("Xref chain" in f for f in result["flags"])
+
+def test_huge_object_numbers_are_compacted():
+    out = bytearray(_incremental_pdf())
+    prev = int(out[out.rindex(b"startxref") + 10:].split()[0])
+    stray = add_objects(out, {900000000: b"<< /Type /Annot /Subtype /Stamp >>"})
+    add_xref_table(out, stray, b"<< /Size 900000001 /Root 1 0 R /Info 4 0 R /Prev %d >>" % prev)
+    result = analyze_revisions(bytes(out))
+    assert result["error"] is None and result["revisions"] == 4
+    last = result["history"][-1]
+    assert last["added"] == [900000000] and last["changed_types"] == {"/Annot": 1}
+    assert last["objects"] == 5
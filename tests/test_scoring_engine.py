@@ -0,0 +1,46 @@
+import json
+import os
+
+from scoring_engine import ScoringEngine
+
+RECORDS = [
+    {"creation_date": "D:2024", "mod_date": "D:2025", "has_acroform": True, "xmp_toolkit": "XMP"},
+    {"creation_date": "D:2024", "mod_date": "D:2024", "has_acroform": True, "has_signature_field": True},
+    {"signature_overlay_detected": True, "hidden_lib_usage": "iText", "xmp_toolkit": "XMP"},
+    {},
+]
+
+def test_legacy_weights_and_batch_agree(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"timestamp_mismatch": 10, "acroform_without_signature": 5,
+                                "signature_overlay": 7, "missing_xmp_toolkit": 2}))
+    engine = ScoringEngine(str(path))
+    single = [engine.score(md) for md in RECORDS]
+    assert single[0] == {"risk_score": 15, "risk_flags": ["Timestamp mismatch", "AcroForm without cryptographic signature"]}
+    assert single[3] == {"risk_score": 2, "risk_flags": ["Missing XMP toolkit"]}
+    assert engine.score_batch(RECORDS) == single
+
+def test_shipped_rules_match_legacy_weights():
+    engine = ScoringEngine("config/scoring_rules.json")
+    assert engine.score(RECORDS[0])["risk_score"] == 15
+    assert engine.score_batch(RECORDS) == [engine.score(md) for md in RECORDS]
+
+def test_declarative_rules_and_hot_reload(tmp_path, monkeypatch):
+    monkeypatch.setattr("scoring_engine.RELOAD_CHECK_INTERVAL", 0)
+    path = tmp_path / "rules.json"
+    rule = {"id": "itext", "flag": "iText producer", "weight": 20,
+            "when": {"any": [{"field": "producer", "op": "regex", "value": "itext", "ignorecase": True},
+                             {"field": "pages", "op": "gt", "value": 500}]}}
+    path.write_text(json.dumps({"rules": [rule]}))
+    engine = ScoringEngine(str(path), hot_reload=True)
+    records = [{"producer": "iText 7.1"}, {"pages": 900}, {"producer": "Word", "pages": 3}]
+    assert [r["risk_score"] for r in engine.score_batch(records)] == [20, 20, 0]
+
+    rule["weight"] = 40
+    path.write_text(json.dumps({"rules": [rule]}))
+    os.utime(path, (1, 1))
+    assert engine.score(records[0])["risk_score"] == 40
+
+    path.write_text("{ not json")
+    os.utime(path, (2, 2))
+    assert engine.score(records[0])["risk_score"] == 40
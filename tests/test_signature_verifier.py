@@ -0,0 +1,175 @@
+import hashlib
+import random
+
+from pdf_builder import add_objects, add_xref_table
+from signature_validator import validate_signatures
+from signature_verifier import verify_signatures
+from utils.cms import parse_signed_data, verify_rsa
+
+# -- a tiny DER encoder and RSA key, enough to sign a test PDF ----------
+
+def _der(tag, *parts):
+    body = b"".join(parts)
+    n = len(body)
+    length = bytes([n]) if n < 0x80 else bytes([0x80 | ((n.bit_length() + 7) // 8)]) + n.to_bytes((n.bit_length() + 7) // 8, "big")
+    return bytes([tag]) + length + body
+
+def _oid(dotted):
+    nums = [int(x) for x in dotted.split(".")]
+    out = bytes([40 * nums[0] + nums[1]])
+    for n in nums[2:]:
+        chunk = [n & 0x7F]
+        n >>= 7
+        while n:
+            chunk.append(0x80 | (n & 0x7F))
+            n >>= 7
+        out += bytes(reversed(chunk))
+    return _der(0x06, out)
+
+def _int(n):
+    return _der(0x02, n.to_bytes(n.bit_length() // 8 + 1, "big"))
+
+def _alg(dotted, null=True):
+    return _der(0x30, _oid(dotted), b"\x05\x00" if null else b"")
+
+def _name(cn):
+    return _der(0x30, _der(0x31, _der(0x30, _oid("2.5.4.3"), _der(0x0C, cn.encode()))))
+
+def _prime(rng, bits):
+    while True:
+        n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if all(pow(rng.randrange(2, n - 1), n - 1, n) == 1 for _ in range(20)):
+            return n
+
+def _key():
+    rng = random.Random(1)
+    e = 65537
+    while True:
+        p, q = _prime(rng, 384), _prime(rng, 384)
+        phi = (p - 1) * (q - 1)
+        if phi % e:
+            return p * q, e, pow(e, -1, phi)
+
+SHA256 = "2.16.840.1.101.3.4.2.1"
+N, E, D = _key()
+
+def _cms(digest):
+    name = _name("Test Signer")
+    spki = _der(0x30, _alg("1.2.840.113549.1.1.1"), _der(0x03, b"\x00" + _der(0x30, _int(N), _int(E))))
+    validity = _der(0x30, _der(0x17, b"250101000000Z"), _der(0x17, b"300101000000Z"))
+    tbs = _der(0x30, _der(0xA0, _int(2)), _int(7), _alg("1.2.840.113549.1.1.11"), name, validity, name, spki)
+    cert = _der(0x30, tbs, _alg("1.2.840.113549.1.1.11"), _der(0x03, b"\x00"))
+    attrs = (
+        _der(0x30, _oid("1.2.840.113549.1.9.3"), _der(0x31, _oid("1.2.840.113549.1.7.1")))
+        + _der(0x30, _oid("1.2.840.113549.1.9.4"), _der(0x31, _der(0x04, digest)))
+        + _der(0x30, _oid("1.2.840.113549.1.9.5"), _der(0x31, _der(0x17, b"260101120000Z")))
+    )
+    digest_info = _der(0x30, _alg(SHA256), _der(0x04, hashlib.sha256(_der(0x31, attrs)).digest()))
+    size = (N.bit_length() + 7) // 8
+    padded = b"\x00\x01" + b"\xff" * (size - 3 - len(digest_info)) + b"\x00" + digest_info
+    signature = pow(int.from_bytes(padded, "big"), D, N).to_bytes(size, "big")
+    signer = _der(0x30, _int(1), _der(0x30, name, _int(7)), _alg(SHA256), _der(0xA0, attrs),
+                  _alg("1.2.840.113549.1.1.1"), _der(0x04, signature))
+    signed_data = _der(0x30, _int(1), _der(0x31, _alg(SHA256)), _der(0x30, _oid("1.2.840.113549.1.7.1")),
+                       _der(0xA0, cert), _der(0x31, signer))
+    return _der(0x30, _oid("1.2.840.113549.1.7.2"), _der(0xA0, signed_data))
+
+# -- signed PDF --------------------------------------------------------
+
+CONTENTS_SPACE = 4096
+
+def _signed_pdf(extra_gap=0):
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = add_objects(out, {
+        1: b"<< /Type /Catalog /Pages 2 0 R /AcroForm << /Fields [4 0 R] /SigFlags 3 >> >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Annots [4 0 R] >>",
+        4: b"<< /FT /Sig /T (Signature1) /Subtype /Widget /Rect [0 0 0 0] /V 5 0 R >>",
+    })
+    # object 5 is written by hand: the byte range and CMS blob are patched in below
+    offsets[5] = len(out)
+    out += b"5 0 obj\n<< /Type /Sig /Filter /Adobe.PPKLite /SubFilter /adbe.pkcs7.detached /Name (Test Signer)"
+    out += b" /M (D:20260101120000Z) /ByteRange ["
+    range_at = len(out)
+    out += b" " * 40 + b"] /Contents <"
+    gap_start = len(out) - 1
+    out += b"0" * (2 * CONTENTS_SPACE) + b">"
+    gap_end = len(out) + extra_gap
+    out += b" >>\nendobj\n"
+    add_xref_table(out, {0: None, **offsets}, b"<< /Size 6 /Root 1 0 R >>")
+
+    ranges = [0, gap_start, gap_end, len(out) - gap_end]
+    out[range_at:range_at + 40] = " ".join(map(str, ranges)).ljust(40).encode()
+    digest = hashlib.sha256(bytes(out[:gap_start]) + bytes(out[gap_end:])).digest()
+    blob = _cms(digest).hex().encode()
+    out[gap_start + 1:gap_start + 1 + len(blob)] = blob
+    return bytes(out)
+
+def test_intact_signature_verifies():
+    result = verify_signatures(_signed_pdf())
+    assert result["error"] is None and result["flags"] == []
+    (sig,) = result["signatures"]
+    assert sig["object"] == 5 and sig["subfilter"] == "/adbe.pkcs7.detached"
+    assert sig["covers_whole_file"] and sig["contents_in_gap"]
+    assert sig["digest_algorithm"] == "sha256"
+    assert sig["digest_matches"] is True and sig["signature_valid"] is True
+    assert sig["signer"]["subject"] == {"CN": "Test Signer"}
+    assert sig["signing_time"].startswith("2026-01-01T12:00:00")
+    assert sig["signed_revision"] == 0 and sig["revisions_after"] == 0
+    assert result["modified_after_signing"] is False
+
+def test_edited_content_breaks_the_digest():
+    data = _signed_pdf().replace(b"/MediaBox [0 0 612 792]", b"/MediaBox [0 0 612 999]")
+    (sig,) = verify_signatures(data)["signatures"]
+    assert sig["digest_matches"] is False
+    assert sig["signature_valid"] is True  # the signed attributes themselves are untouched
+
+def test_incremental_update_after_signing():
+    data = _signed_pdf()
+    xref = data.rindex(b"\nxref\n") + 1
+    update = bytearray(data)
+    page = add_objects(update, {3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"})
+    add_xref_table(update, page, b"<< /Size 6 /Root 1 0 R /Prev %d >>" % xref)
+    result = verify_signatures(bytes(update))
+    (sig,) = result["signatures"]
+    assert sig["digest_matches"] is True and not sig["covers_whole_file"]
+    assert sig["signed_revision"] == 0
+    assert sig["revisions_after"] == 1 and sig["objects_changed_after"] == 1
+    assert result["modified_after_signing"] is True
+    assert any("1 revision(s) saved after signing" in f for f in result["flags"])
+    assert any("saved after signing" in m for m in validate_signatures(bytes(update)))
+
+def test_unsigned_bytes_beside_contents_are_flagged():
+    result = verify_signatures(_signed_pdf(extra_gap=3))
+    (sig,) = result["signatures"]
+    assert not sig["contents_in_gap"]
+    assert any("not covered" in f for f in result["flags"])
+
+def _signer():
+    signed = parse_signed_data(_cms(b"\x00" * 32))
+    (signer,) = signed.signers
+    return signer, signed.signer_certificate(signer), signer.signed_attrs
+
+def _sign(digest_info, trailer=b""):
+    # an arbitrary PKCS#1 block, signed with the test key
+    size = (N.bit_length() + 7) // 8
+    block = b"\x00\x01" + b"\xff" * (size - 3 - len(digest_info) - len(trailer)) + b"\x00" + digest_info + trailer
+    return pow(int.from_bytes(block, "big"), D, N).to_bytes(size, "big")
+
+def test_rsa_block_must_match_the_encoding_exactly():
+    signer, cert, attrs = _signer()
+    digest = lambda name: hashlib.new(name, attrs).digest()
+    hashed = _der(0x04, hashlib.sha256(attrs).digest())
+    info = _der(0x30, _alg(SHA256), hashed)
+    assert verify_rsa(signer._replace(signature=_sign(info)), cert, digest) is True
+    bare = _der(0x30, _alg(SHA256, null=False), hashed)
+    assert verify_rsa(signer._replace(signature=_sign(bare)), cert, digest) is True
+    # bytes trailing the DigestInfo, where forged signatures hide their garbage
+    assert verify_rsa(signer._replace(signature=_sign(info, b"\x00" * 4)), cert, digest) is False
+
+def test_rsa_digest_info_must_use_the_signer_algorithm():
+    signer, cert, attrs = _signer()
+    assert signer.digest_algorithm == "sha256"
+    sha1_info = _der(0x30, _alg("1.3.14.3.2.26"), _der(0x04, hashlib.sha1(attrs).digest()))
+    forged = signer._replace(signature=_sign(sha1_info))
+    assert verify_rsa(forged, cert, lambda name: hashlib.new(name, attrs).digest()) is False
@@ -0,0 +1,77 @@
+import base64
+import zlib
+
+from utils.stream_filters import DecodeBudget, decode_stream, lzw_decode
+from utils.stream_scanner import iter_decoded_streams, iter_raw_streams
+from utils.utility import is_ascii85_encoded
+
+def _png_up_rows(rows):
+    # Encode rows with the PNG "Up" filter (type 2).
+    out = bytearray()
+    prev = bytes(len(rows[0]))
+    for row in rows:
+        out.append(2)
+        out += bytes((r - p) & 0xFF for r, p in zip(row, prev))
+        prev = row
+    return bytes(out)
+
+def test_ascii85_then_flate_chain():
+    body = base64.a85encode(zlib.compress(b"BT (Grantor: Jane Doe) Tj ET")) + b"~>"
+    result = decode_stream(body, b"<< /Filter [/ASCII85Decode /FlateDecode] >>")
+    assert result.complete
+    assert result.data == b"BT (Grantor: Jane Doe) Tj ET"
+    assert result.filters == ["/ASCII85Decode", "/FlateDecode"]
+
+def test_flate_png_predictor():
+    rows = [bytes([1, 2, 3, 4]), bytes([5, 6, 7, 8]), bytes([9, 9, 9, 9])]
+    raw = zlib.compress(_png_up_rows(rows))
+    result = decode_stream(raw, b"<< /Filter /FlateDecode /DecodeParms << /Predictor 12 /Columns 4 >> >>")
+    assert result.data == b"".join(rows)
+
+def test_truncated_flate_keeps_partial_output():
+    payload = bytes(range(256)) * 200
+    raw = zlib.compress(payload)
+    result = decode_stream(raw[: len(raw) // 2], b"<< /Filter /FlateDecode >>")
+    assert not result.complete
+    assert result.data and payload.startswith(result.data)
+
+def test_lzw_spec_example():
+    data, complete = lzw_decode(bytes.fromhex("800B6050220C0C8501"), limit=1024)
+    assert data == b"-----A---B" and complete
+
+def test_hex_and_runlength():
+    assert decode_stream(b"48 65 6C6C 6F>", b"<< /Filter /AHx >>").data == b"Hello"
+    assert decode_stream(b"\x02abc\xfdz\x80", b"<< /Filter /RunLengthDecode >>").data == b"abczzzz"
+
+def test_decompression_bomb_is_capped():
+    bomb = zlib.compress(b"\0" * (4 * 1024 * 1024))
+    budget = DecodeBudget(max_stream_bytes=1024 * 1024, max_document_bytes=2 * 1024 * 1024)
+    result = decode_stream(bomb, b"<< /Filter /FlateDecode >>", budget)
+    assert not result.complete and "exceeds" in result.error
+    assert result.data == b"\0" * (1024 * 1024)  # truncated at the stream limit
+    assert budget.used == 1024 * 1024
+    decode_stream(bomb, b"<< /Filter /FlateDecode >>", budget)
+    assert budget.exhausted
+    assert decode_stream(bomb, b"<< /Filter /FlateDecode >>", budget).error == "document decode budget exhausted"
+
+def test_text_filters_stop_at_the_limit():
+    budget = DecodeBudget(max_stream_bytes=8)
+    result = decode_stream(b"41" * 20 + b">", b"<< /Filter /AHx >>", budget)
+    assert result.data == b"A" * 8 and not result.complete
+    result = decode_stream(b"z" * 10 + b"~>", b"<< /Filter /A85 >>", DecodeBudget(max_stream_bytes=8))
+    assert result.data == b"\0" * 8 and "exceeds" in result.error
+    assert decode_stream(b"zz~>", b"<< /Filter /A85 >>", DecodeBudget(max_stream_bytes=8)).complete
+
+def test_scanner_honours_length_and_chain():
+    body = base64.a85encode(zlib.compress(b"q 1 0 0 1 0 0 cm Q endstream")) + b"~>"
+    pdf = (b"%PDF-1.4\n1 0 obj\n<< /Length " + str(len(body)).encode()
+           + b" /Filter [/A85 /Fl] >>\nstream\n" + body + b"\nendstream\nendobj\n")
+    raw = list(iter_raw_streams(pdf))
+    assert len(raw) == 1 and raw[0].length_framed
+    decoded = [r.data for _, r in iter_decoded_streams(pdf)]
+    assert decoded == [b"q 1 0 0 1 0 0 cm Q endstream"]
+
+def test_is_ascii85_encoded():
+    assert is_ascii85_encoded(base64.a85encode(b"hidden grantor") + b"~>")
+    assert is_ascii85_encoded(b"BT (x) Tj ET <~87cURD]i,\"Ebo80~> ")
+    assert not is_ascii85_encoded(b"BT (~> and <~ in text) Tj ET")
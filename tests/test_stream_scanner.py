@@ -0,0 +1,36 @@
+from pdf_builder import build_pdf
+from utils.stream_scanner import iter_raw_streams
+
+BODY = b"BT (endstream inside a string) Tj ET"
+
+def _streams(data):
+    return [(bytes(s.data), s.length_framed) for s in iter_raw_streams(data)]
+
+def _stream_pdf(length: bytes, *extra) -> bytes:
+    objects = {1: b"<< /Type /Catalog >>", 2: b"<< %s >>\nstream\n%s\nendstream" % (length, BODY)}
+    objects.update(extra)
+    return build_pdf(objects)
+
+def test_length_frames_the_body():
+    # the body contains "endstream"; only /Length gets it right
+    assert _streams(_stream_pdf(b"/Length %d" % len(BODY))) == [(BODY, True)]
+
+def test_wrong_or_missing_length_falls_back_to_endstream():
+    for length in (b"/Length %d" % (len(BODY) - 3), b"/Length 999999", b""):
+        assert _streams(_stream_pdf(length)) == [(b"BT (", False)]
+    # the EOL before endstream is not part of the body
+    data = b"1 0 obj\n<< /Length 1 >>\nstream\r\nabc\r\nendstream\nendobj\n"
+    assert _streams(data) == [(b"abc", False)]
+
+def test_indirect_length_is_resolved():
+    data = _stream_pdf(b"/Length 3 0 R", (3, b"%d" % len(BODY)))
+    assert _streams(data) == [(BODY, True)]
+    # a dangling reference frames by search instead
+    assert _streams(_stream_pdf(b"/Length 7 0 R")) == [(b"BT (", False)]
+
+def test_stream_cut_off_at_end_of_file():
+    data = _stream_pdf(b"/Length %d" % len(BODY))
+    cut = data[:data.index(BODY) + 10]
+    assert _streams(cut) == [(BODY[:10], False)]
+    # nothing after the keyword at all
+    assert _streams(data[:data.index(BODY)]) == [(b"", False)]
@@ -0,0 +1,101 @@
+import asyncio
+
+from utils.summary_service import StubBackend, SummaryBackend, SummaryService
+
+ENTITIES = {"emails": ["a@b.c"], "spans": [["email", 0, 5]]}
+
+def test_stub_is_deterministic_and_cached():
+    backend = StubBackend()
+    service = SummaryService(backend)
+    first = service.summarize_sync(ENTITIES)
+    second = service.summarize_sync(ENTITIES)
+    assert first == second and "fraud_summary" in first
+    assert backend.calls == 1
+    assert service.stats()["cache_hits"] == 1
+
+def test_concurrency_is_bounded():
+    class Tracking(SummaryBackend):
+        identity = "tracking"
+        active = peak = 0
+
+        async def complete(self, system, prompt):
+            Tracking.active += 1
+            Tracking.peak = max(Tracking.peak, Tracking.active)
+            await asyncio.sleep(0.01)
+            Tracking.active -= 1
+            return prompt[-20:]
+
+    service = SummaryService(Tracking(), max_concurrency=3)
+    requests = [{"entities": {"amounts": [str(i)]}} for i in range(12)]
+    results = asyncio.run(service.summarize_many(requests))
+    assert len(results) == 12 and all("fraud_summary" in r for r in results)
+    assert Tracking.peak == 3
+
+def test_retries_then_error():
+    class Flaky(SummaryBackend):
+        identity = "flaky"
+        calls = 0
+
+        async def complete(self, system, prompt):
+            Flaky.calls += 1
+            if Flaky.calls < 3:
+                raise ConnectionError("reset")
+            return "ok"
+
+    service = SummaryService(Flaky(), retries=2, backoff=0)
+    assert service.summarize_sync(ENTITIES) == {"fraud_summary": "ok"}
+    assert service.stats()["retries"] == 2
+
+    Flaky.calls = -10
+    service = SummaryService(Flaky(), retries=1, backoff=0)
+    assert "error" in service.summarize_sync({"phones": ["1"]})
+
+def test_non_transient_errors_are_not_retried():
+    class Broken(SummaryBackend):
+        identity = "broken"
+        calls = 0
+
+        async def complete(self, system, prompt):
+            Broken.calls += 1
+            raise ValueError("bad request")
+
+    service = SummaryService(Broken(), retries=3, backoff=0)
+    assert service.summarize_sync(ENTITIES) == {"error": "bad request"}
+    assert Broken.calls == 1 and service.stats()["retries"] == 0
+
+def test_queued_duplicates_reach_the_backend_once():
+    backend = StubBackend(latency=0.01)
+    service = SummaryService(backend, max_concurrency=1)
+    results = asyncio.run(service.summarize_many([{"entities": ENTITIES}] * 5))
+    assert len({r["fraud_summary"] for r in results}) == 1
+    assert backend.calls == 1 and service.stats()["cache_hits"] == 4
+
+def test_each_event_loop_keeps_its_bound():
+    import threading
+
+    class Tracking(SummaryBackend):
+        identity = "per-loop"
+
+        def __init__(self):
+            self.active, self.peak = {}, {}
+
+        async def complete(self, system, prompt):
+            loop = id(asyncio.get_running_loop())
+            self.active[loop] = self.active.get(loop, 0) + 1
+            self.peak[loop] = max(self.peak.get(loop, 0), self.active[loop])
+            await asyncio.sleep(0.005)
+            self.active[loop] -= 1
+            return prompt[-20:]
+
+    backend = Tracking()
+    service = SummaryService(backend, max_concurrency=2)
+
+    def batch(offset):
+        asyncio.run(service.summarize_many([{"entities": {"amounts": [str(offset + i)]}} for i in range(20)]))
+
+    threads = [threading.Thread(target=batch, args=(n * 100,)) for n in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(backend.peak) == 3 and max(backend.peak.values()) == 2
@@ -0,0 +1,386 @@
+# utils/cms.py
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Offline reader for the PKCS#7 / CMS SignedData blobs embedded in PDF
+# signatures (RFC 5652), with just enough X.509 to name the signer and
+# take its RSA key. Accepts DER and the BER indefinite-length encodings
+# some signers emit. RSA PKCS#1 v1.5 signatures are checked with plain
+# modular exponentiation; other algorithms are reported, not verified.
+
+DIGEST_ALGORITHMS = {
+    "1.3.14.3.2.26": "sha1",
+    "2.16.840.1.101.3.4.2.1": "sha256",
+    "2.16.840.1.101.3.4.2.2": "sha384",
+    "2.16.840.1.101.3.4.2.3": "sha512",
+    "2.16.840.1.101.3.4.2.4": "sha224",
+    "1.2.840.113549.2.5": "md5",
+}
+
+# Signature algorithms: RSA PKCS#1 v1.5, bare or combined with a digest.
+RSA_SIGNATURES = {
+    "1.2.840.113549.1.1.1": None,
+    "1.2.840.113549.1.1.4": "md5",
+    "1.2.840.113549.1.1.5": "sha1",
+    "1.2.840.113549.1.1.11": "sha256",
+    "1.2.840.113549.1.1.12": "sha384",
+    "1.2.840.113549.1.1.13": "sha512",
+    "1.2.840.113549.1.1.14": "sha224",
+}
+
+OID_SIGNED_DATA = "1.2.840.113549.1.7.2"
+OID_DATA = "1.2.840.113549.1.7.1"
+OID_TST_INFO = "1.2.840.113549.1.9.16.1.4"
+OID_CONTENT_TYPE = "1.2.840.113549.1.9.3"
+OID_MESSAGE_DIGEST = "1.2.840.113549.1.9.4"
+OID_SIGNING_TIME = "1.2.840.113549.1.9.5"
+OID_TIMESTAMP_TOKEN = "1.2.840.113549.1.9.16.2.14"
+
+_NAME_ATTRIBUTES = {"2.5.4.3": "CN", "2.5.4.10": "O", "2.5.4.11": "OU", "2.5.4.6": "C"}
+_STRING_TAGS = {0x0C: "utf-8", 0x13: "latin1", 0x14: "latin1", 0x16: "latin1", 0x1E: "utf-16-be"}
+
+_SEQUENCE, _SET, _INTEGER, _OCTET_STRING, _BIT_STRING, _OID = 0x30, 0x31, 0x02, 0x04, 0x03, 0x06
+_UTC_TIME, _GENERALIZED_TIME = 0x17, 0x18
+
+
+class CmsError(ValueError):
+    pass
+
+
+class Tlv(NamedTuple):
+    tag: int
+    start: int  # first byte of the tag
+    body: int   # first content byte
+    end: int    # past the content (past the end-of-contents octets if indefinite)
+    content_end: int
+
+
+def read_tlv(data, pos: int) -> Tlv:
+    if pos + 2 > len(data):
+        raise CmsError("truncated DER")
+    tag = data[pos]
+    if tag & 0x1F == 0x1F:
+        raise CmsError("high tag numbers are not used in CMS")
+    first = data[pos + 1]
+    body = pos + 2
+    if first < 0x80:
+        length = first
+    elif first == 0x80:
+        if not tag & 0x20:
+            raise CmsError("indefinite length on a primitive value")
+        # BER: children until the 00 00 end-of-contents marker
+        cursor = body
+        while data[cursor:cursor + 2] != b"\x00\x00":
+            cursor = read_tlv(data, cursor).end
+        return Tlv(tag, pos, body, cursor + 2, cursor)
+    else:
+        count = first & 0x7F
+        length = int.from_bytes(bytes(data[body:body + count]), "big")
+        body += count
+    end = body + length
+    if end > len(data):
+        raise CmsError("DER length runs past the data")
+    return Tlv(tag, pos, body, end, end)
+
+
+def children(data, tlv: Tlv) -> List[Tlv]:
+    items = []
+    pos = tlv.body
+    while pos < tlv.content_end:
+        child = read_tlv(data, pos)
+        items.append(child)
+        pos = child.end
+    return items
+
+
+def _content(data, tlv: Tlv) -> bytes:
+    if tlv.tag & 0x20 and tlv.tag in (0x24, 0x23):  # constructed OCTET/BIT STRING (BER)
+        return b"".join(_content(data, c) for c in children(data, tlv))
+    return bytes(data[tlv.body:tlv.content_end])
+
+
+def _expect(tlv: Tlv, tag: int, what: str) -> Tlv:
+    if tlv.tag != tag:
+        raise CmsError(f"{what}: expected tag 0x{tag:02x}, found 0x{tlv.tag:02x}")
+    return tlv
+
+
+def decode_oid(raw: bytes) -> str:
+    if not raw:
+        raise CmsError("empty OID")
+    parts = []
+    value = 0
+    for byte in raw:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            parts.append(value)
+            value = 0
+    first = min(parts[0] // 40, 2)
+    return ".".join(str(p) for p in [first, parts[0] - 40 * first] + parts[1:])
+
+
+def _oid(data, tlv: Tlv) -> str:
+    return decode_oid(_content(data, _expect(tlv, _OID, "OID")))
+
+
+def _integer(data, tlv: Tlv) -> int:
+    return int.from_bytes(_content(data, _expect(tlv, _INTEGER, "INTEGER")), "big", signed=True)
+
+
+def _time(data, tlv: Tlv) -> Optional[str]:
+    text = _content(data, tlv).decode("ascii", "replace")
+    try:
+        if tlv.tag == _UTC_TIME:
+            stamp = datetime.strptime(text, "%y%m%d%H%M%SZ")
+        elif tlv.tag == _GENERALIZED_TIME:
+            stamp = datetime.strptime(text.split(".")[0].rstrip("Z"), "%Y%m%d%H%M%S")
+        else:
+            return None
+    except ValueError:
+        return text
+    return stamp.replace(tzinfo=timezone.utc).isoformat()
+
+
+def _name(data, tlv: Tlv) -> Dict[str, str]:
+    # RDNSequence to {CN, O, OU, C} (first value of each)
+    name: Dict[str, str] = {}
+    for rdn in children(data, tlv):
+        for attribute in children(data, rdn):
+            parts = children(data, attribute)
+            if len(parts) != 2:
+                continue
+            key = _NAME_ATTRIBUTES.get(_oid(data, parts[0]))
+            encoding = _STRING_TAGS.get(parts[1].tag)
+            if key and encoding and key not in name:
+                name[key] = _content(data, parts[1]).decode(encoding, "replace")
+    return name
+
+
+def _algorithm(data, tlv: Tlv) -> str:
+    return _oid(data, children(data, _expect(tlv, _SEQUENCE, "AlgorithmIdentifier"))[0])
+
+
+class Certificate(NamedTuple):
+    serial: int
+    issuer: Dict[str, str]
+    subject: Dict[str, str]
+    not_before: Optional[str]
+    not_after: Optional[str]
+    key_algorithm: str
+    rsa_key: Optional[Tuple[int, int]]  # (modulus, exponent)
+    issuer_der: bytes
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "subject": self.subject,
+            "issuer": self.issuer,
+            "serial": format(self.serial, "x"),
+            "not_before": self.not_before,
+            "not_after": self.not_after,
+        }
+
+
+def parse_certificate(data, tlv: Tlv) -> Certificate:
+    tbs = children(data, children(data, _expect(tlv, _SEQUENCE, "Certificate"))[0])
+    if tbs and tbs[0].tag == 0xA0:  # [0] EXPLICIT version
+        tbs = tbs[1:]
+    serial, _, issuer, validity, subject, spki = tbs[:6]
+    times = children(data, validity)
+    key_parts = children(data, spki)
+    key_algorithm = _algorithm(data, key_parts[0])
+    rsa_key = None
+    if key_algorithm == "1.2.840.113549.1.1.1":
+        bits = _content(data, _expect(key_parts[1], _BIT_STRING, "subjectPublicKey"))[1:]
+        rsa = read_tlv(bits, 0)
+        modulus, exponent = children(bits, rsa)[:2]
+        rsa_key = (_integer(bits, modulus), _integer(bits, exponent))
+    return Certificate(
+        serial=_integer(data, serial),
+        issuer=_name(data, issuer),
+        subject=_name(data, subject),
+        not_before=_time(data, times[0]) if times else None,
+        not_after=_time(data, times[1]) if len(times) > 1 else None,
+        key_algorithm=key_algorithm,
+        rsa_key=rsa_key,
+        issuer_der=bytes(data[issuer.start:issuer.end]),
+    )
+
+
+class SignerInfo(NamedTuple):
+    digest_algorithm: Optional[str]     # hashlib name, None if unknown
+    signature_algorithm: str            # OID
+    signature: bytes
+    signed_attrs: Optional[bytes]       # DER of the attributes as signed (SET OF)
+    message_digest: Optional[bytes]
+    content_type: Optional[str]
+    signing_time: Optional[str]
+    has_timestamp: bool
+    issuer_der: Optional[bytes]
+    serial: Optional[int]
+    key_id: Optional[bytes]
+
+
+def _signer_info(data, tlv: Tlv) -> SignerInfo:
+    parts = children(data, tlv)
+    sid = parts[1]
+    issuer_der = serial = key_id = None
+    if sid.tag == _SEQUENCE:
+        issuer, serial_tlv = children(data, sid)[:2]
+        issuer_der = bytes(data[issuer.start:issuer.end])
+        serial = _integer(data, serial_tlv)
+    else:
+        key_id = _content(data, sid)
+    digest_oid = _algorithm(data, parts[2])
+    rest = parts[3:]
+    signed_attrs = message_digest = content_type = signing_time = None
+    if rest and rest[0].tag == 0xA0:
+        attrs = rest[0]
+        raw = bytes(data[attrs.start:attrs.end])
+        # signed as an explicit SET OF, not the [0] IMPLICIT it is stored as
+        signed_attrs = b"\x31" + raw[1:]
+        for attribute in children(data, attrs):
+            oid_tlv, values = children(data, attribute)[:2]
+            oid = _oid(data, oid_tlv)
+            value = children(data, values)[0] if values.content_end > values.body else None
+            if value is None:
+                continue
+            if oid == OID_MESSAGE_DIGEST:
+                message_digest = _content(data, value)
+            elif oid == OID_CONTENT_TYPE:
+                content_type = _oid(data, value)
+            elif oid == OID_SIGNING_TIME:
+                signing_time = _time(data, value)
+        rest = rest[1:]
+    signature_oid = _algorithm(data, rest[0])
+    signature = _content(data, _expect(rest[1], _OCTET_STRING, "signature"))
+    has_timestamp = False
+    if len(rest) > 2 and rest[2].tag == 0xA1:
+        for attribute in children(data, rest[2]):
+            if _oid(data, children(data, attribute)[0]) == OID_TIMESTAMP_TOKEN:
+                has_timestamp = True
+    return SignerInfo(
+        DIGEST_ALGORITHMS.get(digest_oid), signature_oid, signature, signed_attrs, message_digest,
+        content_type, signing_time, has_timestamp, issuer_der, serial, key_id,
+    )
+
+
+class SignedData(NamedTuple):
+    content_type: str                 # eContentType OID
+    content: Optional[bytes]          # encapsulated content, None when detached
+    certificates: List[Certificate]
+    signers: List[SignerInfo]
+
+    def signer_certificate(self, signer: SignerInfo) -> Optional[Certificate]:
+        for cert in self.certificates:
+            if signer.serial is not None and cert.serial == signer.serial and cert.issuer_der == signer.issuer_der:
+                return cert
+        return self.certificates[0] if len(self.certificates) == 1 else None
+
+
+def parse_signed_data(blob: bytes) -> SignedData:
+    """
+    Parse a ContentInfo holding SignedData, as stored in a signature's
+    /Contents. Trailing zero padding (the unused part of the reserved
+    /Contents space) is ignored. Raises CmsError on malformed input.
+    """
+    try:
+        info = children(blob, _expect(read_tlv(blob, 0), _SEQUENCE, "ContentInfo"))
+        if _oid(blob, info[0]) != OID_SIGNED_DATA:
+            raise CmsError("not a SignedData ContentInfo")
+        signed = children(blob, children(blob, info[1])[0])
+        encap = children(blob, signed[2])
+        content_type = _oid(blob, encap[0])
+        content = _content(blob, children(blob, encap[1])[0]) if len(encap) > 1 else None
+        certificates: List[Certificate] = []
+        signer_set = signed[-1]
+        for part in signed[3:-1]:
+            if part.tag == 0xA0:
+                for cert in children(blob, part):
+                    if cert.tag == _SEQUENCE:
+                        try:
+                            certificates.append(parse_certificate(blob, cert))
+                        except (CmsError, ValueError, IndexError):
+                            continue
+        signers = [_signer_info(blob, s) for s in children(blob, _expect(signer_set, _SET, "signerInfos"))]
+    except IndexError:
+        raise CmsError("SignedData structure is incomplete")
+    return SignedData(content_type, content, certificates, signers)
+
+
+def tst_message_imprint(content: bytes) -> Tuple[Optional[str], bytes, Optional[str]]:
+    """
+    (digest algorithm, hashed message, genTime) from a TSTInfo (RFC 3161).
+    """
+    try:
+        parts = children(content, read_tlv(content, 0))
+        imprint = children(content, parts[2])
+        gen_time = _time(content, parts[4]) if len(parts) > 4 else None
+        return DIGEST_ALGORITHMS.get(_algorithm(content, imprint[0])), _content(content, imprint[1]), gen_time
+    except IndexError:
+        raise CmsError("TSTInfo structure is incomplete")
+
+
+def _encode_oid(dotted: str) -> bytes:
+    parts = [int(p) for p in dotted.split(".")]
+    out = bytearray()
+    for value in [40 * parts[0] + parts[1]] + parts[2:]:
+        chunk = [value & 0x7F]
+        value >>= 7
+        while value:
+            chunk.append(0x80 | (value & 0x7F))
+            value >>= 7
+        out.extend(reversed(chunk))
+    return bytes(out)
+
+
+def _der(tag: int, body: bytes) -> bytes:
+    size = len(body)
+    if size < 0x80:
+        return bytes([tag, size]) + body
+    length = size.to_bytes((size.bit_length() + 7) // 8, "big")
+    return bytes([tag, 0x80 | len(length)]) + length + body
+
+
+_DIGEST_OIDS = {name: oid for oid, name in DIGEST_ALGORITHMS.items()}
+
+
+def _digest_infos(name: str, value: bytes) -> List[bytes]:
+    # DigestInfo with NULL parameters (RFC 8017 9.2), and the absent-
+    # parameters form some signers emit.
+    oid = _der(_OID, _encode_oid(_DIGEST_OIDS[name]))
+    return [
+        _der(_SEQUENCE, _der(_SEQUENCE, oid + b"\x05\x00") + _der(_OCTET_STRING, value)),
+        _der(_SEQUENCE, _der(_SEQUENCE, oid) + _der(_OCTET_STRING, value)),
+    ]
+
+
+def verify_rsa(signer: SignerInfo, cert: Optional[Certificate], digest: Callable[[str], bytes]) -> Optional[bool]:
+    """
+    Check an RSA PKCS#1 v1.5 signature. digest(name) returns the hashlib
+    digest, under algorithm name, of what was signed: the signed
+    attributes if present, else the content itself. The decoded block
+    must equal the full EMSA-PKCS1-v1_5 encoding of that digest under the
+    signer's digest algorithm, byte for byte. None when the algorithm or
+    key is not RSA or the digest algorithm is unknown.
+    """
+    if cert is None or cert.rsa_key is None or signer.signature_algorithm not in RSA_SIGNATURES:
+        return None
+    name = signer.digest_algorithm
+    if name is None:
+        return None
+    combined = RSA_SIGNATURES[signer.signature_algorithm]
+    if combined is not None and combined != name:
+        return False
+    modulus, exponent = cert.rsa_key
+    size = (modulus.bit_length() + 7) // 8
+    signature = int.from_bytes(signer.signature, "big")
+    if signature >= modulus:
+        return False
+    decoded = pow(signature, exponent, modulus).to_bytes(size, "big")
+    # 00 01 FF..FF 00 DigestInfo, with at least eight FF bytes
+    for digest_info in _digest_infos(name, digest(name)):
+        padding = size - len(digest_info) - 3
+        if padding >= 8 and decoded == b"\x00\x01" + b"\xff" * padding + b"\x00" + digest_info:
+            return True
+    return False
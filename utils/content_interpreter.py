@@ -0,0 +1,758 @@
+# utils/content_interpreter.py
+
+import math
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.fonts import FALLBACK_METRICS, FontMetrics
+from utils.parsed_pdf import ParsedPdf, as_parsed_pdf
+from utils.pdf_objects import parse_object
+
+# Page content-stream interpreter for hidden text and overlays.
+#
+# One tokenizing pass per page (form XObjects are entered in place) keeps
+# the CTM, clipping box, fill/stroke colour and alpha and the text state,
+# and estimates a device-space box for every shown string from the font's
+# widths. Nothing is rasterised: a string is "invisible" when its state
+# makes it so (render mode 3/7, zero alpha, sub-point size, off the page,
+# clipped away, white with nothing dark beneath it), and an image, opaque
+# fill or annotation "overlays" text when it covers most of a string shown
+# before it. An annotation counts only when its appearance paints an opaque
+# background; it is a "signature" overlay when it is, or covers, a
+# signature field.
+
+Matrix = Tuple[float, float, float, float, float, float]
+BBox = Tuple[float, float, float, float]
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+INVISIBLE_RENDER_MODES = (3, 7)
+
+# Text drawn smaller than this (device-space height in points) is hidden.
+MIN_TEXT_HEIGHT = 1.0
+
+# Colour components at or above this count as white (CMYK: at or below 1 - this).
+WHITE_LEVEL = 0.95
+
+# Share of a string's box an overlay must cover to hide it.
+COVER_FRACTION = 0.5
+
+# Glyph box relative to the baseline, in units of font size.
+ASCENT, DESCENT = 0.8, -0.2
+
+# A TJ adjustment at least this wide (thousandths of an em) reads as a word break.
+KERN_SPACE = 200
+
+# Height of the horizontal bands that index painted boxes on a page.
+BAND_HEIGHT = 24.0
+
+MAX_FORM_DEPTH = 12
+
+# Annotations that never paint over the page: navigation, pop-ups and markup
+# drawn as translucent highlights or thin strokes. The /F bits hide one.
+SKIPPED_ANNOTATIONS = {
+    "/Link", "/Popup", "/Highlight", "/Underline", "/Squiggly", "/StrikeOut",
+    "/Ink", "/Caret", "/Line", "/PolyLine",
+}
+HIDDEN_ANNOTATION_FLAGS = 2 | 32  # Hidden, NoView
+
+# Overlay kinds that count as laid over a signature field they cover.
+SIGNATURE_OVERLAY_KINDS = ("image", "annotation")
+
+_WS = rb"\x00\t\n\x0c\r "
+_REGULAR = rb"[^\x00\t\n\x0c\r ()<>\[\]{}/%]"
+_TOKEN = re.compile(
+    rb"[" + _WS + rb"]*(?:%[^\r\n]*[" + _WS + rb"]*)*"
+    rb"(?:([-+]?(?:\d+\.?\d*|\.\d+))(?!" + _REGULAR + rb")"  # 1 number
+    rb"|(/" + _REGULAR + rb"*)"  # 2 name
+    rb"|(" + _REGULAR + rb"+)"  # 3 operator or keyword
+    rb"|\(([^()\\]*)\)"  # 4 literal string without escapes or nesting
+    rb"|(\[)|(\])"  # 5, 6 array
+    rb"|([(<])"  # 7 any other string, or a dictionary
+    rb"|([)>{}]))"  # 8 stray delimiter
+)
+_INLINE_DATA = re.compile(rb"[" + _WS + rb"]ID[" + _WS + rb"]")
+_INLINE_END = re.compile(rb"[" + _WS + rb"]EI(?!" + _REGULAR + rb")")
+_KEYWORDS = {b"true": True, b"false": False, b"null": None}
+
+_COMPONENTS = {
+    "/DeviceGray": 1, "/CalGray": 1, "/G": 1,
+    "/DeviceRGB": 3, "/CalRGB": 3, "/RGB": 3, "/Lab": 3,
+    "/DeviceCMYK": 4, "/CMYK": 4,
+}
+
+
+def _mul(m1: Matrix, m2: Matrix) -> Matrix:
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1 * a2 + b1 * c2, a1 * b2 + b1 * d2,
+            c1 * a2 + d1 * c2, c1 * b2 + d1 * d2,
+            e1 * a2 + f1 * c2 + e2, e1 * b2 + f1 * d2 + f2)
+
+
+def _bbox(points: Iterable[Tuple[float, float]], m: Matrix) -> BBox:
+    a, b, c, d, e, f = m
+    xs, ys = [], []
+    for x, y in points:
+        xs.append(a * x + c * y + e)
+        ys.append(b * x + d * y + f)
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _intersect(b1: Optional[BBox], b2: Optional[BBox]) -> Optional[BBox]:
+    if b1 is None:
+        return b2
+    if b2 is None:
+        return b1
+    box = max(b1[0], b2[0]), max(b1[1], b2[1]), min(b1[2], b2[2]), min(b1[3], b2[3])
+    return box if box[0] <= box[2] and box[1] <= box[3] else None
+
+
+def _area(box: BBox) -> float:
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def _coverage(inner: BBox, outer: BBox) -> float:
+    # share of inner's area that outer covers
+    area = _area(inner)
+    overlap = _intersect(inner, outer)
+    return _area(overlap) / area if overlap is not None and area > 0 else 0.0
+
+
+def _rounded(box: BBox) -> List[float]:
+    return [round(v, 1) for v in box]
+
+
+def _is_white(values: List[float]) -> bool:
+    if len(values) == 4:
+        return all(v <= 1 - WHITE_LEVEL for v in values)
+    return len(values) in (1, 3) and all(v >= WHITE_LEVEL for v in values)
+
+
+class _Painted:
+    # A shown string (kind "text") or a non-white opaque region beneath later text.
+    __slots__ = ("bbox", "kind", "words", "font", "covered")
+
+    def __init__(self, bbox: BBox, kind: str, words: Tuple[bytes, ...] = (), font: Optional[FontMetrics] = None):
+        self.bbox = bbox
+        self.kind = kind
+        self.words = words  # string bytes, split where TJ opens a word gap
+        self.font = font
+        self.covered = False
+
+    def text(self) -> str:
+        return " ".join(self.font.decode(word) for word in self.words)
+
+
+class _Bands:
+    """
+    Painted boxes bucketed by horizontal band, so an overlay only
+    compares against the strings on the lines it spans.
+    """
+
+    def __init__(self, page_box: BBox):
+        self._lo, self._hi = page_box[1], page_box[3]
+        self._rows: Dict[int, List[_Painted]] = {}
+
+    def _span(self, box: BBox) -> range:
+        lo, hi = max(box[1], self._lo), min(box[3], self._hi)
+        if lo > hi:
+            return range(0)
+        return range(int(lo // BAND_HEIGHT), int(hi // BAND_HEIGHT) + 1)
+
+    def add(self, item: _Painted) -> None:
+        for row in self._span(item.bbox):
+            self._rows.setdefault(row, []).append(item)
+
+    def query(self, box: BBox) -> List[_Painted]:
+        found, seen = [], set()
+        for row in self._span(box):
+            for item in self._rows.get(row, ()):
+                if id(item) not in seen and _intersect(item.bbox, box) is not None:
+                    seen.add(id(item))
+                    found.append(item)
+        return found
+
+
+class _GState(NamedTuple):
+    ctm: Matrix = IDENTITY
+    clip: Optional[BBox] = None
+    fill_white: bool = False
+    stroke_white: bool = False
+    fill_components: int = 1
+    stroke_components: int = 1
+    fill_alpha: float = 1.0
+    stroke_alpha: float = 1.0
+    font: FontMetrics = FALLBACK_METRICS
+    size: float = 0.0
+    char_spacing: float = 0.0
+    word_spacing: float = 0.0
+    scale: float = 1.0
+    leading: float = 0.0
+    rise: float = 0.0
+    render: int = 0
+
+
+class _Interpreter:
+    def __init__(self, pdf: ParsedPdf, page_number: int, page_box: BBox):
+        self.pdf = pdf
+        self.page_number = page_number
+        self.page_box = page_box
+        self.gs = _GState()
+        self.stack: List[_GState] = []
+        self.tm = self.tlm = IDENTITY
+        self.path: Optional[List[float]] = None
+        self.pending_clip = False
+        self.text_block = 0
+        self.strings = 0
+        self.text = _Bands(page_box)
+        self.backdrops = _Bands(page_box)
+        self.invisible: List[Dict[str, Any]] = []
+        self.overlays: List[Dict[str, Any]] = []
+        self.opaque: List[BBox] = []  # every opaque fill and image, white or not
+        self._last_hidden: Optional[Tuple[str, int]] = None
+        self._forms: set = set()
+        self._fonts: Dict[Tuple[int, str], FontMetrics] = {}
+
+    # -- tokenizing -------------------------------------------------------
+
+    def run(self, data: bytes, resources: Any) -> None:
+        operands: List[Any] = []
+        arrays: List[List[Any]] = []  # enclosing operand lists while inside [ ]
+        match = _TOKEN.match
+        pos = 0
+        while True:
+            m = match(data, pos)
+            if m is None:
+                break
+            pos = m.end()
+            kind = m.lastindex
+            if kind == 1:
+                operands.append(float(m.group(1)))
+            elif kind == 2:
+                operands.append(m.group(2).decode("latin1"))
+            elif kind == 4:
+                operands.append(m.group(4))
+            elif kind == 5:
+                arrays.append(operands)
+                operands = []
+            elif kind == 6:
+                if arrays:
+                    array, operands = operands, arrays.pop()
+                    operands.append(array)
+            elif kind == 7:
+                try:
+                    obj, pos = parse_object(data, m.start(7))
+                    operands.append(obj)
+                except ValueError:
+                    pass
+            elif kind == 3:
+                op = m.group(3)
+                if op in _KEYWORDS:
+                    operands.append(_KEYWORDS[op])
+                    continue
+                while arrays:  # an operator ends any array left open
+                    array, operands = operands, arrays.pop()
+                    operands.append(array)
+                if op == b"BI":
+                    pos = self._inline_image(data, pos)
+                else:
+                    handler = _OPERATORS.get(op)
+                    if handler is not None:
+                        try:
+                            handler(self, operands, resources)
+                        except Exception:
+                            pass  # malformed operands or objects; skipped, as a viewer would
+                operands = []
+
+    def _resource(self, resources: Any, category: str, name: Any) -> Any:
+        group = self.pdf.resolve(resources.get(category)) if resources else None
+        return group.get(name) if group else None
+
+    # -- graphics state ---------------------------------------------------
+
+    def op_q(self, ops, res):
+        self.stack.append(self.gs)
+
+    def op_Q(self, ops, res):
+        if self.stack:
+            self.gs = self.stack.pop()
+
+    def op_cm(self, ops, res):
+        self.gs = self.gs._replace(ctm=_mul(tuple(ops[-6:]), self.gs.ctm))
+
+    def op_gs(self, ops, res):
+        ext = self.pdf.resolve(self._resource(res, "/ExtGState", ops[-1])) or {}
+        changes = {}
+        if "/ca" in ext:
+            changes["fill_alpha"] = float(ext["/ca"])
+        if "/CA" in ext:
+            changes["stroke_alpha"] = float(ext["/CA"])
+        font = self.pdf.resolve(ext.get("/Font"))
+        if font:
+            changes["font"] = self.pdf.font_metrics(font[0])
+            changes["size"] = float(font[1])
+        self.gs = self.gs._replace(**changes)
+
+    def _components(self, name: Any, res: Any) -> int:
+        if name in _COMPONENTS:
+            return _COMPONENTS[name]
+        space = self.pdf.resolve(self._resource(res, "/ColorSpace", name))
+        if isinstance(space, list) and space:
+            family = self.pdf.resolve(space[0])
+            if family == "/ICCBased" and len(space) > 1:
+                return int(self.pdf.resolve(space[1]).get("/N", 0))
+            return _COMPONENTS.get(family, 0)
+        return _COMPONENTS.get(space, 0)
+
+    def op_g(self, ops, res):
+        self.gs = self.gs._replace(fill_white=_is_white(ops[-1:]), fill_components=1)
+
+    def op_G(self, ops, res):
+        self.gs = self.gs._replace(stroke_white=_is_white(ops[-1:]), stroke_components=1)
+
+    def op_rg(self, ops, res):
+        self.gs = self.gs._replace(fill_white=_is_white(ops[-3:]), fill_components=3)
+
+    def op_RG(self, ops, res):
+        self.gs = self.gs._replace(stroke_white=_is_white(ops[-3:]), stroke_components=3)
+
+    def op_k(self, ops, res):
+        self.gs = self.gs._replace(fill_white=_is_white(ops[-4:]), fill_components=4)
+
+    def op_K(self, ops, res):
+        self.gs = self.gs._replace(stroke_white=_is_white(ops[-4:]), stroke_components=4)
+
+    def op_cs(self, ops, res):
+        # a new space starts at its initial colour, black for the device spaces
+        self.gs = self.gs._replace(fill_white=False, fill_components=self._components(ops[-1], res))
+
+    def op_CS(self, ops, res):
+        self.gs = self.gs._replace(stroke_white=False, stroke_components=self._components(ops[-1], res))
+
+    def op_sc(self, ops, res):
+        values = [v for v in ops if isinstance(v, float)]
+        white = len(values) == self.gs.fill_components and _is_white(values)
+        self.gs = self.gs._replace(fill_white=white)
+
+    def op_SC(self, ops, res):
+        values = [v for v in ops if isinstance(v, float)]
+        white = len(values) == self.gs.stroke_components and _is_white(values)
+        self.gs = self.gs._replace(stroke_white=white)
+
+    # -- paths, clipping and fills ----------------------------------------
+
+    def _extend(self, coords: List[float]) -> None:
+        box = _bbox(zip(coords[0::2], coords[1::2]), self.gs.ctm)
+        if self.path is None:
+            self.path = list(box)
+        else:
+            path = self.path
+            path[0], path[1] = min(path[0], box[0]), min(path[1], box[1])
+            path[2], path[3] = max(path[2], box[2]), max(path[3], box[3])
+
+    def op_m(self, ops, res):
+        self._extend(ops[-2:])
+
+    op_l = op_m
+
+    def op_c(self, ops, res):
+        self._extend(ops[-6:])
+
+    def op_v(self, ops, res):
+        self._extend(ops[-4:])
+
+    op_y = op_v
+
+    def op_re(self, ops, res):
+        x, y, w, h = ops[-4:]
+        self._extend([x, y, x + w, y, x, y + h, x + w, y + h])
+
+    def op_W(self, ops, res):
+        self.pending_clip = True
+
+    def _end_path(self) -> None:
+        if self.pending_clip:
+            clip = _intersect(self.gs.clip, tuple(self.path)) if self.path else self.gs.clip
+            # an empty intersection clips everything away
+            self.gs = self.gs._replace(clip=clip or (0.0, 0.0, 0.0, 0.0))
+        self.path = None
+        self.pending_clip = False
+
+    def op_f(self, ops, res):
+        if self.path is not None and self.gs.fill_alpha >= 1:
+            box = _intersect(self.gs.clip, tuple(self.path))
+            if box is not None and _area(box) > 0:
+                self.opaque.append(box)
+                self._cover(box, "fill", None)
+                if not self.gs.fill_white:
+                    self.backdrops.add(_Painted(box, "fill"))
+        self._end_path()
+
+    def op_n(self, ops, res):
+        # also S and s: strokes are too thin to hide text
+        self._end_path()
+
+    # -- text -------------------------------------------------------------
+
+    def op_BT(self, ops, res):
+        self.tm = self.tlm = IDENTITY
+        self.text_block += 1
+
+    def op_Tc(self, ops, res):
+        self.gs = self.gs._replace(char_spacing=ops[-1])
+
+    def op_Tw(self, ops, res):
+        self.gs = self.gs._replace(word_spacing=ops[-1])
+
+    def op_Tz(self, ops, res):
+        self.gs = self.gs._replace(scale=ops[-1] / 100)
+
+    def op_TL(self, ops, res):
+        self.gs = self.gs._replace(leading=ops[-1])
+
+    def op_Ts(self, ops, res):
+        self.gs = self.gs._replace(rise=ops[-1])
+
+    def op_Tr(self, ops, res):
+        self.gs = self.gs._replace(render=int(ops[-1]))
+
+    def op_Tf(self, ops, res):
+        # Tf repeats on every line; resolve each resource name once per page
+        key = (id(res), ops[-2])
+        font = self._fonts.get(key)
+        if font is None:
+            ref = self._resource(res, "/Font", ops[-2])
+            font = self._fonts[key] = self.pdf.font_metrics(ref) if ref is not None else FALLBACK_METRICS
+        self.gs = self.gs._replace(font=font, size=ops[-1])
+
+    def op_Td(self, ops, res):
+        self.tlm = self.tm = _mul((1.0, 0.0, 0.0, 1.0, ops[-2], ops[-1]), self.tlm)
+
+    def op_TD(self, ops, res):
+        self.gs = self.gs._replace(leading=-ops[-1])
+        self.op_Td(ops, res)
+
+    def op_Tm(self, ops, res):
+        self.tlm = self.tm = tuple(ops[-6:])
+
+    def op_Tstar(self, ops, res):
+        self.op_Td([0.0, -self.gs.leading], res)
+
+    def op_Tj(self, ops, res):
+        self._show(ops[-1:])
+
+    def op_TJ(self, ops, res):
+        self._show(ops[-1])
+
+    def op_quote(self, ops, res):
+        self.op_Tstar(ops, res)
+        self._show(ops[-1:])
+
+    def op_dquote(self, ops, res):
+        self.gs = self.gs._replace(word_spacing=ops[-3], char_spacing=ops[-2])
+        self.op_quote(ops, res)
+
+    def _show(self, items: List[Any]) -> None:
+        gs = self.gs
+        font, size, scale = gs.font, gs.size, gs.scale
+        advance = 0.0
+        words, word = [], b""
+        for item in items:
+            if isinstance(item, bytes):
+                codes = font.codes(item)
+                spaces = 0 if font.two_byte else item.count(32)
+                advance += (font.width(codes) * size + gs.char_spacing * len(codes) + gs.word_spacing * spaces) * scale
+                word += item
+            elif isinstance(item, (int, float)):
+                advance -= item / 1000 * size * scale
+                if item <= -KERN_SPACE and word:
+                    words.append(word)
+                    word = b""
+        if word:
+            words.append(word)
+        if not words:
+            return
+        m = _mul(self.tm, gs.ctm)
+        lo, hi = gs.rise + DESCENT * size, gs.rise + ASCENT * size
+        box = _bbox(((0.0, lo), (advance, lo), (0.0, hi), (advance, hi)), m)
+        self.tm = _mul((1.0, 0.0, 0.0, 1.0, advance, 0.0), self.tm)
+        self.strings += 1
+        string = _Painted(box, "text", tuple(words), font)
+        reason = self._hidden_reason(string, abs(size) * math.hypot(m[2], m[3]))
+        if reason is None:
+            self.text.add(string)
+            self._last_hidden = None
+        else:
+            self._hide(string, reason)
+
+    def _hidden_reason(self, string: _Painted, height: float) -> Optional[str]:
+        gs = self.gs
+        box = string.bbox
+        if gs.render in INVISIBLE_RENDER_MODES:
+            # the text layer an OCR tool lays over a scanned page image
+            centre = ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+            if any(b.kind == "image" for b in self.backdrops.query(centre + centre)):
+                return None
+            return "render_mode"
+        fills, strokes = gs.render in (0, 2, 4, 6), gs.render in (1, 2, 5, 6)
+        alpha = max(gs.fill_alpha if fills else 0.0, gs.stroke_alpha if strokes else 0.0)
+        if alpha <= 0:
+            return "transparent"
+        if height < MIN_TEXT_HEIGHT:
+            return "tiny"
+        if _intersect(box, self.page_box) is None:
+            return "off_page"
+        if gs.clip is not None and _intersect(box, gs.clip) is None:
+            return "clipped"
+        white = (gs.fill_white or not fills) and (gs.stroke_white or not strokes)
+        if white and not self.backdrops.query(box):
+            return "white"
+        return None
+
+    def _hide(self, string: _Painted, reason: str) -> None:
+        text = string.text()
+        key = (reason, self.text_block)
+        last = self.invisible[-1] if self.invisible and self._last_hidden == key else None
+        if last is None:
+            self.invisible.append({"page": self.page_number, "reason": reason, "text": text,
+                                   "bbox": list(string.bbox)})
+        else:
+            # consecutive hidden strings of one text block read as one fragment
+            box = last["bbox"]
+            height = string.bbox[3] - string.bbox[1]
+            gap = string.bbox[0] - box[2]
+            new_line = abs(string.bbox[1] - box[1]) > height / 2
+            last["text"] += (" " if new_line or gap > 0.2 * height else "") + text
+            last["bbox"] = [min(box[0], string.bbox[0]), min(box[1], string.bbox[1]),
+                            max(box[2], string.bbox[2]), max(box[3], string.bbox[3])]
+        self._last_hidden = key
+
+    # -- images, forms and overlays ---------------------------------------
+
+    def _cover(self, box: BBox, kind: str, name: Optional[str], signature: bool = False) -> None:
+        hits = [s for s in self.text.query(box) if not s.covered and _coverage(s.bbox, box) >= COVER_FRACTION]
+        if not hits:
+            return
+        for string in hits:
+            string.covered = True
+        covered = " ".join(s.text() for s in hits)
+        self.overlays.append({"page": self.page_number, "kind": kind, "name": name, "signature": signature,
+                              "bbox": _rounded(box), "covered_strings": len(hits), "covered_text": covered})
+        self.invisible.append({"page": self.page_number, "reason": "covered", "text": covered,
+                               "bbox": _rounded((min(s.bbox[0] for s in hits), min(s.bbox[1] for s in hits),
+                                                 max(s.bbox[2] for s in hits), max(s.bbox[3] for s in hits)))})
+        self._last_hidden = None
+
+    def _image(self, name: Optional[str]) -> None:
+        box = _intersect(self.gs.clip, _bbox(((0, 0), (1, 0), (0, 1), (1, 1)), self.gs.ctm))
+        if box is None or self.gs.fill_alpha <= 0:
+            return
+        self.opaque.append(box)
+        self._cover(box, "image", name)
+        self.backdrops.add(_Painted(box, "image"))
+
+    def _inline_image(self, data: bytes, pos: int) -> int:
+        start = _INLINE_DATA.search(data, pos)
+        if start is None:
+            return len(data)
+        end = _INLINE_END.search(data, start.end())
+        self._image(None)
+        return end.end() if end else len(data)
+
+    def op_Do(self, ops, res):
+        ref = self._resource(res, "/XObject", ops[-1])
+        xobject = self.pdf.resolve(ref)
+        subtype = xobject.get("/Subtype") if xobject is not None else None
+        if subtype == "/Image":
+            self._image(ops[-1])
+        elif subtype == "/Form":
+            self._form(ref, xobject, res)
+
+    def _form(self, ref: Any, form: Any, res: Any) -> None:
+        key = (ref.idnum, ref.generation) if hasattr(ref, "idnum") else id(form)
+        if key in self._forms or len(self._forms) >= MAX_FORM_DEPTH:
+            return
+        data = self.pdf.stream_data(ref)
+        matrix = tuple(float(v) for v in (self.pdf.resolve(form.get("/Matrix")) or IDENTITY))
+        ctm = _mul(matrix, self.gs.ctm)
+        clip = self.gs.clip
+        bbox = self.pdf.resolve(form.get("/BBox"))
+        if bbox:
+            x0, y0, x1, y1 = (float(v) for v in bbox)
+            clip = _intersect(clip, _bbox(((x0, y0), (x1, y0), (x0, y1), (x1, y1)), ctm)) or (0.0, 0.0, 0.0, 0.0)
+        saved = (self.gs, len(self.stack), self.tm, self.tlm)
+        self.gs = self.gs._replace(ctm=ctm, clip=clip)
+        self._forms.add(key)
+        try:
+            self.run(data, self.pdf.resolve(form.get("/Resources")) or res)
+        finally:
+            self._forms.discard(key)
+            self.gs, depth, self.tm, self.tlm = saved
+            del self.stack[depth:]
+
+    def _opaque_appearance(self, annot: Any) -> bool:
+        # Does the normal appearance paint an opaque background over most of its box?
+        ref = (self.pdf.resolve(annot.get("/AP")) or {}).get("/N")
+        normal = self.pdf.resolve(ref)
+        if normal is not None and "/BBox" not in normal:  # one appearance per state
+            ref = normal.get(annot.get("/AS"))
+            normal = self.pdf.resolve(ref)
+        if normal is None or "/BBox" not in normal:
+            return False
+        x0, y0, x1, y1 = (float(self.pdf.resolve(v)) for v in self.pdf.resolve(normal["/BBox"]))
+        box = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        if _area(box) <= 0:
+            return False
+        probe = _Interpreter(self.pdf, self.page_number, box)
+        probe.gs = probe.gs._replace(clip=box)
+        probe.run(self.pdf.stream_data(ref), self.pdf.resolve(normal.get("/Resources")) or {})
+        return any(_coverage(box, painted) >= COVER_FRACTION for painted in probe.opaque)
+
+    def annotations(self, page: Any) -> None:
+        fields: List[BBox] = []  # signature field rectangles
+        for ref in self.pdf.resolve(page.get("/Annots")) or []:
+            annot = self.pdf.resolve(ref)
+            if not annot or "/Rect" not in annot:
+                continue
+            x0, y0, x1, y1 = (float(self.pdf.resolve(v)) for v in self.pdf.resolve(annot["/Rect"]))
+            box = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+            parent = self.pdf.resolve(annot.get("/Parent")) or {}
+            signature = "/Sig" in (annot.get("/FT"), parent.get("/FT"))
+            if signature:
+                fields.append(box)
+            subtype = annot.get("/Subtype")
+            if "/AP" not in annot or subtype in SKIPPED_ANNOTATIONS:
+                continue
+            if int(annot.get("/F", 0)) & HIDDEN_ANNOTATION_FLAGS or float(annot.get("/CA", 1)) < 1:
+                continue
+            if self._opaque_appearance(annot):
+                self._cover(box, "annotation", subtype, signature)
+        for overlay in self.overlays:
+            if overlay["kind"] in SIGNATURE_OVERLAY_KINDS and not overlay["signature"]:
+                bbox = tuple(overlay["bbox"])
+                overlay["signature"] = any(_coverage(field, bbox) >= COVER_FRACTION for field in fields)
+
+
+_OPERATORS = {
+    b"q": _Interpreter.op_q, b"Q": _Interpreter.op_Q, b"cm": _Interpreter.op_cm, b"gs": _Interpreter.op_gs,
+    b"g": _Interpreter.op_g, b"G": _Interpreter.op_G, b"rg": _Interpreter.op_rg, b"RG": _Interpreter.op_RG,
+    b"k": _Interpreter.op_k, b"K": _Interpreter.op_K, b"cs": _Interpreter.op_cs, b"CS": _Interpreter.op_CS,
+    b"sc": _Interpreter.op_sc, b"scn": _Interpreter.op_sc, b"SC": _Interpreter.op_SC, b"SCN": _Interpreter.op_SC,
+    b"m": _Interpreter.op_m, b"l": _Interpreter.op_l, b"c": _Interpreter.op_c, b"v": _Interpreter.op_v,
+    b"y": _Interpreter.op_y, b"re": _Interpreter.op_re, b"W": _Interpreter.op_W, b"W*": _Interpreter.op_W,
+    b"f": _Interpreter.op_f, b"F": _Interpreter.op_f, b"f*": _Interpreter.op_f, b"B": _Interpreter.op_f,
+    b"B*": _Interpreter.op_f, b"b": _Interpreter.op_f, b"b*": _Interpreter.op_f,
+    b"S": _Interpreter.op_n, b"s": _Interpreter.op_n, b"n": _Interpreter.op_n,
+    b"BT": _Interpreter.op_BT, b"Tc": _Interpreter.op_Tc, b"Tw": _Interpreter.op_Tw, b"Tz": _Interpreter.op_Tz,
+    b"TL": _Interpreter.op_TL, b"Ts": _Interpreter.op_Ts, b"Tr": _Interpreter.op_Tr, b"Tf": _Interpreter.op_Tf,
+    b"Td": _Interpreter.op_Td, b"TD": _Interpreter.op_TD, b"Tm": _Interpreter.op_Tm, b"T*": _Interpreter.op_Tstar,
+    b"Tj": _Interpreter.op_Tj, b"TJ": _Interpreter.op_TJ, b"'": _Interpreter.op_quote, b'"': _Interpreter.op_dquote,
+    b"Do": _Interpreter.op_Do,
+}
+
+
+def page_content(pdf: ParsedPdf, page: Any) -> bytes:
+    """
+    Decoded content of a page, its /Contents array joined in order.
+    """
+    contents = pdf.resolve(page.get("/Contents"))
+    if contents is None:
+        return b""
+    if isinstance(contents, list):
+        return b"\n".join(pdf.stream_data(c) for c in contents)
+    return pdf.stream_data(page.get("/Contents"))
+
+
+def scan_page(pdf: ParsedPdf, index: int, content: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Interpret one page's content stream (content, when the caller already
+    decoded it) and its annotations.
+    Returns { page, strings, invisible_text, overlays, error }: each
+    invisible_text entry is { page, reason, text, bbox } with reason one of
+    render_mode, transparent, tiny, off_page, clipped, white, covered; each
+    overlay is { page, kind (image/fill/annotation), name, signature, bbox,
+    covered_strings, covered_text }, signature set when the overlay is or
+    covers a signature field.
+    """
+    result: Dict[str, Any] = {"page": index + 1, "strings": 0, "invisible_text": [], "overlays": [], "error": None}
+    try:
+        page = pdf.pages[index]
+        box = page.cropbox
+        page_box = (float(box.left), float(box.bottom), float(box.right), float(box.top))
+        interpreter = _Interpreter(pdf, index + 1, page_box)
+        if content is None:
+            content = page_content(pdf, page)
+        interpreter.run(content, pdf.resolve(page.get("/Resources")) or {})
+        interpreter.annotations(page)
+        for entry in interpreter.invisible:
+            entry["bbox"] = _rounded(entry["bbox"])
+        result.update(strings=interpreter.strings, invisible_text=interpreter.invisible, overlays=interpreter.overlays)
+    except Exception as e:
+        result["error"] = f"content interpretation failed: {e}"
+    return result
+
+
+def signature_overlay_detected(overlays: Iterable[Dict[str, Any]]) -> bool:
+    """
+    True when a signature field's appearance covers text, or an image or
+    annotation that covers text also covers a signature field.
+    """
+    return any(o["signature"] for o in overlays)
+
+
+def _pages(entries: List[Dict[str, Any]]) -> str:
+    pages = sorted({e["page"] for e in entries})
+    return ", ".join(map(str, pages[:10])) + (", ..." if len(pages) > 10 else "")
+
+
+def layer_flags(invisible_text: List[Dict[str, Any]], overlays: List[Dict[str, Any]]) -> List[str]:
+    """
+    One line per hidden-text reason and per overlay kind, naming the pages.
+    """
+    flags = []
+    for reason in sorted({e["reason"] for e in invisible_text} - {"covered"}):
+        entries = [e for e in invisible_text if e["reason"] == reason]
+        flags.append(f"Hidden text ({reason.replace('_', ' ')}): {len(entries)} fragment(s) on page(s) {_pages(entries)}")
+    for kind in ("image", "annotation", "fill"):
+        entries = [o for o in overlays if o["kind"] == kind]
+        if entries:
+            flags.append(f"{kind.capitalize()} covering text: {len(entries)} overlay(s) on page(s) {_pages(entries)}")
+    return flags
+
+
+def scan_document(source, max_pages: Optional[int] = None) -> Dict[str, Any]:
+    """
+    scan_page over every page (or the first max_pages). source is a path,
+    bytes, buffer or ParsedPdf.
+    Returns { pages, invisible_text, overlays, signature_overlay_detected,
+    flags, errors }.
+    """
+    result: Dict[str, Any] = {"pages": 0, "invisible_text": [], "overlays": [],
+                              "signature_overlay_detected": False, "flags": [], "errors": []}
+    owns_context = not isinstance(source, ParsedPdf)
+    pdf = as_parsed_pdf(source)
+    try:
+        count = len(pdf.pages) if max_pages is None else min(len(pdf.pages), max_pages)
+        for index in range(count):
+            page = scan_page(pdf, index)
+            result["invisible_text"].extend(page["invisible_text"])
+            result["overlays"].extend(page["overlays"])
+            if page["error"]:
+                result["errors"].append(f"page {index + 1}: {page['error']}")
+        result["pages"] = count
+        result["signature_overlay_detected"] = signature_overlay_detected(result["overlays"])
+        result["flags"] = layer_flags(result["invisible_text"], result["overlays"])
+    except Exception as e:
+        result["errors"].append(f"content interpretation failed: {e}")
+    finally:
+        if owns_context:
+            pdf.close()
+    return result
+
+
+def scan_invisible_text(source) -> List[str]:
+    """
+    Text of every invisible or covered span in the document, in page order.
+    """
+    return [entry["text"] for entry in scan_document(source)["invisible_text"] if entry["text"].strip()]
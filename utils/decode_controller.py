@@ -1,58 +1,156 @@
-import fitz
 import io
-from utils.deobfuscation import decode_ascii85_streams, decode_cid_fonts
-from utils.ocr_engine import extract_text_via_ocr
+from scoring_engine import score_document
+from utils.deobfuscation import decode_cid_fonts
 from utils.suppression_detector import detect_suppression_patterns
 from utils.entity_extraction import extract_entities
 from utils.gpt_fraud_summary import generate_fraud_summary
+from utils.content_interpreter import layer_flags, signature_overlay_detected
+from utils.gpt_trigger_controller import gate_summary
 from utils.metadata import extract_metadata
+from utils.page_pipeline import iter_pages, page_count
+from utils.parsed_pdf import ParsedPdf, as_parsed_pdf
+from utils.result_cache import ResultCache, pipeline_fingerprint
 
-def decode_pdf(file_bytes, static_mode=False):
+SUMMARY_MODES = ("auto", "defer", "always", "never")
+SKIPPED_SUMMARY = "GPT summary skipped: no trigger conditions met."
+PENDING_SUMMARY = "GPT summary pending."
+
+def decode_pdf(file_bytes, static_mode=False, max_pages=None, stop_when=None, summarize="auto"):
+    """
+    Run the full decode pipeline over one PDF.
+    file_bytes may be raw bytes, a read-only buffer (memoryview, mmap), an open
+    binary file, a path, or an existing ParsedPdf; the document is parsed once
+    and the same context is handed to every stage without copying the file.
+
+    Pages are processed lazily, one at a time: text, ASCII85 fragments, CID
+    fonts and the OCR fallback are decided per page. max_pages limits the
+    pages read; stop_when(page_record, page_records) may return True to stop
+    early (e.g. once a risk threshold is reached). Either marks the result
+    "truncated".
+
+    The document is risk-scored with the scoring rules (risk_score,
+    risk_flags); summarize controls the LLM summary: "auto" runs it only for
+    documents should_trigger_gpt flags, the risk score included, "defer" flags them as gpt_status "pending" for
+    the caller to queue (see complete_summaries), "always" and "never" skip
+    the gate.
+    """
+    if summarize not in SUMMARY_MODES:
+        raise ValueError(f"summarize must be one of {SUMMARY_MODES}")
+    owns_context = not isinstance(file_bytes, ParsedPdf)
+    pdf = as_parsed_pdf(file_bytes)
     try:
-        suppression_flags = detect_suppression_patterns(file_bytes)
-    except Exception as e:
-        suppression_flags = [f"Suppression detection failed: {str(e)}"]
+        return _decode_parsed(pdf, static_mode, max_pages, stop_when, summarize)
+    finally:
+        if owns_context:
+            pdf.close()
 
-    decoded_text = ""
-    cid_data, ascii85_data, ocr_data = "", "", ""
+def decode_pdf_cached(file_bytes, static_mode=False, cache: ResultCache = None, max_pages=None, stop_when=None,
+                      summarize="auto"):
+    """
+    decode_pdf behind a content-addressed result cache.
+    The key is the file's SHA-256 plus the pipeline/rules fingerprint, so
+    re-uploads, UI reruns and duplicate files skip the pipeline entirely.
+    Runs with a stop_when callback are never cached, nor are results with
+    an error or a failed summary. A result whose summary is still pending
+    carries its "cache_key"; complete_summaries stores it once the summary
+    is in.
+    """
+    if cache is None or stop_when is not None:
+        return decode_pdf(file_bytes, static_mode=static_mode, max_pages=max_pages, stop_when=stop_when,
+                          summarize=summarize)
 
-    if not static_mode:
-        try:
-            with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-                for page in doc:
-                    text = page.get_text("text")
-                    if text.strip():
-                        decoded_text += text + "\n"
-        except Exception as e:
-            decoded_text += f"\n[fitz decoding failed: {str(e)}]"
+    owns_context = not isinstance(file_bytes, ParsedPdf)
+    pdf = as_parsed_pdf(file_bytes)
+    try:
+        key = ResultCache.make_key(pdf.sha256, pipeline_fingerprint(static_mode=static_mode, max_pages=max_pages, summarize=summarize))
+        result = cache.get(key)
+        if result is None:
+            result = _decode_parsed(pdf, static_mode, max_pages, None, summarize)
+            if result["gpt_status"] == "pending":
+                result["cache_key"] = key
+            elif result["gpt_status"] != "error" and not result["error"]:
+                cache.put(key, result)
+        return result
+    finally:
+        if owns_context:
+            pdf.close()
+
+def _decode_parsed(pdf, static_mode, max_pages=None, stop_when=None, summarize="auto"):
+    file_bytes = pdf.data
 
     try:
-        ascii85_data = decode_ascii85_streams(file_bytes)
+        suppression_flags = detect_suppression_patterns(file_bytes)
     except Exception as e:
-        ascii85_data = f"[ascii85 decode failed: {str(e)}]"
+        suppression_flags = [f"Suppression detection failed: {str(e)}"]
+
+    text_buffer = io.StringIO()
+    ascii85_parts = []
+    page_records = []
+    truncated = False
 
     try:
-        cid_data = decode_cid_fonts(file_bytes)
+        total_pages = page_count(pdf, static_mode)
+        for record in iter_pages(pdf, static_mode=static_mode, max_pages=max_pages):
+            if record["text"].strip():
+                text_buffer.write(record["text"])
+                text_buffer.write("\n")
+            ascii85_parts.extend(record["ascii85"])
+            page_record = {k: v for k, v in record.items() if k != "text"}
+            page_record["chars"] = len(record["text"].strip())
+            page_records.append(page_record)
+            if stop_when is not None and stop_when(record, page_records):
+                break
+        truncated = len(page_records) < total_pages
     except Exception as e:
-        cid_data = f"[cid decode failed: {str(e)}]"
+        text_buffer.write(f"\n[page decoding failed: {str(e)}]")
+
+    decoded_text = text_buffer.getvalue()
+    ascii85_data = "\n".join(ascii85_parts)
 
-    if not decoded_text.strip():
+    cid_data = ""
+    if any(r["cid_font"] for r in page_records):
         try:
-            ocr_data = extract_text_via_ocr(file_bytes)
+            # decode_cid_fonts needs real bytes; only CID documents pay for materialising a mapped file
+            cid_data = decode_cid_fonts(file_bytes if isinstance(file_bytes, bytes) else bytes(pdf.view))
         except Exception as e:
-            ocr_data = f"[ocr failed: {str(e)}]"
+            cid_data = f"[cid decode failed: {str(e)}]"
 
-    combined_text = "\n".join([decoded_text, ascii85_data, cid_data, ocr_data])
+    combined_text = "\n".join([decoded_text, ascii85_data, cid_data])
     entities = extract_entities(combined_text)
 
-    metadata_result = extract_metadata(file_bytes)
+    metadata_result = extract_metadata(pdf)
     metadata = metadata_result.get("metadata", {})
     fraud_flags = metadata_result.get("fraud_flags", [])
 
+    # hidden text and overlays found by the per-page content interpreter
+    invisible_text = [entry for r in page_records for entry in r["invisible_text"]]
+    overlays = [overlay for r in page_records for overlay in r["overlays"]]
+    fraud_flags = fraud_flags + layer_flags(invisible_text, overlays)
+    signature_overlay = signature_overlay_detected(overlays)
+
     try:
-        gpt_result = generate_fraud_summary(entities, metadata=metadata, suppression_flags=suppression_flags)
+        risk = score_document(pdf, signature_overlay_detected=signature_overlay)
     except Exception as e:
-        gpt_result = {"error": str(e)}
+        risk = {"risk_score": 0, "risk_flags": [f"Risk scoring failed: {str(e)}"]}
+
+    if summarize in ("auto", "defer"):
+        wanted = gate_summary(entities, suppression_flags, page_records, metadata_result, risk["risk_score"])
+    else:
+        wanted = summarize == "always"
+
+    gpt_result = {}
+    if not wanted:
+        gpt_status = "skipped"
+        gpt_result["fraud_summary"] = SKIPPED_SUMMARY
+    elif summarize == "defer":
+        gpt_status = "pending"
+        gpt_result["fraud_summary"] = PENDING_SUMMARY
+    else:
+        try:
+            gpt_result = generate_fraud_summary(entities, metadata=metadata, suppression_flags=suppression_flags)
+        except Exception as e:
+            gpt_result = {"error": str(e)}
+        gpt_status = "error" if "error" in gpt_result else "done"
 
     return {
         "decoded_text": combined_text,
@@ -60,7 +158,44 @@ def decode_pdf(file_bytes, static_mode=False):
         "suppression_flags": suppression_flags,
         "metadata": metadata,
         "fraud_flags": fraud_flags,
+        "hidden_text_fragments": [entry["text"] for entry in invisible_text if entry["text"].strip()],
+        "signature_overlay_detected": signature_overlay,
+        "risk_score": risk["risk_score"],
+        "risk_flags": risk["risk_flags"],
         "gpt_summary": gpt_result.get("fraud_summary", "GPT summary not available."),
+        "gpt_status": gpt_status,
+        "pages": page_records,
+        "ocr_pages": [r["page"] for r in page_records if r["ocr"]],
+        "truncated": truncated,
         "sha256": metadata_result.get("sha256"),
         "error": metadata_result.get("error")
-    }
\ No newline at end of file
+    }
+
+async def complete_summaries_async(results, service=None, cache: ResultCache = None):
+    """
+    Fill in the LLM summary of every result with gpt_status "pending",
+    concurrently through the summary service. Results are updated in place.
+    With a cache, each completed result that decode_pdf_cached left
+    uncached (see its "cache_key") is stored there.
+    """
+    from utils.summary_service import get_summary_service
+    service = service or get_summary_service()
+    pending = [r for r in results if r.get("gpt_status") == "pending"]
+    summaries = await service.summarize_many(
+        {"entities": r["entities"], "metadata": r["metadata"], "suppression_flags": r["suppression_flags"]}
+        for r in pending
+    )
+    for result, summary in zip(pending, summaries):
+        result["gpt_summary"] = summary.get("fraud_summary", "GPT summary not available.")
+        result["gpt_status"] = "error" if "error" in summary else "done"
+        key = result.pop("cache_key", None)
+        if cache is not None and key and result["gpt_status"] == "done" and not result["error"]:
+            cache.put(key, result)
+    return results
+
+def complete_summaries(results, service=None, cache: ResultCache = None):
+    """
+    Blocking form of complete_summaries_async.
+    """
+    from utils.summary_service import run_sync
+    return run_sync(complete_summaries_async(results, service, cache))
@@ -1,35 +1,33 @@
 # utils/decode_streams.py
 
-import io
-import zlib
-import re
-import fitz  # PyMuPDF
-from PyPDF2 import PdfReader
+from utils.parsed_pdf import ParsedPdf, as_parsed_pdf
+from utils.stream_scanner import iter_decoded_streams
 
-def decode_streams(file_bytes: bytes, use_fitz: bool = True) -> list:
+def decode_streams(file_bytes, use_fitz: bool = True) -> list:
     """
     Dual-mode decoder:
     - If use_fitz is True, extract with PyMuPDF.
     - If False, use static stream and FlateDecode parsing.
+    file_bytes may be raw bytes, a path, or a shared ParsedPdf context.
     Returns list of decoded block dicts.
     """
+    pdf = as_parsed_pdf(file_bytes)
     if use_fitz:
-        return _decode_with_fitz(file_bytes)
+        return _decode_with_fitz(pdf)
     else:
-        return _decode_static(file_bytes)
+        return _decode_static(pdf)
 
-def _decode_with_fitz(file_bytes: bytes) -> list:
+def _decode_with_fitz(pdf: ParsedPdf) -> list:
     blocks = []
     try:
-        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-            for page_num, page in enumerate(doc, 1):
-                text = page.get_text()
-                if text.strip():
-                    blocks.append({
-                        "page": page_num,
-                        "text": text.strip(),
-                        "source": "fitz"
-                    })
+        for page_num, page in enumerate(pdf.fitz_doc, 1):
+            text = page.get_text()
+            if text.strip():
+                blocks.append({
+                    "page": page_num,
+                    "text": text.strip(),
+                    "source": "fitz"
+                })
     except Exception as e:
         blocks.append({
             "page": -1,
@@ -38,11 +36,10 @@ def _decode_with_fitz(file_bytes: bytes) -> list:
         })
     return blocks
 
-def _decode_static(file_bytes: bytes) -> list:
+def _decode_static(pdf: ParsedPdf) -> list:
     blocks = []
     try:
-        reader = PdfReader(io.BytesIO(file_bytes))
-        for obj in reader.pages:
+        for obj in pdf.pages:
             raw_text = obj.extract_text() or ""
             if raw_text.strip():
                 blocks.append({
@@ -51,22 +48,15 @@ def _decode_static(file_bytes: bytes) -> list:
                     "source": "static"
                 })
 
-        # Direct stream extraction from raw bytes
-        raw = file_bytes.decode('latin1', errors='ignore')
-        streams = re.findall(r'stream(.*?)endstream', raw, re.DOTALL)
-        for idx, stream in enumerate(streams):
-            stream_data = stream.strip().encode('latin1', errors='ignore')
-            try:
-                decompressed = zlib.decompress(stream_data)
-                text = decompressed.decode('utf-8', errors='ignore')
-                if text.strip():
-                    blocks.append({
-                        "page": None,
-                        "text": text.strip(),
-                        "source": "flate"
-                    })
-            except Exception:
-                continue
+        # Direct stream extraction from raw bytes, one /Length-framed stream at a time
+        for stream, decoded in iter_decoded_streams(pdf.data, pdf.decode_budget):
+            text = decoded.data.decode('utf-8', errors='ignore')
+            if text.strip():
+                blocks.append({
+                    "page": None,
+                    "text": text.strip(),
+                    "source": "flate" if "/FlateDecode" in decoded.filters else "stream"
+                })
 
     except Exception as e:
         blocks.append({
@@ -0,0 +1,431 @@
+# utils/entity_engine.py
+
+import heapq
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+
+def default_patterns() -> List[Tuple[str, object]]:
+    """
+    The project's entity patterns. Alternation order decides which kind
+    is reported first when two kinds match at the same offset: the more
+    specific kinds come first.
+    """
+    from utils.patterns import (
+        phone_pattern, email_pattern, amount_pattern,
+        registry_key_pattern, address_pattern, foreign_script_pattern
+    )
+    return [
+        ("email", email_pattern),
+        ("amount", amount_pattern),
+        ("address", address_pattern),
+        ("registry_key", registry_key_pattern),
+        ("phone", phone_pattern),
+        ("foreign_script", foreign_script_pattern),
+    ]
+
+
+# A first-character class that matches ordinary prose is useless as a prefilter.
+_PROSE_SAMPLE = "etaoinshrdlu ETAOINSHRDLU\n"
+_WHITESPACE_SAMPLE = " \t\n\r\x0b\x0c"
+
+class EntitySpan(NamedTuple):
+    kind: str
+    start: int
+    end: int
+    text: str
+    language: Optional[str] = None
+
+
+# -- pattern analysis ---------------------------------------------------------
+# Done once per engine on the pattern source: which characters can start a
+# match, which literal every match must contain, and whether a match can
+# span whitespace. These decide how each kind is scanned. The reader covers
+# the usual syntax; anything it does not know (backreferences, inline flags,
+# conditionals, verbose patterns) leaves that kind to a plain finditer pass.
+#
+# Nodes are (op, arg): ("char", ch), ("set", class source), ("any", None),
+# ("zero", ch) for assertions (ch one of ^ $ b B A Z), and
+# ("group" | "look", [branch, ...]).
+# A branch is a list of (node, minimum repeat count).
+
+class _Unsupported(Exception):
+    pass
+
+
+_CLASS_ESCAPES = frozenset("dDsSwW")
+_ZERO_WIDTH_ESCAPES = frozenset("bBAZ")
+_CONTROL_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "a": "\a"}
+_HEX_ESCAPES = {"x": 2, "u": 4, "U": 8}
+_QUANTIFIER = re.compile(r"(?:([*+?])|\{(?:(\d+)(?:,\d*)?|,\d+)\})[?+]?")
+
+
+class _Reader:
+    def __init__(self, source: str):
+        self.source = source
+        self.pos = 0
+
+    def parse(self) -> list:
+        branches = self._branches()
+        if self.pos != len(self.source):
+            raise _Unsupported("unbalanced ')'")
+        return [(("group", branches), 1)]
+
+    def _branches(self) -> list:
+        branches = [self._sequence()]
+        while self.source.startswith("|", self.pos):
+            self.pos += 1
+            branches.append(self._sequence())
+        return branches
+
+    def _sequence(self) -> list:
+        items = []
+        while self.pos < len(self.source) and self.source[self.pos] not in "|)":
+            node = self._atom()
+            items.append((node, self._repeat(node)))
+        return items
+
+    def _repeat(self, node) -> int:
+        m = _QUANTIFIER.match(self.source, self.pos)
+        if m is None:
+            return 1
+        if node[0] in ("zero", "look"):
+            raise _Unsupported("repeated assertion")
+        self.pos = m.end()
+        if m.group(1):
+            return 1 if m.group(1) == "+" else 0
+        return int(m.group(2) or 0)
+
+    def _atom(self):
+        ch = self.source[self.pos]
+        self.pos += 1
+        if ch == "\\":
+            return self._escape()
+        if ch == "[":
+            return ("set", self._class())
+        if ch == "(":
+            return self._group()
+        if ch == ".":
+            return ("any", None)
+        if ch in "^$":
+            return ("zero", ch)
+        if ch in "*+?":
+            raise _Unsupported("nothing to repeat")
+        return ("char", ch)
+
+    def _escape(self):
+        ch = self.source[self.pos]
+        self.pos += 1
+        if ch in _CLASS_ESCAPES:
+            return ("set", "\\" + ch)
+        if ch in _ZERO_WIDTH_ESCAPES:
+            return ("zero", ch)
+        if ch in _CONTROL_ESCAPES:
+            return ("char", _CONTROL_ESCAPES[ch])
+        if ch in _HEX_ESCAPES:
+            digits = self.source[self.pos:self.pos + _HEX_ESCAPES[ch]]
+            self.pos += len(digits)
+            return ("char", chr(int(digits, 16)))
+        if ch.isalnum():
+            raise _Unsupported(f"escape \\{ch}")
+        return ("char", ch)
+
+    def _class(self) -> str:
+        source = self.source
+        start = self.pos - 1
+        if source.startswith("^", self.pos):
+            self.pos += 1
+        if source.startswith("]", self.pos):
+            self.pos += 1
+        while source[self.pos] != "]":
+            if source[self.pos] == "[":
+                raise _Unsupported("nested set")
+            self.pos += 2 if source[self.pos] == "\\" else 1
+        self.pos += 1
+        return source[start:self.pos]
+
+    def _group(self):
+        source, pos = self.source, self.pos
+        op = "group"
+        if source.startswith("?", pos):
+            if source.startswith(("?:", "?>"), pos):
+                self.pos += 2
+            elif source.startswith("?P<", pos):
+                self.pos = source.index(">", pos) + 1
+            elif source.startswith(("?=", "?!"), pos):
+                op, self.pos = "look", pos + 2
+            elif source.startswith(("?<=", "?<!"), pos):
+                op, self.pos = "look", pos + 3
+            else:
+                raise _Unsupported("group extension")
+        branches = self._branches()
+        if not source.startswith(")", self.pos):
+            raise _Unsupported("unterminated group")
+        self.pos += 1
+        return (op, branches)
+
+
+def _parse(pattern: re.Pattern) -> list:
+    if not isinstance(pattern.pattern, str) or pattern.flags & re.VERBOSE:
+        raise _Unsupported("verbose or bytes pattern")
+    return _Reader(pattern.pattern).parse()
+
+
+def _first_items(seq) -> Tuple[Optional[List[str]], bool]:
+    """
+    (class items any match of seq can start with, seq can match empty).
+    Items are None when the start is unconstrained.
+    """
+    items: List[str] = []
+    for node, lo in seq:
+        first, nullable = _first_of(node)
+        if first is None:
+            return None, False
+        items.extend(first)
+        if not nullable and lo > 0:
+            return items, False
+    return items, True
+
+
+def _first_of(node) -> Tuple[Optional[List[str]], bool]:
+    op, arg = node
+    if op == "char":
+        return [re.escape(arg)], False
+    if op == "set":
+        if arg.startswith("[^"):
+            return None, False
+        if not arg.startswith("["):
+            return [arg], False
+        inner = arg[1:-1]
+        return ["\\" + inner if inner.startswith("]") else inner], False
+    if op in ("zero", "look"):
+        return [], True
+    if op == "group":
+        items, nullable = [], False
+        for branch in arg:
+            first, n = _first_items(branch)
+            if first is None:
+                return None, False
+            items.extend(first)
+            nullable = nullable or n
+        return items, nullable
+    return None, False
+
+
+def _class_source(items: List[str]) -> Optional[str]:
+    return "[" + "".join(items) + "]" if items else None
+
+
+def _terminals(seq):
+    for node, _ in seq:
+        op, arg = node
+        if op == "group":
+            for branch in arg:
+                yield from _terminals(branch)
+        elif op != "look":
+            yield node
+
+
+def _nodes(seq):
+    for node, _ in seq:
+        yield node
+        if node[0] in ("group", "look"):
+            for branch in node[1]:
+                yield from _nodes(branch)
+
+
+def _sees_past_match(seq) -> bool:
+    # Lookarounds and end assertions depend on text outside the match, which
+    # a token-bounded search (endpos at the token end) would hide or fake.
+    return any(op == "look" or (op == "zero" and arg in "$Z") for op, arg in _nodes(seq))
+
+
+def _may_match_whitespace(seq) -> bool:
+    for op, arg in _terminals(seq):
+        if op == "char":
+            if arg.isspace():
+                return True
+        elif op == "set":
+            if re.search(arg, _WHITESPACE_SAMPLE):
+                return True
+        elif op == "any":
+            return True
+    return False
+
+
+def _required_anchor(seq, ignorecase: bool) -> Optional[str]:
+    # A punctuation literal that every match contains (e.g. the "@" of an email).
+    for (op, arg), lo in seq:
+        if lo < 1:
+            continue
+        if op == "group" and len(arg) == 1:
+            found = _required_anchor(arg[0], ignorecase)
+            if found:
+                return found
+        elif op == "char":
+            if not arg.isalnum() and not arg.isspace() and not (ignorecase and arg.lower() != arg.upper()):
+                return arg
+    return None
+
+
+def _compile(pattern) -> re.Pattern:
+    return pattern if isinstance(pattern, re.Pattern) else re.compile(pattern)
+
+
+class EntityEngine:
+    """
+    Entity scanner with compile-time prefilters.
+
+    Each pattern is analysed once and routed to the cheapest exact strategy:
+
+    - "prefix" kinds (matches start with a narrow character class such as
+      digits, "$" or a non-Latin script) share one scan: a class of all
+      their possible first characters lets the regex engine skip ordinary
+      prose in C, and at each candidate offset only the kinds that can
+      start with that character are tried. Every kind keeps its own
+      position, so a match of one kind never hides an overlapping match
+      of another.
+    - "anchor" kinds (matches never contain whitespace and always contain a
+      rare literal, like the "@" of an email) are only tried on the
+      whitespace-delimited tokens around occurrences of that literal.
+      Patterns with lookarounds or end assertions are not, since they look
+      beyond the token.
+    - anything else falls back to its own finditer pass.
+
+    Results are merged into one offset-ordered stream of EntitySpans; for
+    each kind they are exactly what pattern.finditer(text) yields.
+    """
+
+    def __init__(self, patterns: Optional[List[Tuple[str, object]]] = None):
+        if patterns is None:
+            patterns = default_patterns()
+        self.patterns = [(kind, _compile(p)) for kind, p in patterns]
+        self._by_kind = dict(self.patterns)
+        # foreign_script_pattern names one group per script/language
+        self._language_groups = {
+            kind: list(p.groupindex) for kind, p in self.patterns if kind == "foreign_script"
+        }
+        self.strategies = {}
+        self.anchors = {}
+        first_classes = {}
+        for kind, pattern in self.patterns:
+            strategy = "full"
+            try:
+                parsed = _parse(pattern)
+                first, nullable = _first_items(parsed)
+                source = _class_source(first) if first is not None and not nullable else None
+                if source and not re.search(source, _PROSE_SAMPLE, pattern.flags & re.IGNORECASE):
+                    strategy = "prefix"
+                    first_classes[kind] = source
+                elif not _may_match_whitespace(parsed) and not _sees_past_match(parsed):
+                    anchor = _required_anchor(parsed, bool(pattern.flags & re.IGNORECASE))
+                    if anchor:
+                        strategy = "anchor"
+                        self.anchors[kind] = anchor
+            except (_Unsupported, IndexError, ValueError, re.error):
+                strategy = "full"
+            self.strategies[kind] = strategy
+
+        # (kind, pattern, first-character test) in pattern order
+        self._prefix: List[Tuple[str, re.Pattern, re.Pattern]] = []
+        self.candidates: Optional[re.Pattern] = None
+        if first_classes:
+            try:
+                for kind, source in first_classes.items():
+                    pattern = self._by_kind[kind]
+                    self._prefix.append((kind, pattern, re.compile(source, pattern.flags & re.IGNORECASE)))
+                ignorecase = any(p.flags & re.IGNORECASE for _, p, _ in self._prefix)
+                # one character class: the engine scans for it without backtracking
+                union = "[" + "".join(c[1:-1] for c in first_classes.values()) + "]"
+                self.candidates = re.compile(union, re.IGNORECASE if ignorecase else 0)
+            except re.error:
+                for kind in first_classes:
+                    self.strategies[kind] = "full"
+                self._prefix, self.candidates = [], None
+
+    def _span(self, kind: str, match: re.Match, start: int, end: int) -> EntitySpan:
+        language = None
+        for name in self._language_groups.get(kind, ()):
+            if match.group(name) is not None:
+                language = name
+        return EntitySpan(kind, start, end, match.string[start:end], language)
+
+    def _scan_prefix(self, text: str) -> Iterator[EntitySpan]:
+        search = self.candidates.search
+        # character -> [(kind, match)] for the kinds that can start with it
+        routes = {}
+        resume = {kind: 0 for kind, _, _ in self._prefix}
+        pos = 0
+        while True:
+            c = search(text, pos)
+            if c is None:
+                return
+            at = c.start()
+            ch = text[at]
+            kinds = routes.get(ch)
+            if kinds is None:
+                kinds = routes[ch] = [(kind, p.match) for kind, p, first in self._prefix if first.match(ch)]
+            for kind, match in kinds:
+                if resume[kind] > at:
+                    continue
+                m = match(text, at)
+                if m is not None and m.end() > at:
+                    yield self._span(kind, m, at, m.end())
+                    resume[kind] = m.end()
+            # no kind can match again before the earliest resume point
+            pos = max(at + 1, min(resume.values()))
+
+    def _scan_anchor(self, kind: str, text: str) -> Iterator[EntitySpan]:
+        pattern = self._by_kind[kind]
+        anchor = self.anchors[kind]
+        pos = 0
+        while True:
+            at = text.find(anchor, pos)
+            if at < 0:
+                return
+            start = at
+            while start > pos and not text[start - 1].isspace():
+                start -= 1
+            end = at + 1
+            while end < len(text) and not text[end].isspace():
+                end += 1
+            for m in pattern.finditer(text, start, end):
+                yield self._span(kind, m, m.start(), m.end())
+            pos = end
+
+    def _scan_full(self, kind: str, text: str) -> Iterator[EntitySpan]:
+        for m in self._by_kind[kind].finditer(text):
+            yield self._span(kind, m, m.start(), m.end())
+
+    def scan(self, text: str) -> Iterator[EntitySpan]:
+        """
+        Yield EntitySpan(kind, start, end, text, language) in offset order.
+        """
+        streams = []
+        if self.candidates is not None:
+            streams.append(self._scan_prefix(text))
+        for kind, strategy in self.strategies.items():
+            if strategy == "anchor":
+                streams.append(self._scan_anchor(kind, text))
+            elif strategy == "full":
+                streams.append(self._scan_full(kind, text))
+        if len(streams) == 1:
+            return streams[0]
+        return heapq.merge(*streams, key=lambda span: span.start)
+
+
+_default_engine: Optional[EntityEngine] = None
+
+
+def default_engine() -> EntityEngine:
+    """
+    The engine over default_patterns(), built on first use.
+    """
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = EntityEngine()
+    return _default_engine
+
+
+def scan_entities(text: str) -> List[EntitySpan]:
+    return list(default_engine().scan(text))
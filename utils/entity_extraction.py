@@ -1,13 +1,25 @@
-import re
-from utils.patterns import (
-    phone_pattern, email_pattern, amount_pattern,
-    registry_key_pattern, address_pattern, foreign_script_pattern
-)
+from utils.entity_engine import default_engine
 
-def extract_entities(text, cid_context=None, ascii85_context=None, ocr_context=None):
+def entity_context(text, span, context_chars=80):
+    """
+    Materialises the text around one entry of entities["spans"].
+    Returns the hit with up to context_chars characters on either side.
+    """
+    _, start, end = span
+    return text[max(0, start - context_chars):end + context_chars]
+
+
+def extract_entities(text, cid_context=None, ascii85_context=None, ocr_context=None, context_chars=0, engine=None):
     """
     Extracts entities such as phone numbers, emails, registry keys, addresses, amounts, and foreign scripts.
     Disambiguates registry keys from misclassified phone numbers using context.
+    The text is scanned once by the compiled entity engine (utils.entity_engine).
+
+    The text itself is not copied into the result: entities["spans"] holds
+    [kind, start, end] offsets into it (decode_pdf returns it as decoded_text).
+    Pass context_chars > 0 to also get entities["snippets"], the text around
+    each hit; entity_context() does the same later on demand.
+    engine is the EntityEngine to scan with (default_engine() if None).
     """
 
     entities = {
@@ -17,24 +29,35 @@ def extract_entities(text, cid_context=None, ascii85_context=None, ocr_context=N
         "addresses": [],
         "registry_keys": [],
         "foreign_scripts": [],
-        "raw_blocks": [],
+        "spans": [],
     }
 
-    # Capture raw text blocks for traceback if needed
-    entities["raw_blocks"].append(text)
-
-    # Primary extraction patterns
-    phones = re.findall(phone_pattern, text)
-    emails = re.findall(email_pattern, text)
-    amounts = re.findall(amount_pattern, text)
-    registry_keys = re.findall(registry_key_pattern, text)
-    addresses = re.findall(address_pattern, text)
+    # Single pass over the text for every entity kind
+    phones, emails, amounts, registry_keys, addresses = [], [], [], [], []
+    foreign_hits = []
+    buckets = {
+        "phone": phones,
+        "email": emails,
+        "amount": amounts,
+        "registry_key": registry_keys,
+        "address": addresses,
+    }
+    spans = entities["spans"]
+    for span in (engine or default_engine()).scan(text):
+        spans.append([span.kind, span.start, span.end])
+        if span.kind == "foreign_script":
+            foreign_hits.append({
+                "language": span.language,
+                "text": span.text
+            })
+        else:
+            buckets[span.kind].append(span.text)
 
     # Disambiguate potential misclassified registry keys as phone numbers
     cleaned_phones = []
     inferred_keys = set(registry_keys)
     for p in phones:
-        digits = re.sub(r"[^\d]", "", p)
+        digits = "".join(c for c in p if c.isdigit())
         if len(digits) == 10 and digits.startswith(("00", "01", "05", "06", "07", "09")):
             if digits not in inferred_keys:
                 inferred_keys.add(digits)
@@ -44,14 +67,6 @@ def extract_entities(text, cid_context=None, ascii85_context=None, ocr_context=N
     # Capture registry keys from phone-like patterns
     deduped_keys = list(sorted(inferred_keys))
 
-    # Foreign script detection
-    foreign_hits = []
-    for match in foreign_script_pattern.finditer(text):
-        foreign_hits.append({
-            "language": match.lastgroup,
-            "text": match.group()
-        })
-
     # CID / ASCII85 / OCR contexts
     if cid_context:
         entities["cid_context"] = cid_context
@@ -67,4 +82,11 @@ def extract_entities(text, cid_context=None, ascii85_context=None, ocr_context=N
     entities["registry_keys"] = deduped_keys
     entities["foreign_scripts"] = foreign_hits
 
-    return entities
\ No newline at end of file
+    if context_chars > 0:
+        entities["snippets"] = [
+            {"kind": kind, "start": start, "end": end,
+             "context": entity_context(text, (kind, start, end), context_chars)}
+            for kind, start, end in spans
+        ]
+
+    return entities
@@ -0,0 +1,219 @@
+# utils/fonts.py
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from utils.parsed_pdf import ParsedPdf
+
+# Font analysis, once per unique font object. Long documents reuse a
+# handful of fonts on every page, so summaries are memoised on the
+# ParsedPdf by indirect reference (see ParsedPdf.font_summary) and the
+# document-wide list is taken from the object inventory, not the pages.
+
+CID_SUBTYPES = {"/Type0", "/CIDFontType0", "/CIDFontType2"}
+
+# Cap on fonts summarised for one document; the CID answer never depends on it.
+MAX_SUMMARISED_FONTS = 2000
+
+# Advance (in text space units per unit font size) assumed for codes a
+# simple font gives no width for, e.g. the standard 14 without /Widths.
+DEFAULT_WIDTH = 0.5
+
+# Cap on ToUnicode entries read from one CMap; <0000> <FFFF> ranges are common.
+MAX_TO_UNICODE = 0x10000
+
+_SUBSET_PREFIX = re.compile(r"^/?([A-Z]{6})\+")
+_FONT_FILES = ("/FontFile", "/FontFile2", "/FontFile3")
+_BFCHAR = re.compile(rb"beginbfchar(.*?)endbfchar", re.S)
+_BFRANGE = re.compile(rb"beginbfrange(.*?)endbfrange", re.S)
+_CHAR_PAIR = re.compile(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]*)>")
+_RANGE = re.compile(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(?:<([0-9A-Fa-f]*)>|\[([^\]]*)\])")
+_HEX = re.compile(rb"<([0-9A-Fa-f]*)>")
+
+
+def _name(value: Any) -> Optional[str]:
+    return str(value) if isinstance(value, str) else None
+
+
+def _encoding(pdf: ParsedPdf, value: Any) -> Optional[str]:
+    # A name (/WinAnsiEncoding, /Identity-H), a differences dictionary
+    # described by its base encoding, or an embedded CMap stream.
+    value = pdf.resolve(value)
+    if value is None or isinstance(value, str):
+        return _name(value)
+    if "/CMapName" in value or hasattr(value, "get_data"):
+        return f"embedded CMap {_name(value.get('/CMapName')) or ''}".rstrip()
+    base = _name(value.get("/BaseEncoding")) or "built-in"
+    return f"{base} with /Differences" if "/Differences" in value else base
+
+
+def summarize_font(pdf: ParsedPdf, font: Any) -> Dict[str, Any]:
+    """
+    { base_font, subtype, subset_prefix, encoding, to_unicode, embedded,
+    cid, descendant_subtype } for one font dictionary (or a reference to it).
+    Composite (Type0) fonts are described together with their descendant.
+    """
+    font = pdf.resolve(font)
+    subtype = _name(font.get("/Subtype"))
+    base_font = _name(font.get("/BaseFont"))
+    prefix = _SUBSET_PREFIX.match(base_font or "")
+
+    descendant = None
+    if subtype == "/Type0":
+        kids = pdf.resolve(font.get("/DescendantFonts")) or []
+        descendant = pdf.resolve(kids[0]) if len(kids) else None
+    descriptor = pdf.resolve((descendant or font).get("/FontDescriptor")) or {}
+
+    return {
+        "base_font": base_font,
+        "subtype": subtype,
+        "subset_prefix": prefix.group(1) if prefix else None,
+        "encoding": _encoding(pdf, font.get("/Encoding")),
+        "to_unicode": "/ToUnicode" in font,
+        "embedded": subtype == "/Type3" or any(key in descriptor for key in _FONT_FILES),
+        "cid": subtype in CID_SUBTYPES,
+        "descendant_subtype": _name(descendant.get("/Subtype")) if descendant is not None else None,
+    }
+
+
+def document_fonts(pdf: ParsedPdf, limit: int = MAX_SUMMARISED_FONTS) -> List[Dict[str, Any]]:
+    """
+    Summary of every font object in the document, in object-number order,
+    each with its "object" number. CIDFont descendants are folded into
+    their Type0 parent's entry rather than listed on their own.
+    """
+    from PyPDF2.generic import IndirectObject
+
+    inventory = pdf.inventory
+    nums = inventory.find(type="/Font")
+    descendants = set(inventory.find(type="/Font", subtype=("/CIDFontType0", "/CIDFontType2")).tolist())
+    fonts = []
+    for num in nums.tolist():
+        if num in descendants:
+            continue
+        if len(fonts) >= limit:
+            break
+        gen = inventory.entry(num)["gen"]
+        try:
+            summary = pdf.font_summary(IndirectObject(num, gen, pdf.reader))
+        except Exception as e:
+            summary = {"error": f"font could not be read: {e}"}
+        fonts.append({"object": num, **summary})
+    return fonts
+
+
+class FontMetrics(NamedTuple):
+    """
+    What a content-stream interpreter needs from a font: glyph advances
+    (text space units per unit font size) and code-to-text mapping.
+    """
+    two_byte: bool
+    widths: Tuple[float, ...]  # simple fonts: one per code 0-255
+    cid_widths: Dict[int, float]  # composite fonts: from /W
+    default_width: float
+    to_unicode: Dict[int, str]
+
+    def codes(self, string: bytes) -> List[int]:
+        if self.two_byte:
+            return [string[i] << 8 | string[i + 1] for i in range(0, len(string) - 1, 2)]
+        return list(string)
+
+    def width(self, codes: List[int]) -> float:
+        if self.two_byte:
+            get, default = self.cid_widths.get, self.default_width
+            return sum(get(code, default) for code in codes)
+        return sum(map(self.widths.__getitem__, codes))
+
+    def decode(self, string: bytes) -> str:
+        if self.two_byte:
+            return "".join(self.to_unicode.get(code, "\ufffd") for code in self.codes(string))
+        if not self.to_unicode:
+            return string.decode("cp1252", "replace")
+        return "".join(self.to_unicode.get(code) or bytes([code]).decode("cp1252", "replace") for code in string)
+
+
+FALLBACK_METRICS = FontMetrics(False, (DEFAULT_WIDTH,) * 256, {}, DEFAULT_WIDTH, {})
+
+
+def _unicode(hex_digits: bytes) -> str:
+    even = hex_digits[:len(hex_digits) - len(hex_digits) % 2]
+    return bytes.fromhex(even.decode("ascii")).decode("utf-16-be", "replace")
+
+
+def _to_unicode(pdf: ParsedPdf, ref: Any) -> Dict[int, str]:
+    # bfchar and bfrange entries of a ToUnicode CMap stream.
+    if ref is None:
+        return {}
+    try:
+        cmap = pdf.stream_data(ref)
+    except Exception:
+        return {}
+    mapping: Dict[int, str] = {}
+    for section in _BFCHAR.finditer(cmap):
+        for src, dst in _CHAR_PAIR.findall(section.group(1)):
+            mapping[int(src, 16)] = _unicode(dst)
+    for section in _BFRANGE.finditer(cmap):
+        for lo, hi, dst, listed in _RANGE.findall(section.group(1)):
+            lo, hi = int(lo, 16), min(int(hi, 16), int(lo, 16) + MAX_TO_UNICODE - len(mapping))
+            if listed:
+                for code, item in zip(range(lo, hi + 1), _HEX.findall(listed)):
+                    mapping[code] = _unicode(item)
+            elif dst:
+                # the last UTF-16 unit of the destination counts up
+                head, last = dst[:-4], int(dst[-4:], 16)
+                for offset in range(hi - lo + 1):
+                    mapping[lo + offset] = _unicode(head + b"%04X" % ((last + offset) & 0xFFFF))
+        if len(mapping) >= MAX_TO_UNICODE:
+            break
+    return mapping
+
+
+def _cid_widths(pdf: ParsedPdf, w: Any) -> Dict[int, float]:
+    # /W entries are "c [w1 w2 ...]" or "c_first c_last w".
+    items = [pdf.resolve(item) for item in (pdf.resolve(w) or [])]
+    widths: Dict[int, float] = {}
+    i = 0
+    while i + 1 < len(items):
+        first = int(items[i])
+        if isinstance(items[i + 1], list):
+            for offset, value in enumerate(items[i + 1]):
+                widths[first + offset] = float(pdf.resolve(value)) / 1000
+            i += 2
+        elif i + 2 < len(items):
+            last = min(int(items[i + 1]), first + MAX_TO_UNICODE)
+            for code in range(first, last + 1):
+                widths[code] = float(items[i + 2]) / 1000
+            i += 3
+        else:
+            break
+    return widths
+
+
+def load_font_metrics(pdf: ParsedPdf, font: Any) -> FontMetrics:
+    """
+    FontMetrics for one font dictionary (or a reference to it). Composite
+    fonts take /DW and /W from their descendant; Type3 widths are scaled
+    by the font matrix.
+    """
+    font = pdf.resolve(font) or {}
+    to_unicode = _to_unicode(pdf, font.get("/ToUnicode"))
+    if _name(font.get("/Subtype")) == "/Type0":
+        kids = pdf.resolve(font.get("/DescendantFonts")) or []
+        descendant = pdf.resolve(kids[0]) if len(kids) else {}
+        default = float(descendant.get("/DW", 1000)) / 1000
+        return FontMetrics(True, (), _cid_widths(pdf, descendant.get("/W")), default, to_unicode)
+
+    scale = 0.001
+    if _name(font.get("/Subtype")) == "/Type3":
+        scale = float((pdf.resolve(font.get("/FontMatrix")) or [0.001])[0])
+    widths = pdf.resolve(font.get("/Widths"))
+    if not widths:
+        return FALLBACK_METRICS._replace(to_unicode=to_unicode)
+    descriptor = pdf.resolve(font.get("/FontDescriptor")) or {}
+    missing = float(descriptor.get("/MissingWidth", 0)) * scale
+    table = [missing] * 256
+    first = int(font.get("/FirstChar", 0))
+    for offset, value in enumerate(widths):
+        if 0 <= first + offset < 256:
+            table[first + offset] = float(pdf.resolve(value)) * scale
+    return FontMetrics(False, tuple(table), {}, missing, to_unicode)
@@ -1,4 +1,26 @@
 import re
+import threading
+from collections import Counter
+
+TRIGGER_FLAGS = ("cid_font_used", "raster_overlay", "metadata_error", "xfa_suppression")
+
+# Placeholder or decoy financial amounts
+_SUSPICIOUS_AMOUNT = re.compile(r"\$(?:1|8|79)\b")
+# Registry keys disguised as phones or doc IDs
+_TEN_DIGITS = re.compile(r"\b\d{10}\b")
+
+# How many documents the gate sent to / kept from the LLM in this process.
+GATE_COUNTERS = Counter()
+_counter_lock = threading.Lock()
+
+_ENTITY_LABELS = (
+    ("phones", "Phone"),
+    ("emails", "Email"),
+    ("amounts", "Amount"),
+    ("registry_keys", "Registry Key"),
+    ("addresses", "Address"),
+)
+
 
 def should_trigger_gpt(summary: dict, decoded_blocks: list) -> bool:
     """
@@ -10,27 +32,25 @@ def should_trigger_gpt(summary: dict, decoded_blocks: list) -> bool:
         return True
 
     suppression_flags = summary.get("suppression_flags", [])
-    if any(flag in suppression_flags for flag in ["cid_font_used", "raster_overlay", "metadata_error", "xfa_suppression"]):
+    if any(flag in suppression_flags for flag in TRIGGER_FLAGS):
         return True
 
     all_entities = summary.get("extracted_entities", [])
     if len(all_entities) > 75:
         return True
 
-    # Detect anomaly: 25+ "Phone" entries or other excessive repetition
-    phone_count = sum(1 for ent in all_entities if "Phone" in ent)
-    if phone_count >= 25:
-        return True
-
-    # Detect placeholder or decoy financial amounts
-    suspicious_amounts = [r"\$1\b", r"\$8\b", r"\$79\b"]
+    # One pass over the entities for repetition, decoy amounts and registry keys
+    phone_count = 0
     for ent in all_entities:
-        if any(re.search(pat, ent) for pat in suspicious_amounts):
+        if "Phone" in ent:
+            phone_count += 1
+            # 25+ "Phone" entries or other excessive repetition
+            if phone_count >= 25:
+                return True
+        if _SUSPICIOUS_AMOUNT.search(ent):
             return True
-
-    # Detect obvious registry keys disguised as phones or doc IDs
-    for ent in all_entities:
-        if "00000" in ent or re.match(r"\b\d{10}\b", ent):
+        # entries may be "Label: value"; the key must open the value
+        if "00000" in ent or _TEN_DIGITS.match(ent.split(": ", 1)[-1]):
             return True
 
     # Detect decoded block anomalies: too many CID markers or short/no text
@@ -38,10 +58,47 @@ def should_trigger_gpt(summary: dict, decoded_blocks: list) -> bool:
     for block in decoded_blocks:
         if block.get("cid_font_used") or "/CID" in block.get("raw", ""):
             suspicious_blocks += 1
-        if block.get("text") and len(block.get("text")) < 15:
+        chars = block["chars"] if "chars" in block else len(block.get("text") or "")
+        if 0 < chars < 15:
             suspicious_blocks += 1
 
     if suspicious_blocks >= 3:
         return True
 
-    return False
\ No newline at end of file
+    return False
+
+
+def trigger_inputs(entities, suppression_flags, page_records, metadata_result=None, risk_score=0):
+    """
+    Builds should_trigger_gpt's (summary, decoded_blocks) from decode_pdf's
+    intermediate results. Per-page records stand in for decoded blocks.
+    """
+    metadata_result = metadata_result or {}
+    flags = list(suppression_flags or [])
+    if metadata_result.get("cid_font_usage") or any(r.get("cid_font") for r in page_records):
+        flags.append("cid_font_used")
+    if metadata_result.get("error"):
+        flags.append("metadata_error")
+
+    extracted = []
+    for key, label in _ENTITY_LABELS:
+        extracted.extend(f"{label}: {value}" for value in entities.get(key, []))
+
+    summary = {
+        "risk_score": risk_score,
+        "suppression_flags": flags,
+        "extracted_entities": extracted,
+    }
+    blocks = [{"cid_font_used": r.get("cid_font"), "chars": r.get("chars", 0)} for r in page_records]
+    return summary, blocks
+
+
+def gate_summary(entities, suppression_flags, page_records, metadata_result=None, risk_score=0) -> bool:
+    """
+    Runs the trigger on one document and counts the decision.
+    Returns True when the document is worth an LLM summary.
+    """
+    triggered = should_trigger_gpt(*trigger_inputs(entities, suppression_flags, page_records, metadata_result, risk_score))
+    with _counter_lock:
+        GATE_COUNTERS["triggered" if triggered else "skipped"] += 1
+    return triggered
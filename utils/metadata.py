@@ -1,49 +1,58 @@
-import PyPDF2
-from PyPDF2.generic import IndirectObject
+from utils.fonts import document_fonts
+from utils.parsed_pdf import as_parsed_pdf
+
+def extract_metadata(source):
+    """
+    Accepts a file path, raw PDF bytes, or a shared ParsedPdf context.
+    """
+    from PyPDF2.generic import IndirectObject
+    from signature_verifier import verify_signatures
 
-def extract_metadata(file_path):
     result = {
         "sha256": None,
         "metadata": {},
         "fraud_flags": [],
         "cid_font_usage": False,
+        "fonts": [],
+        "signatures": [],
         "agpl_license_flag": False,
         "error": None,
     }
 
     try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            doc_info = reader.metadata
-
-            # Safely extract metadata
-            meta_dict = {}
-            for key in doc_info:
-                val = doc_info[key]
-                if isinstance(val, IndirectObject):
-                    try:
-                        val = val.get_object()
-                    except:
-                        val = str(val)
-                meta_dict[str(key)] = str(val)
-            result["metadata"] = meta_dict
-
-            # Flag known AGPL-bound producers
-            producer = str(meta_dict.get("/Producer", "")).lower()
-            creator = str(meta_dict.get("/Creator", "")).lower()
-            if any(x in producer for x in ["itext", "bfo", "ghostscript"]) or \
-               any(x in creator for x in ["itext", "bfo", "ghostscript"]):
-                result["agpl_license_flag"] = True
-
-            # Detect CID usage in font dictionaries
-            for page in reader.pages:
-                if "/Resources" in page and "/Font" in page["/Resources"]:
-                    fonts = page["/Resources"]["/Font"]
-                    for font_ref in fonts.values():
-                        font_obj = font_ref.get_object()
-                        if "/Subtype" in font_obj and "/CIDFont" in str(font_obj["/Subtype"]):
-                            result["cid_font_usage"] = True
-                            break
+        pdf = as_parsed_pdf(source)
+        result["sha256"] = pdf.sha256
+        doc_info = pdf.metadata or {}
+
+        # Safely extract metadata
+        meta_dict = {}
+        for key in doc_info:
+            val = doc_info[key]
+            if isinstance(val, IndirectObject):
+                try:
+                    val = pdf.resolve(val)
+                except:
+                    val = str(val)
+            meta_dict[str(key)] = str(val)
+        result["metadata"] = meta_dict
+
+        # Flag known AGPL-bound producers
+        producer = str(meta_dict.get("/Producer", "")).lower()
+        creator = str(meta_dict.get("/Creator", "")).lower()
+        if any(x in producer for x in ["itext", "bfo", "ghostscript"]) or \
+           any(x in creator for x in ["itext", "bfo", "ghostscript"]):
+            result["agpl_license_flag"] = True
+
+        # Detect CID fonts from the object inventory (descendant fonts
+        # included) rather than walking every page's /Resources
+        result["cid_font_usage"] = bool(pdf.inventory.cid_fonts().size)
+        # one summary per unique font object, however many pages use it
+        result["fonts"] = document_fonts(pdf)
+
+        # byte-range coverage, digests and later revisions of every signature
+        verified = verify_signatures(pdf)
+        result["signatures"] = verified["signatures"]
+        result["fraud_flags"].extend(verified["flags"])
 
     except Exception as e:
         result["error"] = f"Metadata extraction failed: {str(e)}"
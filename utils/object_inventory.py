@@ -0,0 +1,423 @@
+# utils/object_inventory.py
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from utils.pdf_objects import Ref, parse_object
+from utils.stream_filters import DecodeBudget, decode_stream, filter_chain
+from utils.xref_index import COMPRESSED, IN_USE, XrefChain, read_xref_chain
+
+# Index of every live object in a PDF, built in one pass over the objects
+# the xref points at (object streams are decoded once each). Structural
+# questions (any CIDFont? all signature fields? any JavaScript?) become
+# array lookups instead of walks of the object graph.
+
+# Name columns and the dictionary key each one records.
+COLUMNS = {
+    "type": "/Type",
+    "subtype": "/Subtype",
+    "field_type": "/FT",
+    "filter": "/Filter",
+}
+
+ABSENT = -1
+
+# Action types (ISO 32000-2, 12.6.4.1); /S also names structure element
+# roles, soft-mask kinds and the like, which are not recorded.
+ACTION_TYPES = frozenset((
+    "/GoTo", "/GoToR", "/GoToE", "/GoToDp", "/Launch", "/Thread", "/URI", "/Sound", "/Movie", "/Hide",
+    "/Named", "/SubmitForm", "/ResetForm", "/ImportData", "/JavaScript", "/SetOCGState", "/Rendition",
+    "/Trans", "/GoTo3DView", "/RichMediaExecute",
+))
+
+# One bit per action type in the actions column: an object can carry
+# several inline actions (e.g. a link with /A /URI and /AA /JavaScript).
+ACTION_BITS = {name: 1 << i for i, name in enumerate(sorted(ACTION_TYPES))}
+
+# Action kinds the signature validator reports.
+RISKY_ACTIONS = ("/JavaScript", "/Launch")
+
+# Annotation subtypes (ISO 32000-2, 12.5.6.1); /Type /Annot is optional.
+ANNOTATION_SUBTYPES = (
+    "/Text", "/Link", "/FreeText", "/Line", "/Square", "/Circle", "/Polygon", "/PolyLine",
+    "/Highlight", "/Underline", "/Squiggly", "/StrikeOut", "/Caret", "/Stamp", "/Ink", "/Popup",
+    "/FileAttachment", "/Sound", "/Movie", "/Screen", "/Widget", "/PrinterMark", "/TrapNet",
+    "/Watermark", "/3D", "/Redact", "/Projection", "/RichMedia",
+)
+
+_OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_ANY_OBJ = re.compile(rb"(?<![\d.])(\d+)\s+(\d+)\s+obj\b")
+_STREAM_KW = re.compile(rb"\s*stream(?:\r\n|\r|\n)")
+# A dictionary with no nested dictionaries, strings, comments or name
+# escapes; most page, font and stream dictionaries look like this.
+_FLAT_DICT = re.compile(rb"\s*<<([^<>(%#{}]{0,4096})>>")
+_FLAT_TOKEN = re.compile(rb"/[^\x00\t\n\x0c\r /\[\]]*|\[|\]|[^\x00\t\n\x0c\r /\[\]]+")
+
+Criterion = Union[str, Iterable[str]]
+
+
+class ObjectInventory:
+    """
+    Compact per-object index. Row i describes object nums[i]:
+    gens, offsets (file offset of its "N G obj" header, -1 inside an object
+    stream), containers (object stream number, -1 if none), lengths
+    (stream /Length, -1 for non-stream objects) and one int32 column per
+    COLUMNS entry holding an index into names (ABSENT when the key is
+    missing); the filter column holds a stream's whole filter chain.
+    actions is a bitmask (ACTION_BITS) of the object's own action type and
+    those of every action dictionary inlined in it. Rows are sorted by
+    object number.
+    """
+
+    def __init__(self, nums, gens, offsets, containers, lengths, codes: Dict[str, np.ndarray],
+                 actions, names: List[str], errors: List[str]):
+        self.nums = nums
+        self.gens = gens
+        self.offsets = offsets
+        self.containers = containers
+        self.lengths = lengths
+        self.codes = codes
+        self.action_bits = actions
+        self.names = names
+        self.errors = errors
+        self._name_codes = {name: i for i, name in enumerate(names)}
+
+    def __len__(self) -> int:
+        return len(self.nums)
+
+    def _mask(self, column: str, value: Criterion) -> np.ndarray:
+        wanted = [value] if isinstance(value, str) else list(value)
+        if column == "action":
+            bits = 0
+            for name in wanted:
+                bits |= ACTION_BITS.get(name, 0)
+            return (self.action_bits & bits) != 0
+        codes = [self._name_codes[v] for v in wanted if v in self._name_codes]
+        if not codes:
+            return np.zeros(len(self.nums), bool)
+        return np.isin(self.codes[column], codes)
+
+    def find(self, **criteria: Criterion) -> np.ndarray:
+        """
+        Object numbers matching every criterion, e.g.
+        find(type="/Font", subtype=("/CIDFontType0", "/CIDFontType2")).
+        Keys are COLUMNS names or "action" (objects carrying any of the
+        given action types); a value is a name or a collection of names.
+        """
+        mask = np.ones(len(self.nums), bool)
+        for column, value in criteria.items():
+            if column not in COLUMNS and column != "action":
+                raise KeyError(f"unknown inventory column {column!r}")
+            mask &= self._mask(column, value)
+        return self.nums[mask]
+
+    def has(self, **criteria: Criterion) -> bool:
+        return bool(self.find(**criteria).size)
+
+    def counts(self, column: str) -> Dict[str, int]:
+        """{name: number of objects} for one column, absent keys omitted."""
+        if column == "action":
+            counts = {name: int(np.count_nonzero(self.action_bits & bit)) for name, bit in ACTION_BITS.items()}
+            return {name: count for name, count in counts.items() if count}
+        codes = self.codes[column]
+        values, counts = np.unique(codes[codes != ABSENT], return_counts=True)
+        return {self.names[v]: int(c) for v, c in zip(values.tolist(), counts.tolist())}
+
+    def entry(self, num: int) -> Optional[dict]:
+        i = int(np.searchsorted(self.nums, num))
+        if i >= len(self.nums) or self.nums[i] != num:
+            return None
+        row = {
+            "num": num,
+            "gen": int(self.gens[i]),
+            "offset": int(self.offsets[i]),
+            "container": int(self.containers[i]),
+            "length": int(self.lengths[i]),
+        }
+        for column, codes in self.codes.items():
+            row[column] = self.names[codes[i]] if codes[i] != ABSENT else None
+        row["actions"] = [name for name, bit in ACTION_BITS.items() if self.action_bits[i] & bit]
+        return row
+
+    # -- common queries ---------------------------------------------------
+
+    def cid_fonts(self) -> np.ndarray:
+        # /CIDFontType0C is an embedded font program's subtype, not a font's
+        return self.find(type="/Font", subtype=("/CIDFontType0", "/CIDFontType2"))
+
+    def signature_fields(self) -> np.ndarray:
+        return self.find(field_type="/Sig")
+
+    def actions(self, kinds: Criterion = RISKY_ACTIONS) -> np.ndarray:
+        """Objects that are, or inline, an action of one of the given kinds."""
+        return self.find(action=kinds)
+
+    def annotations(self) -> np.ndarray:
+        typed = self._mask("type", "/Annot")
+        untyped = (self.codes["type"] == ABSENT) & self._mask("subtype", ANNOTATION_SUBTYPES)
+        return self.nums[typed | untyped]
+
+
+def _is_action(d: dict) -> bool:
+    return d.get("/S") in ACTION_TYPES and d.get("/Type", "/Action") == "/Action"
+
+
+def _inline_actions(obj: dict) -> int:
+    # ACTION_BITS of every action in obj itself or inlined under the keys
+    # actions hang from (/A, /OpenAction, /Next, and /AA's trigger events).
+    found = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, list):
+            pending.extend(item)
+            continue
+        if not isinstance(item, dict):
+            continue
+        if _is_action(item):
+            found |= ACTION_BITS[item["/S"]]
+        for key in ("/A", "/OpenAction", "/Next"):
+            value = item.get(key)
+            if value is not None:
+                pending.append(value)
+        triggers = item.get("/AA")
+        if isinstance(triggers, dict):
+            pending.extend(triggers.values())
+    return found
+
+
+def _describe(obj: dict, is_stream: bool) -> Dict[str, Optional[str]]:
+    names: Dict[str, Optional[str]] = {}
+    for column, key in COLUMNS.items():
+        value = obj.get(key)
+        names[column] = value if isinstance(value, str) else None
+    # the filter chain, space-separated; /F means something else outside streams
+    names["filter"] = (" ".join(name for name, _ in filter_chain(obj)) or None) if is_stream else None
+    return names
+
+
+def _live_entries(chain: XrefChain) -> Tuple[np.ndarray, ...]:
+    # The newest definition of every object that is in use.
+    sections = chain.sections
+    if not sections:
+        return np.empty(0, np.int64), np.empty(0, np.uint8), np.empty(0, np.int64), np.empty(0, np.int64)
+    nums = np.concatenate([s.nums for s in sections])
+    types = np.concatenate([s.types for s in sections])
+    fields = np.concatenate([s.fields for s in sections])
+    gens = np.concatenate([s.gens for s in sections])
+    nums, first = np.unique(nums, return_index=True)  # sections are newest first
+    types, fields, gens = types[first], fields[first], gens[first]
+    live = ((types == IN_USE) | (types == COMPRESSED)) & (nums != 0)
+    return nums[live], types[live], fields[live], gens[live]
+
+
+def _scanned_entries(buf) -> Tuple[np.ndarray, ...]:
+    # No usable xref: every "N G obj" header in the file, last one winning.
+    latest: Dict[int, Tuple[int, int]] = {}
+    for m in _ANY_OBJ.finditer(buf):
+        latest[int(m.group(1))] = (m.start(), int(m.group(2)))
+    nums = np.array(sorted(latest), np.int64)
+    fields = np.array([latest[n][0] for n in nums.tolist()], np.int64)
+    gens = np.array([latest[n][1] for n in nums.tolist()], np.int64)
+    return nums, np.full(len(nums), IN_USE, np.uint8), fields, gens
+
+
+def _flat_atom(token: bytes):
+    if token[:1] == b"/":
+        return "/" + token[1:].decode("latin1")
+    if token in (b"true", b"false"):
+        return token == b"true"
+    if token == b"null":
+        return None
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)  # anything else is not flat; the caller falls back
+
+
+def _flat_dictionary(tokens: List[bytes]) -> dict:
+    # Tokens of a flat dictionary body to the same dict parse_object builds.
+    result = {}
+    i, n = 0, len(tokens)
+    while i < n:
+        key = tokens[i]
+        if key[:1] != b"/" or i + 1 >= n:
+            raise ValueError("not a key")
+        token = tokens[i + 1]
+        if token == b"[":
+            end = tokens.index(b"]", i + 2)
+            if b"[" in tokens[i + 2:end]:
+                raise ValueError("nested array")
+            value = _flat_array(tokens[i + 2:end])
+            i = end + 1
+        elif tokens[i + 3:i + 4] == [b"R"] and token.isdigit() and tokens[i + 2].isdigit():
+            value = Ref(int(token), int(tokens[i + 2]))
+            i += 4
+        else:
+            value = _flat_atom(token)
+            i += 2
+        result["/" + key[1:].decode("latin1")] = value
+    return result
+
+
+def _flat_array(tokens: List[bytes]) -> list:
+    items = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i + 2:i + 3] == [b"R"] and tokens[i].isdigit() and tokens[i + 1].isdigit():
+            items.append(Ref(int(tokens[i]), int(tokens[i + 1])))
+            i += 3
+        else:
+            items.append(_flat_atom(tokens[i]))
+            i += 1
+    return items
+
+
+def _object_at(buf, offset: int):
+    # (object, position after it, stream body offset or None)
+    header = _OBJ_HEADER.match(buf, offset)
+    if header is None:
+        raise ValueError(f"no object header at {offset}")
+    flat = _FLAT_DICT.match(buf, header.end())
+    obj = None
+    if flat is not None:
+        try:
+            obj, pos = _flat_dictionary(_FLAT_TOKEN.findall(flat.group(1))), flat.end()
+        except ValueError:
+            obj = None
+    if obj is None:
+        obj, pos = parse_object(buf, header.end())
+    body = None
+    if isinstance(obj, dict):
+        kw = _STREAM_KW.match(buf, pos)
+        if kw is not None:
+            body = kw.end()
+    return obj, pos, body
+
+
+class _Builder:
+    def __init__(self, buf, nums, types, fields, gens, budget: DecodeBudget):
+        self.buf = buf
+        self.budget = budget
+        self.nums, self.types, self.fields, self.gens = nums, types, fields, gens
+        self.offsets_by_num = dict(zip(nums[types == IN_USE].tolist(), fields[types == IN_USE].tolist()))
+        self.errors: List[str] = []
+        self._names: Dict[str, int] = {}
+
+    def code(self, name: Optional[str]) -> int:
+        if name is None:
+            return ABSENT
+        code = self._names.get(name)
+        if code is None:
+            code = self._names[name] = len(self._names)
+        return code
+
+    def resolve_length(self, value) -> int:
+        if isinstance(value, Ref):
+            offset = self.offsets_by_num.get(value.num)
+            if offset is None:
+                return -1
+            try:
+                value, _, _ = _object_at(self.buf, offset)
+            except ValueError:
+                return -1
+        return value if isinstance(value, int) else -1
+
+    def object_stream(self, num: int) -> Dict[int, object]:
+        # Every object stored in object stream num, by object number.
+        offset = self.offsets_by_num.get(num)
+        if offset is None:
+            raise ValueError(f"object stream {num} is not in the xref")
+        container, _, body_at = _object_at(self.buf, offset)
+        if body_at is None or container.get("/Type") != "/ObjStm":
+            raise ValueError(f"object {num} is not an object stream")
+        length = self.resolve_length(container.get("/Length"))
+        if length < 0:
+            raise ValueError(f"object stream {num} has no usable /Length")
+        body = memoryview(self.buf)[body_at:body_at + length]
+        try:
+            decoded = decode_stream(body, container, self.budget)
+        finally:
+            body.release()
+        if not decoded.complete:
+            raise ValueError(f"object stream {num} failed to decode: {decoded.error}")
+        data = decoded.data
+        first = container.get("/First", 0)
+        count = container.get("/N", 0)
+        pairs = []
+        pos = 0
+        for _ in range(count):
+            obj_num, pos = parse_object(data, pos)
+            obj_off, pos = parse_object(data, pos)
+            pairs.append((obj_num, obj_off))
+        members = {}
+        for obj_num, obj_off in pairs:
+            try:
+                members[obj_num], _ = parse_object(data, first + obj_off)
+            except ValueError:
+                continue
+        return members
+
+    def build(self) -> ObjectInventory:
+        n = len(self.nums)
+        offsets = np.where(self.types == IN_USE, self.fields, -1)
+        gens = np.where(self.types == IN_USE, self.gens, 0)  # objects in streams are generation 0
+        containers = np.where(self.types == COMPRESSED, self.fields, -1)
+        lengths = np.full(n, -1, np.int64)
+        codes = {column: np.full(n, ABSENT, np.int32) for column in COLUMNS}
+        actions = np.zeros(n, np.int32)
+        streams: Dict[int, Dict[int, object]] = {}
+        unreadable = 0
+
+        for i, (num, kind, field) in enumerate(zip(self.nums.tolist(), self.types.tolist(), self.fields.tolist())):
+            try:
+                if kind == IN_USE:
+                    obj, _, body_at = _object_at(self.buf, field)
+                    is_stream = body_at is not None
+                    if is_stream:
+                        lengths[i] = self.resolve_length(obj.get("/Length"))
+                else:
+                    is_stream = False
+                    if field not in streams:
+                        try:
+                            streams[field] = self.object_stream(field)
+                        except (ValueError, TypeError) as e:
+                            self.errors.append(str(e))
+                            streams[field] = {}
+                    obj = streams[field].get(num)
+            except (ValueError, TypeError):
+                obj = None
+            if obj is None:
+                unreadable += 1
+                continue
+            if isinstance(obj, dict):
+                for column, name in _describe(obj, is_stream).items():
+                    codes[column][i] = self.code(name)
+                actions[i] = _inline_actions(obj)
+
+        if unreadable:
+            self.errors.append(f"{unreadable} object(s) could not be read")
+        names = sorted(self._names, key=self._names.get)
+        return ObjectInventory(self.nums, gens, offsets, containers, lengths, codes, actions, names, self.errors)
+
+
+def build_inventory(buf, chain: Optional[XrefChain] = None, budget: Optional[DecodeBudget] = None) -> ObjectInventory:
+    """
+    Index every live object of buf (bytes or mmap) using its xref chain,
+    or a scan for object headers when the file has no usable xref.
+    Object streams are decoded against budget, the document's
+    DecodeBudget (a fresh one if None).
+    """
+    budget = budget or DecodeBudget()
+    chain = chain or read_xref_chain(buf, budget=budget)
+    entries = _live_entries(chain)
+    errors = list(chain.errors)
+    if not len(entries[0]):
+        entries = _scanned_entries(buf)
+        if len(entries[0]):
+            errors.append("no usable xref; objects found by scanning")
+    builder = _Builder(buf, *entries, budget)
+    builder.errors = errors
+    return builder.build()
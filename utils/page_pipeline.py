@@ -0,0 +1,110 @@
+# utils/page_pipeline.py
+
+import logging
+from typing import Any, Dict, Iterator, Optional
+
+from utils.content_interpreter import page_content, scan_page
+from utils.parsed_pdf import ParsedPdf
+from utils.utility import find_ascii85_fragments
+
+logger = logging.getLogger(__name__)
+
+CID_FONT_TYPES = {"Type0", "CIDFontType0", "CIDFontType2"}
+
+
+def _fitz_page(pdf: ParsedPdf, index: int) -> Dict[str, Any]:
+    page = pdf.fitz_doc[index]
+    fonts = page.get_fonts()
+    return {
+        "text": page.get_text("text"),
+        "content": page.read_contents(),
+        "cid_font": any(f[2] in CID_FONT_TYPES for f in fonts),
+    }
+
+
+def _static_page(pdf: ParsedPdf, index: int) -> Dict[str, Any]:
+    page = pdf.pages[index]
+    content = page_content(pdf, page)
+
+    # font summaries are memoised per font object, so shared fonts are
+    # only inspected on the first page that uses them
+    resources = pdf.resolve(page.get("/Resources")) or {}
+    fonts = pdf.resolve(resources.get("/Font")) or {}
+    cid_font = any(pdf.font_summary(font_ref)["cid"] for font_ref in fonts.values())
+
+    return {
+        "text": page.extract_text() or "",
+        "content": content,
+        "cid_font": cid_font,
+    }
+
+
+def _ocr_page(pdf: ParsedPdf, index: int) -> str:
+    page = pdf.fitz_doc[index]
+    textpage = page.get_textpage_ocr(full=True)
+    return page.get_text("text", textpage=textpage)
+
+
+def analyze_page(pdf: ParsedPdf, index: int, static_mode: bool = False, ocr: bool = True) -> Dict[str, Any]:
+    """
+    Decide text, ASCII85, CID and OCR for a single page, and interpret its
+    content stream for hidden text and overlays (see scan_page).
+    Returns { page, text, source, ascii85, cid_font, invisible_text,
+    overlays, ocr, error }. OCR only runs when the page has no text layer,
+    and never in static mode, which does not open the document in PyMuPDF.
+    """
+    record = {
+        "page": index + 1,
+        "text": "",
+        "source": None,
+        "ascii85": [],
+        "cid_font": False,
+        "invisible_text": [],
+        "overlays": [],
+        "ocr": False,
+        "error": None,
+    }
+    try:
+        layer = _static_page(pdf, index) if static_mode else _fitz_page(pdf, index)
+        record["cid_font"] = layer["cid_font"]
+        record["ascii85"] = [f.decode("latin1") for f in find_ascii85_fragments(layer["content"])]
+        if layer["text"].strip():
+            record["text"] = layer["text"]
+            record["source"] = "static" if static_mode else "fitz"
+        layers = scan_page(pdf, index, layer["content"])
+        record["invisible_text"] = layers["invisible_text"]
+        record["overlays"] = layers["overlays"]
+        record["error"] = layers["error"]
+    except Exception as e:
+        record["error"] = f"page decoding failed: {e}"
+
+    if ocr and not static_mode and not record["text"].strip():
+        try:
+            record["text"] = _ocr_page(pdf, index)
+            record["source"] = "ocr"
+            record["ocr"] = True
+        except Exception as e:
+            record["error"] = f"ocr failed: {e}"
+    return record
+
+
+def page_count(pdf: ParsedPdf, static_mode: bool = False) -> int:
+    return len(pdf.pages) if static_mode else pdf.fitz_doc.page_count
+
+
+def iter_pages(
+    pdf: ParsedPdf,
+    static_mode: bool = False,
+    max_pages: Optional[int] = None,
+    ocr: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield analyze_page() records in page order, stopping after
+    max_pages. Callers may stop iterating at any point; later pages are
+    never touched.
+    """
+    count = page_count(pdf, static_mode)
+    if max_pages is not None:
+        count = min(count, max_pages)
+    for index in range(count):
+        yield analyze_page(pdf, index, static_mode=static_mode, ocr=ocr)
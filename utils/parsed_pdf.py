@@ -0,0 +1,349 @@
+# utils/parsed_pdf.py
+
+import hashlib
+import io
+import logging
+import mmap
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from PyPDF2 import PdfReader
+
+    from utils.object_inventory import ObjectInventory
+    from utils.stream_filters import DecodeBudget
+    from utils.xref_index import XrefChain
+
+# PyMuPDF and PyPDF2 are imported on first use of the facet that needs
+# them: static-mode workers never load fitz, and cache hits load neither.
+
+logger = logging.getLogger(__name__)
+
+# PyPDF2's IndirectObject, bound on first resolve rather than imported on
+# every call: resolve() and stream_data() sit on the interpreter's hot path.
+_IndirectObject: Optional[type] = None
+
+
+def _indirect_type() -> type:
+    global _IndirectObject
+    if _IndirectObject is None:
+        from PyPDF2.generic import IndirectObject
+        _IndirectObject = IndirectObject
+    return _IndirectObject
+
+
+class _ViewStream(io.RawIOBase):
+    """
+    Seekable read-only file over a buffer (memoryview, bytearray, mmap).
+    Reads copy only the requested slice, never the whole buffer.
+    """
+
+    def __init__(self, buf):
+        self._view = memoryview(buf).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+class ParsedPdf:
+    """
+    Parse-once document context shared by every analysis stage.
+
+    Each facet (PyPDF2 reader, xref table, trailer, page tree, PyMuPDF
+    handle, resolved/decoded objects, raw xref chain, object inventory)
+    is built on first access and then reused, so a pipeline touching the
+    same file from several stages only pays for parsing it once.
+
+    data may be bytes or any read-only buffer (memoryview, mmap); it is
+    never copied. from_path maps the file instead of reading it, so the
+    whole pipeline works on the OS page cache.
+    """
+
+    def __init__(self, data, file_path: Optional[str] = None, stream: Optional[io.IOBase] = None):
+        self.data = data
+        self.file_path = file_path
+        self._stream = stream
+        self._owned = None  # mapping or buffer view this context created and must release
+        self._view: Optional[memoryview] = None
+        self._sha256: Optional[str] = None
+        self._reader: Optional["PdfReader"] = None
+        self._pages: Optional[List[Any]] = None
+        self._fitz_doc = None
+        self._xref_chain: Optional["XrefChain"] = None
+        self._inventory: Optional["ObjectInventory"] = None
+        self._decode_budget: Optional["DecodeBudget"] = None
+        self._objects: Dict[Tuple[int, int], Any] = {}
+        self._stream_data: Dict[Tuple[int, int], bytes] = {}
+        self._fonts: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._font_metrics: Dict[Tuple[int, int], Any] = {}
+
+    @classmethod
+    def from_path(cls, file_path: str) -> "ParsedPdf":
+        """
+        Map the file read-only; pages are faulted in as stages touch them.
+        """
+        with open(file_path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return cls(b"", file_path=file_path)
+        return cls._owning(mm, file_path)
+
+    @classmethod
+    def from_file(cls, fileobj, file_path: Optional[str] = None) -> "ParsedPdf":
+        """
+        Wrap an open binary file without copying it: in-memory files
+        (io.BytesIO, Streamlit uploads) are viewed through getbuffer(),
+        real files are mapped.
+        """
+        file_path = file_path or getattr(fileobj, "name", None)
+        if hasattr(fileobj, "getbuffer"):
+            return cls._owning(fileobj.getbuffer().toreadonly(), file_path)
+        try:
+            fileno = fileobj.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return cls(fileobj.read(), file_path=file_path)
+        try:
+            mm = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return cls(b"", file_path=file_path)
+        return cls._owning(mm, file_path)
+
+    @classmethod
+    def _owning(cls, buf, file_path: Optional[str]) -> "ParsedPdf":
+        pdf = cls(buf, file_path=file_path)
+        pdf._owned = buf
+        return pdf
+
+    # -- raw file ---------------------------------------------------------
+
+    @property
+    def view(self) -> memoryview:
+        """Read-only memoryview over the file; slices of it are zero-copy."""
+        if self._view is None:
+            self._view = memoryview(self.data).toreadonly()
+        return self._view
+
+    @property
+    def size(self) -> int:
+        return len(self.view)
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    # -- raw structure --------------------------------------------------
+
+    @property
+    def decode_budget(self) -> "DecodeBudget":
+        """
+        Output budget shared by every stream this document decodes (xref
+        and object streams included), so many small streams cannot add up
+        past the per-document cap.
+        """
+        if self._decode_budget is None:
+            from utils.stream_filters import DecodeBudget
+            self._decode_budget = DecodeBudget()
+        return self._decode_budget
+
+    @property
+    def xref_chain(self) -> "XrefChain":
+        """Every xref section of the file, read from the raw buffer (newest first)."""
+        if self._xref_chain is None:
+            from utils.xref_index import read_xref_chain
+            self._xref_chain = read_xref_chain(self.data, budget=self.decode_budget)
+        return self._xref_chain
+
+    @property
+    def inventory(self) -> "ObjectInventory":
+        """
+        Type/subtype/filter index of every live object, built in one pass
+        from the xref; use it for structural questions instead of walking
+        the object graph.
+        """
+        if self._inventory is None:
+            from utils.object_inventory import build_inventory
+            self._inventory = build_inventory(self.data, self.xref_chain, self.decode_budget)
+        return self._inventory
+
+    # -- PyPDF2 facets ----------------------------------------------------
+
+    @property
+    def reader(self) -> "PdfReader":
+        if self._reader is None:
+            from PyPDF2 import PdfReader
+            self._reader = PdfReader(self._reader_stream(), strict=False)
+        return self._reader
+
+    def _reader_stream(self) -> io.IOBase:
+        if self._stream is None:
+            if isinstance(self.data, bytes):
+                self._stream = io.BytesIO(self.data)  # shares the bytes object
+            else:
+                self._stream = io.BufferedReader(_ViewStream(self.data), buffer_size=64 * 1024)
+        return self._stream
+
+    @property
+    def xref(self) -> Dict[int, Dict[int, int]]:
+        """Xref table as parsed by PyPDF2: {generation: {object number: offset}}."""
+        return self.reader.xref
+
+    @property
+    def trailer(self):
+        return self.reader.trailer
+
+    @property
+    def root(self):
+        return self.resolve(self.trailer.get("/Root", {}))
+
+    @property
+    def pages(self) -> List[Any]:
+        """Flattened page tree, walked once."""
+        if self._pages is None:
+            self._pages = list(self.reader.pages)
+        return self._pages
+
+    @property
+    def metadata(self):
+        return self.reader.metadata
+
+    def resolve(self, obj: Any) -> Any:
+        """
+        Dereference an IndirectObject, memoising by (object number, generation).
+        Direct objects are returned unchanged.
+        """
+        if not isinstance(obj, _IndirectObject or _indirect_type()):
+            return obj
+        key = (obj.idnum, obj.generation)
+        if key not in self._objects:
+            self._objects[key] = obj.get_object()
+        return self._objects[key]
+
+    def stream_data(self, obj: Any) -> bytes:
+        """
+        Decoded bytes of a stream object, cached when the stream is indirect.
+        """
+        key = (obj.idnum, obj.generation) if isinstance(obj, _IndirectObject or _indirect_type()) else None
+        if key is not None and key in self._stream_data:
+            return self._stream_data[key]
+        data = self.resolve(obj).get_data()
+        if key is not None:
+            self._stream_data[key] = data
+        return data
+
+    def font_summary(self, font_ref: Any) -> Dict[str, Any]:
+        """
+        utils.fonts.summarize_font for a font, computed once per indirect
+        font object however many pages share it.
+        """
+        key = (font_ref.idnum, font_ref.generation) if hasattr(font_ref, "idnum") else None
+        summary = self._fonts.get(key) if key is not None else None
+        if summary is None:
+            from utils.fonts import summarize_font
+            summary = summarize_font(self, font_ref)
+            if key is not None:
+                self._fonts[key] = summary
+        return summary
+
+    def font_metrics(self, font_ref: Any):
+        """
+        utils.fonts.load_font_metrics for a font, memoised the same way as
+        font_summary so every page sharing a font reuses its widths.
+        """
+        key = (font_ref.idnum, font_ref.generation) if hasattr(font_ref, "idnum") else None
+        metrics = self._font_metrics.get(key) if key is not None else None
+        if metrics is None:
+            from utils.fonts import load_font_metrics
+            metrics = load_font_metrics(self, font_ref)
+            if key is not None:
+                self._font_metrics[key] = metrics
+        return metrics
+
+    # -- PyMuPDF facet ----------------------------------------------------
+
+    @property
+    def fitz_doc(self):
+        if self._fitz_doc is None:
+            import fitz  # PyMuPDF
+            self._fitz_doc = fitz.open(stream=self.view, filetype="pdf")
+        return self._fitz_doc
+
+    # -- lifecycle --------------------------------------------------------
+
+    def close(self) -> None:
+        if self._fitz_doc is not None:
+            try:
+                self._fitz_doc.close()
+            except Exception:
+                logger.debug("Closing fitz document failed", exc_info=True)
+            self._fitz_doc = None
+        self._reader = None
+        self._pages = None
+        self._xref_chain = None
+        self._inventory = None
+        self._objects.clear()
+        self._stream_data.clear()
+        self._fonts.clear()
+        self._font_metrics.clear()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._owned is not None:
+            try:
+                if isinstance(self._owned, memoryview):
+                    self._owned.release()
+                else:
+                    self._owned.close()
+            except BufferError:
+                # a caller still holds a slice; the buffer goes with it
+                logger.debug("File buffer still exported; left to the collector")
+            self._owned = None
+
+    def __enter__(self) -> "ParsedPdf":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def as_parsed_pdf(source: Any) -> ParsedPdf:
+    """
+    Normalise a stage input to a ParsedPdf.
+    Accepts an existing ParsedPdf (returned as-is), raw PDF bytes or any
+    read-only buffer (memoryview, mmap), an open binary file, or a file path.
+    Buffers are used in place, never copied.
+    """
+    if isinstance(source, ParsedPdf):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return ParsedPdf(source)
+    if hasattr(source, "read"):
+        return ParsedPdf.from_file(source)
+    return ParsedPdf.from_path(source)
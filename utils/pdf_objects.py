@@ -0,0 +1,233 @@
+# utils/pdf_objects.py
+
+import re
+from typing import Any, NamedTuple, Tuple
+
+# Minimal COS object parser for raw PDF bytes (stream dictionaries, trailers,
+# xref-stream headers, content streams). Representation:
+#   name        -> str with leading slash, e.g. "/FlateDecode"
+#   string      -> bytes (literal and hex)
+#   number      -> int / float
+#   array       -> list, dictionary -> dict keyed by name
+#   reference   -> Ref(num, gen)
+#   true/false/null -> True / False / None
+#   any other bare word (obj, stream, content-stream operators) -> Keyword
+
+WHITESPACE = b"\x00\t\n\x0c\r "
+DELIMITERS = b"()<>[]{}/%"
+_REGULAR_STOP = WHITESPACE + DELIMITERS
+_HEX_END = re.compile(rb">")
+_LITERAL_RUN = re.compile(rb"[^()\\]+")
+
+
+class Ref(NamedTuple):
+    num: int
+    gen: int
+
+
+class Keyword(str):
+    pass
+
+
+def skip_ws(data: bytes, pos: int) -> int:
+    n = len(data)
+    while pos < n:
+        c = data[pos]
+        if c in WHITESPACE:
+            pos += 1
+        elif c == 0x25:  # % comment runs to end of line
+            while pos < n and data[pos] not in b"\r\n":
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def _read_regular(data: bytes, pos: int) -> Tuple[bytes, int]:
+    start = pos
+    n = len(data)
+    while pos < n and data[pos] not in _REGULAR_STOP:
+        pos += 1
+    return bytes(data[start:pos]), pos  # data may be a memoryview
+
+
+def _parse_number(token: bytes):
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
+
+
+def _is_int(token: bytes) -> bool:
+    return token.isdigit()
+
+
+def _parse_name(data: bytes, pos: int) -> Tuple[str, int]:
+    raw, pos = _read_regular(data, pos + 1)
+    if b"#" in raw:
+        out = bytearray()
+        i = 0
+        while i < len(raw):
+            if raw[i] == 0x23 and i + 2 < len(raw):
+                try:
+                    out.append(int(raw[i + 1:i + 3], 16))
+                    i += 3
+                    continue
+                except ValueError:
+                    pass
+            out.append(raw[i])
+            i += 1
+        raw = bytes(out)
+    return "/" + raw.decode("latin1"), pos
+
+
+_ESCAPES = {ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t", ord("b"): b"\b", ord("f"): b"\f"}
+
+
+def _parse_literal_string(data: bytes, pos: int) -> Tuple[bytes, int]:
+    out = bytearray()
+    depth = 1
+    pos += 1
+    n = len(data)
+    while pos < n:
+        run = _LITERAL_RUN.match(data, pos)
+        if run is not None:  # plain bytes up to the next paren or backslash
+            out += run.group()
+            pos = run.end()
+            continue
+        c = data[pos]
+        if c == 0x5C:  # backslash
+            pos += 1
+            if pos >= n:
+                break
+            e = data[pos]
+            if e in _ESCAPES:
+                out += _ESCAPES[e]
+                pos += 1
+            elif 0x30 <= e <= 0x37:
+                digits = bytes(data[pos:pos + 3])
+                k = 0
+                while k < len(digits) and 0x30 <= digits[k] <= 0x37:
+                    k += 1
+                out.append(int(digits[:k], 8) & 0xFF)
+                pos += k
+            elif e in b"\r\n":
+                pos += 2 if data[pos:pos + 2] == b"\r\n" else 1
+            else:
+                out.append(e)
+                pos += 1
+            continue
+        if c == 0x28:
+            depth += 1
+        elif c == 0x29:
+            depth -= 1
+            if depth == 0:
+                return bytes(out), pos + 1
+        out.append(c)
+        pos += 1
+    return bytes(out), pos
+
+
+def _parse_hex_string(data: bytes, pos: int) -> Tuple[bytes, int]:
+    m = _HEX_END.search(data, pos + 1)  # regex, not .find: data may be a memoryview
+    end = m.start() if m else len(data)
+    digits = bytes(data[pos + 1:end]).translate(None, WHITESPACE)
+    if len(digits) % 2:
+        digits += b"0"
+    try:
+        value = bytes.fromhex(digits.decode("latin1"))
+    except ValueError:
+        value = b""
+    return value, end + 1
+
+
+def parse_object(data: bytes, pos: int = 0) -> Tuple[Any, int]:
+    """
+    Parse one object starting at pos. Returns (object, position after it).
+    Raises ValueError at end of data or on a stray closing delimiter.
+    """
+    pos = skip_ws(data, pos)
+    if pos >= len(data):
+        raise ValueError("unexpected end of data")
+    c = data[pos]
+
+    if c == 0x2F:  # /
+        return _parse_name(data, pos)
+    if c == 0x3C:  # <
+        if data[pos + 1:pos + 2] == b"<":
+            return _parse_dict_body(data, pos + 2)
+        return _parse_hex_string(data, pos)
+    if c == 0x5B:  # [
+        items = []
+        pos += 1
+        while True:
+            pos = skip_ws(data, pos)
+            if pos >= len(data):
+                return items, pos
+            if data[pos] == 0x5D:
+                return items, pos + 1
+            item, pos = parse_object(data, pos)
+            items.append(item)
+    if c == 0x28:  # (
+        return _parse_literal_string(data, pos)
+    if c in b")>]}":
+        raise ValueError(f"unexpected delimiter {chr(c)!r} at {pos}")
+    if c in b"{}":
+        return Keyword(chr(c)), pos + 1
+
+    token, end = _read_regular(data, pos)
+    if not token:
+        raise ValueError(f"unparseable byte at {pos}")
+    if token in (b"true", b"false"):
+        return token == b"true", end
+    if token == b"null":
+        return None, end
+    if token[:1] in b"+-.0123456789":
+        try:
+            number = _parse_number(token)
+        except ValueError:
+            return Keyword(token.decode("latin1")), end
+        # "num gen R" reference lookahead
+        if _is_int(token):
+            p2 = skip_ws(data, end)
+            gen_tok, p3 = _read_regular(data, p2)
+            if gen_tok and _is_int(gen_tok):
+                p4 = skip_ws(data, p3)
+                r_tok, p5 = _read_regular(data, p4)
+                if r_tok == b"R":
+                    return Ref(number, int(gen_tok)), p5
+        return number, end
+    return Keyword(token.decode("latin1")), end
+
+
+def _parse_dict_body(data: bytes, pos: int) -> Tuple[dict, int]:
+    result = {}
+    while True:
+        pos = skip_ws(data, pos)
+        if pos >= len(data):
+            return result, pos
+        if data[pos:pos + 2] == b">>":
+            return result, pos + 2
+        try:
+            key, pos = parse_object(data, pos)
+        except ValueError:
+            return result, pos + 1
+        if not isinstance(key, str) or isinstance(key, Keyword):
+            continue
+        try:
+            value, pos = parse_object(data, pos)
+        except ValueError:
+            return result, pos
+        result[key] = value
+
+
+def parse_dictionary(data: bytes, pos: int = 0) -> dict:
+    """
+    Parse a "<< ... >>" dictionary at (or after whitespace from) pos.
+    Returns {} when no dictionary is present or it cannot be parsed.
+    """
+    try:
+        obj, _ = parse_object(data, pos)
+    except ValueError:
+        return {}
+    return obj if isinstance(obj, dict) else {}
@@ -0,0 +1,166 @@
+# utils/result_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever decode_pdf output changes shape or meaning so stale entries
+# stop matching instead of being served.
+PIPELINE_VERSION = "6"
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "acroinformer", "results.sqlite")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def pipeline_fingerprint(rules_path: str = "config/scoring_rules.json", **options: Any) -> str:
+    """
+    Short hash of everything besides the file itself that shapes a result:
+    the pipeline version, the scoring rules file and any decode options.
+    """
+    h = hashlib.sha256(PIPELINE_VERSION.encode())
+    try:
+        with open(rules_path, "rb") as f:
+            h.update(f.read())
+    except OSError:
+        h.update(b"<no rules>")
+    h.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Persistent, size-bounded LRU cache of analysis results in SQLite.
+
+    Keys are "<sha256>:<fingerprint>" strings (see make_key); values are any
+    JSON-serialisable object, stored zlib-compressed. When the total payload
+    size exceeds max_bytes the least recently used entries are evicted; the
+    total is kept as a running "bytes" counter next to the hit/miss ones so
+    a put never has to sum the table. Safe to share between threads and between processes (WAL mode).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_access)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        # files written before the running total existed
+        self._conn.execute(
+            "INSERT OR IGNORE INTO counters(name, value) SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(sha256: str, fingerprint: str) -> str:
+        return f"{sha256}:{fingerprint}"
+
+    def _bump(self, name: str, amount: int = 1) -> None:
+        self._conn.execute(
+            "INSERT INTO counters(name, value) VALUES (?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                self._bump("misses")
+                self._conn.commit()
+                return None
+            self.hits += 1
+            self._bump("hits")
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        try:
+            return json.loads(zlib.decompress(row[0]))
+        except Exception:
+            logger.warning("Dropping unreadable cache entry %s", key, exc_info=True)
+            self.delete(key)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        payload = zlib.compress(json.dumps(value, default=str).encode("utf-8"))
+        if len(payload) > self.max_bytes:
+            logger.debug("Result for %s larger than cache; not stored", key)
+            return
+        with self._lock, self._conn:
+            # write-locked up front: the old size is read in the same transaction
+            self._conn.execute("BEGIN IMMEDIATE")
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries(key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._bump("bytes", len(payload) - (old[0] if old else 0))
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if old is not None:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bump("bytes", -old[0])
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        freed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._bump("bytes", -freed)
+        self.evictions += len(doomed)
+        self._bump("evictions", len(doomed))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters for monitoring: this process's hits/misses/evictions, the
+        lifetime totals across every process sharing the file, and current size.
+        """
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            lifetime = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "lifetime": {name: lifetime.get(name, 0) for name in ("hits", "misses", "evictions")},
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,343 @@
+# utils/stream_filters.py
+
+import base64
+import logging
+import re
+import zlib
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from utils.pdf_objects import parse_dictionary
+
+logger = logging.getLogger(__name__)
+
+# Output caps. A stream that inflates past MAX_STREAM_OUTPUT, or a document
+# whose decoded streams together pass MAX_DOCUMENT_OUTPUT, is cut off there.
+MAX_STREAM_OUTPUT = 64 * 1024 * 1024
+MAX_DOCUMENT_OUTPUT = 512 * 1024 * 1024
+
+_CHUNK = 64 * 1024
+
+# Image codecs: the chain stops here and the data is returned still encoded.
+PASSTHROUGH_FILTERS = {"/DCTDecode", "/JPXDecode", "/CCITTFaxDecode", "/JBIG2Decode", "/Crypt"}
+
+_ABBREVIATIONS = {
+    "/AHx": "/ASCIIHexDecode",
+    "/A85": "/ASCII85Decode",
+    "/LZW": "/LZWDecode",
+    "/Fl": "/FlateDecode",
+    "/RL": "/RunLengthDecode",
+    "/CCF": "/CCITTFaxDecode",
+    "/DCT": "/DCTDecode",
+}
+
+
+class DecodeLimitExceeded(Exception):
+    """
+    Output passed the limit. partial holds the output up to the limit.
+    """
+
+    def __init__(self, message: str, partial: bytes = b""):
+        super().__init__(message)
+        self.partial = partial
+
+
+class DecodeBudget:
+    """
+    Per-document output budget shared by every stream decoded from one file.
+    """
+
+    def __init__(self, max_stream_bytes: int = MAX_STREAM_OUTPUT, max_document_bytes: int = MAX_DOCUMENT_OUTPUT):
+        self.max_stream_bytes = max_stream_bytes
+        self.max_document_bytes = max_document_bytes
+        self.used = 0
+
+    def stream_limit(self) -> int:
+        return max(0, min(self.max_stream_bytes, self.max_document_bytes - self.used))
+
+    def consume(self, n: int) -> None:
+        self.used += n
+
+    @property
+    def exhausted(self) -> bool:
+        return self.used >= self.max_document_bytes
+
+
+class DecodeResult(NamedTuple):
+    data: bytes
+    filters: List[str]          # filters applied, in order
+    complete: bool              # False if truncated, corrupt, capped or stopped at a codec
+    error: Optional[str] = None
+
+
+def _check(out, limit: int) -> None:
+    if len(out) > limit:
+        raise DecodeLimitExceeded(f"decoded output exceeds {limit} bytes", bytes(out[:limit]))
+
+
+# -- individual filters ---------------------------------------------------
+# Each returns (data, complete) and raises DecodeLimitExceeded past `limit`,
+# carrying the first `limit` bytes of output.
+
+def flate_decode(data, limit: int) -> Tuple[bytes, bool]:
+    """
+    Incremental inflate. Output is bounded by `limit` while decompressing,
+    and whatever was recovered before a corrupt or truncated point is kept.
+    """
+    view = memoryview(data)
+    wbits = zlib.MAX_WBITS
+    if len(view) >= 2 and (view[0] & 0x0F) != 8:
+        wbits = -zlib.MAX_WBITS  # raw deflate without zlib header
+    d = zlib.decompressobj(wbits)
+    out = bytearray()
+    try:
+        for i in range(0, len(view), _CHUNK):
+            pending = view[i:i + _CHUNK]
+            while pending:
+                out += d.decompress(pending, limit - len(out) + 1)
+                _check(out, limit)
+                pending = d.unconsumed_tail
+            if d.eof:
+                break
+        out += d.flush()
+        _check(out, limit)
+    except zlib.error as e:
+        logger.debug("Flate stream corrupt after %d bytes: %s", len(out), e)
+        return bytes(out), False
+    return bytes(out), d.eof
+
+
+def ascii85_decode(data, limit: int) -> Tuple[bytes, bool]:
+    body = bytes(data).strip()
+    if body.startswith(b"<~"):
+        body = body[2:]
+    end = body.find(b"~>")
+    terminated = end >= 0
+    if terminated:
+        body = body[:end]
+    body = re.sub(rb"\s+", b"", body)
+    # every 5 characters (or "z") make 4 bytes: more than this cannot fit
+    cap = (limit // 4 + 1) * 5
+    try:
+        out, valid = base64.a85decode(body[:cap]), True
+    except ValueError:
+        # Decode the longest valid prefix of whole groups.
+        good = re.match(rb"(?:z|[!-u]{5})*", body[:cap]).group(0)
+        out, valid = base64.a85decode(good), False
+    _check(out, limit)
+    return out, valid and terminated
+
+
+def ascii_hex_decode(data, limit: int) -> Tuple[bytes, bool]:
+    body = bytes(data)
+    end = body.find(b">")
+    terminated = end >= 0
+    if terminated:
+        body = body[:end]
+    digits = re.sub(rb"[^0-9A-Fa-f]", b"", body)
+    if len(digits) % 2:
+        digits += b"0"
+    out = bytes.fromhex(digits[:2 * limit + 2].decode("ascii"))
+    _check(out, limit)
+    return out, terminated
+
+
+def lzw_decode(data, limit: int, early_change: int = 1) -> Tuple[bytes, bool]:
+    out = bytearray()
+    table: List[bytes] = [bytes([i]) for i in range(256)] + [b"", b""]
+    bits = 9
+    bitbuf = 0
+    nbits = 0
+    prev: Optional[bytes] = None
+    for byte in bytes(data):
+        bitbuf = (bitbuf << 8) | byte
+        nbits += 8
+        while nbits >= bits:
+            nbits -= bits
+            code = (bitbuf >> nbits) & ((1 << bits) - 1)
+            bitbuf &= (1 << nbits) - 1
+            if code == 256:
+                del table[258:]
+                bits = 9
+                prev = None
+                continue
+            if code == 257:
+                return bytes(out), True
+            if code < len(table):
+                entry = table[code]
+                if prev is not None:
+                    table.append(prev + entry[:1])
+            elif code == len(table) and prev is not None:
+                entry = prev + prev[:1]
+                table.append(entry)
+            else:
+                return bytes(out), False
+            out += entry
+            _check(out, limit)
+            prev = entry
+            if len(table) + early_change >= (1 << bits) and bits < 12:
+                bits += 1
+    return bytes(out), False
+
+
+def run_length_decode(data, limit: int) -> Tuple[bytes, bool]:
+    src = bytes(data)
+    out = bytearray()
+    i = 0
+    n = len(src)
+    while i < n:
+        length = src[i]
+        i += 1
+        if length == 128:
+            return bytes(out), True
+        if length < 128:
+            out += src[i:i + length + 1]
+            i += length + 1
+        else:
+            if i >= n:
+                break
+            out += src[i:i + 1] * (257 - length)
+            i += 1
+        _check(out, limit)
+    return bytes(out), False
+
+
+def apply_predictor(data: bytes, params: dict) -> Tuple[bytes, bool]:
+    """
+    Undo PNG (Predictor >= 10) or TIFF (Predictor 2) prediction.
+    """
+    predictor = params.get("/Predictor", 1) or 1
+    if predictor == 1:
+        return data, True
+    colors = params.get("/Colors", 1) or 1
+    bpc = params.get("/BitsPerComponent", 8) or 8
+    columns = params.get("/Columns", 1) or 1
+    bpp = max(1, colors * bpc // 8)
+    row_len = (colors * bpc * columns + 7) // 8
+
+    if predictor == 2:
+        if bpc != 8:
+            return data, False
+        out = bytearray(data)
+        for start in range(0, len(out), row_len):
+            for i in range(start + bpp, min(start + row_len, len(out))):
+                out[i] = (out[i] + out[i - bpp]) & 0xFF
+        return bytes(out), True
+
+    out = bytearray()
+    prev = bytearray(row_len)
+    stride = row_len + 1
+    complete = len(data) % stride == 0
+    for start in range(0, len(data) - stride + 1, stride):
+        ftype = data[start]
+        row = bytearray(data[start + 1:start + stride])
+        if ftype == 1:
+            for i in range(bpp, row_len):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif ftype == 2:
+            for i in range(row_len):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif ftype == 3:
+            for i in range(row_len):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:
+            for i in range(row_len):
+                a = row[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                c = prev[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                if pa <= pb and pa <= pc:
+                    pred = a
+                elif pb <= pc:
+                    pred = b
+                else:
+                    pred = c
+                row[i] = (row[i] + pred) & 0xFF
+        elif ftype != 0:
+            return bytes(out), False
+        out += row
+        prev = row
+    return bytes(out), complete
+
+
+# -- filter chains ----------------------------------------------------------
+
+def _as_list(value: Any) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def filter_chain(dictionary) -> List[Tuple[str, dict]]:
+    """
+    [(filter name, decode params)] from a stream dictionary, given either as
+    raw "<< ... >>" bytes or an already-parsed dict. Abbreviated names are expanded.
+    """
+    if isinstance(dictionary, (bytes, bytearray, memoryview)):
+        dictionary = parse_dictionary(bytes(dictionary))
+    filters = _as_list(dictionary.get("/Filter", dictionary.get("/F")))
+    parms = _as_list(dictionary.get("/DecodeParms", dictionary.get("/DP")))
+    chain = []
+    for i, name in enumerate(filters):
+        if not isinstance(name, str):
+            continue
+        p = parms[i] if i < len(parms) else None
+        chain.append((_ABBREVIATIONS.get(name, name), p if isinstance(p, dict) else {}))
+    return chain
+
+
+def decode_stream(data, dictionary, budget: Optional[DecodeBudget] = None) -> DecodeResult:
+    """
+    Apply a stream's /Filter chain (with /DecodeParms) to its raw body.
+
+    Supports FlateDecode and LZWDecode (with PNG/TIFF predictors),
+    ASCII85Decode, ASCIIHexDecode and RunLengthDecode. Image codecs end the
+    chain and their input is returned as-is. Every stage is capped by the
+    budget's per-stream and remaining per-document allowance; on corruption
+    the partial output is returned with complete=False, and on overflow the
+    output up to the limit, which is charged to the budget like any other.
+    """
+    budget = budget or DecodeBudget()
+    applied: List[str] = []
+    limit = budget.stream_limit()
+    if limit <= 0:
+        return DecodeResult(b"", applied, False, "document decode budget exhausted")
+
+    current = data
+    complete = True
+    error = None
+    try:
+        for name, parms in filter_chain(dictionary):
+            if name in PASSTHROUGH_FILTERS:
+                complete = False
+                error = f"stopped at {name}"
+                break
+            if name == "/FlateDecode":
+                current, ok = flate_decode(current, limit)
+            elif name == "/LZWDecode":
+                current, ok = lzw_decode(current, limit, parms.get("/EarlyChange", 1))
+            elif name == "/ASCII85Decode":
+                current, ok = ascii85_decode(current, limit)
+            elif name == "/ASCIIHexDecode":
+                current, ok = ascii_hex_decode(current, limit)
+            elif name == "/RunLengthDecode":
+                current, ok = run_length_decode(current, limit)
+            else:
+                complete = False
+                error = f"unsupported filter {name}"
+                break
+            if name in ("/FlateDecode", "/LZWDecode") and parms:
+                current, predicted = apply_predictor(current, parms)
+                ok = ok and predicted
+            applied.append(name)
+            if not ok:
+                complete = False
+                error = error or f"{name} data truncated or corrupt"
+    except DecodeLimitExceeded as e:
+        applied.append(name)
+        current, complete, error = e.partial, False, str(e)
+
+    current = bytes(current)
+    budget.consume(len(current))
+    return DecodeResult(current, applied, complete, error)
@@ -0,0 +1,168 @@
+# utils/stream_scanner.py
+
+import mmap
+import re
+from contextlib import closing, contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+from utils.stream_filters import DecodeBudget, DecodeResult, decode_stream
+
+# "stream" keyword followed by its mandatory EOL, but not the tail of "endstream"
+_STREAM_KW = re.compile(rb"(?<!end)stream(?:\r\n|\n|\r)")
+_LENGTH = re.compile(rb"/Length\s+(\d+)(?:\s+(\d+)\s+R)?")
+_ENDSTREAM = re.compile(rb"endstream")
+_ENDSTREAM_AFTER = re.compile(rb"\s*endstream")
+_INT_OBJECT = re.compile(rb"(?<!\d)(\d+)\s+(\d+)\s+obj\s*(\d+)\s*endobj")
+_IMAGE_SUBTYPE = re.compile(rb"/Subtype\s*/Image\b")
+
+# How far back from a "stream" keyword to look for the owning "obj" header.
+# Stream dictionaries are small; this only bounds pathological files.
+DICT_WINDOW = 64 * 1024
+
+
+class RawStream(NamedTuple):
+    offset: int          # file offset of the first data byte
+    dictionary: bytes    # raw stream dictionary, "<< ... >>"
+    data: memoryview     # stream body, a view into the scanned buffer
+    length_framed: bool  # True when /Length framed the body, False if endstream search was needed
+
+
+@contextmanager
+def open_buffer(source):
+    """
+    Yield a buffer suitable for scanning without loading the file:
+    a read-only mmap for a path, the object itself for bytes-like input.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        yield source
+        return
+    with open(source, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            yield b""
+            return
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+class _IndirectLengths:
+    """
+    Lazily-built table of small integer objects ("12 0 obj 4711 endobj"),
+    used to resolve indirect /Length entries. Built with one pass over the
+    buffer the first time an indirect length is met.
+    """
+
+    def __init__(self, buf):
+        self._buf = buf
+        self._table: Optional[Dict[Tuple[int, int], int]] = None
+
+    def get(self, num: int, gen: int) -> Optional[int]:
+        if self._table is None:
+            self._table = {
+                (int(m.group(1)), int(m.group(2))): int(m.group(3))
+                for m in _INT_OBJECT.finditer(self._buf)
+            }
+        return self._table.get((num, gen))
+
+
+def _find_dictionary(view: memoryview, kw_start: int) -> Optional[bytes]:
+    # Look back from the "stream" keyword for "N G obj << ... >>", widening
+    # the window only when the header is not close by.
+    for window in (1024, DICT_WINDOW):
+        lo = max(0, kw_start - window)
+        chunk = bytes(view[lo:kw_start])
+        obj_at = chunk.rfind(b"obj")
+        dict_at = chunk.find(b"<<", obj_at if obj_at >= 0 else 0)
+        if obj_at >= 0 and dict_at >= 0:
+            return chunk[dict_at:].rstrip()
+        if lo == 0:
+            break
+    dict_at = chunk.find(b"<<")
+    return chunk[dict_at:].rstrip() if dict_at >= 0 else None
+
+
+def _skip_eol_back(view: memoryview, end: int, start: int) -> int:
+    # Drop the EOL that precedes "endstream" when framing by search.
+    if end > start and view[end - 1] == 0x0A:
+        end -= 1
+    if end > start and view[end - 1] == 0x0D:
+        end -= 1
+    return end
+
+
+def iter_raw_streams(buf) -> Iterator[RawStream]:
+    """
+    Incrementally locate every stream in a PDF buffer (bytes, mmap, memoryview).
+
+    Streams are framed with their /Length entry (direct or indirect); the
+    "endstream" search is only used when /Length is missing or wrong.
+    Bodies are yielded as memoryview slices, so nothing is copied and only
+    one stream is live at a time. Release the views before closing an mmap.
+    """
+    view = memoryview(buf)
+    size = len(view)
+    lengths = _IndirectLengths(buf)
+    pos = 0
+    try:
+        while True:
+            m = _STREAM_KW.search(buf, pos)
+            if m is None:
+                return
+            kw_start, data_start = m.start(), m.end()
+
+            dictionary = _find_dictionary(view, kw_start)
+            if dictionary is None:
+                pos = data_start
+                continue
+
+            data_end = None
+            lm = _LENGTH.search(dictionary)
+            if lm:
+                length = int(lm.group(1))
+                if lm.group(2) is not None:
+                    length = lengths.get(length, int(lm.group(2)))
+                if length is not None and data_start + length <= size:
+                    if _ENDSTREAM_AFTER.match(buf, data_start + length):
+                        data_end = data_start + length
+
+            framed = data_end is not None
+            if not framed:
+                end_m = _ENDSTREAM.search(buf, data_start)
+                end_kw = end_m.start() if end_m else size
+                data_end = _skip_eol_back(view, end_kw, data_start)
+
+            yield RawStream(data_start, dictionary, view[data_start:data_end], framed)
+
+            end_m = _ENDSTREAM.search(buf, data_end)
+            pos = end_m.end() if end_m else size
+    finally:
+        view.release()
+
+
+def iter_decoded_streams(
+    source,
+    budget: Optional[DecodeBudget] = None,
+    skip_images: bool = True,
+) -> Iterator[Tuple[RawStream, DecodeResult]]:
+    """
+    Yield (stream, DecodeResult) for every stream whose filter chain decodes
+    to something, one at a time. source may be a path (scanned through mmap)
+    or bytes-like. All streams of the document share one DecodeBudget, so a
+    decompression bomb cannot push the total output past its cap.
+    """
+    budget = budget or DecodeBudget()
+    with open_buffer(source) as buf, closing(iter_raw_streams(buf)) as streams:
+        for stream in streams:
+            try:
+                if skip_images and _IMAGE_SUBTYPE.search(stream.dictionary):
+                    continue
+                if budget.exhausted:
+                    return
+                result = decode_stream(stream.data, stream.dictionary, budget)
+            finally:
+                stream.data.release()
+            if result.data and (result.complete or result.filters):
+                yield stream, result
@@ -0,0 +1,317 @@
+# utils/summary_service.py
+
+import abc
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a forensic PDF analyst."
+
+# Backend used by get_summary_service(): "openai" or "stub".
+BACKEND_ENV = "ACROINFORMER_SUMMARY_BACKEND"
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def build_prompt(entities, metadata=None, suppression_flags=None) -> str:
+    """
+    The forensic summary prompt for one document.
+    """
+    # Offsets only mean something next to the decoded text, which is not sent.
+    prompt_entities = {k: v for k, v in entities.items() if k != "spans"}
+
+    return f"""
+You are a forensic document auditor. A PDF has been decoded using multiple methods including CID font extraction, ASCII85 decoding, and OCR. Here are the decoded entities and indicators:
+
+Entities:
+{prompt_entities}
+
+Metadata:
+{metadata if metadata else 'None'}
+
+Suppression Flags:
+{suppression_flags if suppression_flags else 'None'}
+
+Please provide a forensic summary of this document, including:
+- Possible obfuscation methods
+- Roles of named entities (grantor, grantee, intermediary)
+- Potential real transaction value vs symbolic/fake values
+- Routing anomalies or foreign involvement
+- If registry keys imply suppressed individuals
+
+Output as a structured fraud_summary dict.
+"""
+
+
+def prompt_hash(backend_id: str, prompt: str) -> str:
+    h = hashlib.sha256(backend_id.encode())
+    h.update(b"\0")
+    h.update(prompt.encode("utf-8"))
+    return h.hexdigest()
+
+
+class SummaryBackend(abc.ABC):
+    """
+    Interface for LLM backends. `identity` goes into the cache key, so it
+    must change whenever the same prompt could produce a different answer
+    (model, temperature, ...).
+    """
+
+    identity = "base"
+
+    @abc.abstractmethod
+    async def complete(self, system: str, prompt: str) -> str:
+        ...
+
+    def is_transient(self, error: Exception) -> bool:
+        """
+        Whether a failed complete() is worth retrying (timeouts, dropped
+        connections); anything else fails the request at once.
+        """
+        return isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError))
+
+
+class OpenAIBackend(SummaryBackend):
+    def __init__(self, model: str = "gpt-4", temperature: float = 0.2, max_tokens: int = 512):
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.identity = f"openai:{model}:{temperature}:{max_tokens}"
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # Retries are handled by SummaryService.
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        return self._client
+
+    def is_transient(self, error: Exception) -> bool:
+        if super().is_transient(error):
+            return True
+        try:
+            from openai import APIConnectionError
+        except ImportError:
+            return False
+        # rate limits, conflicts, request timeouts and server errors
+        status = getattr(error, "status_code", None) or 0
+        return isinstance(error, APIConnectionError) or status in (408, 409, 429) or status >= 500
+
+    async def complete(self, system: str, prompt: str) -> str:
+        response = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        return response.choices[0].message.content
+
+
+class StubBackend(SummaryBackend):
+    """
+    Deterministic offline backend for tests and benchmarks: the same prompt
+    always gives the same summary. latency simulates a network round-trip.
+    """
+
+    identity = "stub"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def complete(self, system: str, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return f"[stub summary {digest}] {len(prompt)} prompt chars reviewed."
+
+
+class _MemoryCache:
+    """
+    Small in-process LRU with the same get/put interface as ResultCache.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SummaryService:
+    """
+    Async LLM summary client.
+
+    - at most max_concurrency requests are in flight per event loop (one
+      asyncio.Semaphore per loop, kept for the loop's lifetime);
+    - responses are cached by a hash of backend identity + prompt, in memory
+      or in any object with get/put (e.g. a ResultCache for persistence).
+      The cache is checked again once a request holds the semaphore, so
+      identical prompts queued behind one another reach the backend once;
+    - each request gets `timeout` seconds and up to `retries` retries with
+      exponential backoff and jitter, for errors the backend calls
+      transient.
+
+    Results have the same shape as before: {"fraud_summary": text} or
+    {"error": message}.
+    """
+
+    def __init__(
+        self,
+        backend: SummaryBackend,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache=None,
+        retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 60.0,
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else _MemoryCache()
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._semaphores_lock = threading.Lock()
+        self.counters = {"requests": 0, "cache_hits": 0, "backend_calls": 0, "retries": 0, "failures": 0}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per event loop (asyncio.run() creates a fresh loop each
+        # time, and a batch's summary queue runs its own); loops may run side
+        # by side in different threads, so none replaces another's.
+        loop = asyncio.get_running_loop()
+        with self._semaphores_lock:
+            sem = self._semaphores.get(loop)
+            if sem is None:
+                sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    async def _call(self, key: str, prompt: str) -> Tuple[str, bool]:
+        # (content, served from cache)
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore():
+                    # an identical prompt may have finished while this one waited
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        return cached, True
+                    self.counters["backend_calls"] += 1
+                    content = await asyncio.wait_for(self.backend.complete(SYSTEM_PROMPT, prompt), self.timeout)
+                    content = (content or "").strip()
+                    self.cache.put(key, content)
+                    return content, False
+            except Exception as e:
+                if attempt >= self.retries or not self.backend.is_transient(e):
+                    raise
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                self.counters["retries"] += 1
+                logger.debug("Summary attempt %d failed (%s); retrying in %.1fs", attempt, e, delay)
+                await asyncio.sleep(delay)
+
+    async def summarize(self, entities, metadata=None, suppression_flags=None) -> Dict[str, Any]:
+        self.counters["requests"] += 1
+        prompt = build_prompt(entities, metadata, suppression_flags)
+        key = prompt_hash(self.backend.identity, prompt)
+        content = self.cache.get(key)
+        hit = content is not None
+        if not hit:
+            try:
+                content, hit = await self._call(key, prompt)
+            except Exception as e:
+                self.counters["failures"] += 1
+                return {"error": str(e) or type(e).__name__}
+        if hit:
+            self.counters["cache_hits"] += 1
+        return {"fraud_summary": content}
+
+    async def summarize_many(self, requests: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Summaries for many documents concurrently, in input order. Each request
+        is a dict of summarize() keyword arguments (entities, metadata,
+        suppression_flags).
+        """
+        return await asyncio.gather(*(self.summarize(**r) for r in requests))
+
+    def summarize_sync(self, entities, metadata=None, suppression_flags=None) -> Dict[str, Any]:
+        return run_sync(self.summarize(entities, metadata, suppression_flags))
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code, also when the
+    calling thread already has an event loop running.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    result = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+_service: Optional[SummaryService] = None
+_service_lock = threading.Lock()
+
+
+def get_summary_service() -> SummaryService:
+    """
+    Process-wide service; the backend comes from ACROINFORMER_SUMMARY_BACKEND
+    ("openai" by default, "stub" for offline runs).
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            name = os.getenv(BACKEND_ENV, "openai").lower()
+            backend = StubBackend() if name == "stub" else OpenAIBackend()
+            _service = SummaryService(backend)
+        return _service
+
+
+def set_summary_service(service: Optional[SummaryService]) -> None:
+    global _service
+    with _service_lock:
+        _service = service
@@ -2,6 +2,12 @@
 
 import hashlib
 import os
+import re
+
+from utils.stream_filters import MAX_STREAM_OUTPUT, ascii85_decode
+
+_ASCII85_BODY = re.compile(rb"(?:[!-u]|z|\s)+")
+_ASCII85_FRAGMENT = re.compile(rb"<~((?:[!-u]|z|\s)+)~>")
 
 def compute_sha256(file_path):
     sha256_hash = hashlib.sha256()
@@ -11,7 +17,30 @@ def compute_sha256(file_path):
     return sha256_hash.hexdigest()
 
 def is_ascii85_encoded(stream_bytes):
-    return b"~>" in stream_bytes and b"<~" in stream_bytes
+    """
+    True when the data is an ASCII85 body (optionally <~ ~> framed, ending
+    in ~> as ASCII85Decode streams do) or embeds a well-formed <~ ... ~> run.
+    """
+    data = bytes(stream_bytes).strip()
+    if data.startswith(b"<~"):
+        data = data[2:]
+    if data.endswith(b"~>") and _ASCII85_BODY.fullmatch(data[:-2]):
+        return True
+    return _ASCII85_FRAGMENT.search(bytes(stream_bytes)) is not None
+
+def find_ascii85_fragments(data):
+    """
+    Decoded payloads of every well-formed <~ ... ~> run embedded in data.
+    """
+    fragments = []
+    for match in _ASCII85_FRAGMENT.finditer(bytes(data)):
+        try:
+            decoded, _ = ascii85_decode(match.group(1), MAX_STREAM_OUTPUT)
+        except Exception:
+            continue
+        if decoded:
+            fragments.append(decoded)
+    return fragments
 
 def file_size_in_kb(file_path):
     return round(os.path.getsize(file_path) / 1024, 2)
@@ -0,0 +1,322 @@
+# utils/xref_index.py
+
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.pdf_objects import parse_object
+from utils.stream_filters import DecodeBudget, decode_stream
+
+# Cross-reference reader working on the raw file buffer (bytes or mmap).
+# Starting from the last startxref it follows the /Prev chain backwards,
+# reading each classic xref table or xref stream into compact arrays;
+# objects themselves are never parsed.
+
+FREE, IN_USE, COMPRESSED = 0, 1, 2
+
+# How far from a recorded offset to look for a section that has drifted
+# (e.g. after an editor rewrote line endings).
+OFFSET_SLACK = 64
+
+# Subsections shorter than this (typical of incremental saves, which list
+# a handful of single-object runs) are parsed row by row; NumPy's per-call
+# overhead only pays off for longer runs.
+VECTOR_MIN_ROWS = 16
+
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_EOF = re.compile(rb"%%EOF[ \t]*(?:\r\n|\r|\n)?")
+_SUBSECTION = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*(?:\r\n|\r|\n)")
+_ENTRY = re.compile(rb"\s*(\d{1,10})\s+(\d{1,5})\s+([nf])")
+_TRAILER = re.compile(rb"\s*trailer")
+_OBJ_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_STREAM_KW = re.compile(rb"\s*stream(?:\r\n|\r|\n)")
+_XREF_KW = re.compile(rb"(?<![A-Za-z])xref\s")
+_XREF_STREAM = re.compile(rb"(\d+)\s+(\d+)\s+obj\s*<<[^>]{0,512}?/Type\s*/XRef\b")
+# Literal-led forms of the two patterns above for whole-file scans; a
+# lookbehind or leading \d+ defeats the regex engine's prefix search.
+_XREF_LINE = re.compile(rb"xref\s")
+_XREF_TYPE = re.compile(rb"/Type\s*/XRef\b")
+
+_POW10 = 10 ** np.arange(9, -1, -1, dtype=np.int64)
+_POW10_GEN = 10 ** np.arange(4, -1, -1, dtype=np.int64)
+
+
+class XrefSection:
+    """
+    One cross-reference section (a classic table or an xref stream).
+
+    Entries are parallel arrays: nums (object numbers), types (FREE,
+    IN_USE, COMPRESSED), fields (byte offset for IN_USE, containing object
+    stream for COMPRESSED, next free object for FREE) and gens (generation,
+    or index inside the object stream for COMPRESSED).
+    """
+
+    __slots__ = ("offset", "kind", "trailer", "nums", "types", "fields", "gens")
+
+    def __init__(self, offset: int, kind: str, trailer: dict, nums, types, fields, gens):
+        self.offset = offset
+        self.kind = kind
+        self.trailer = trailer
+        self.nums = nums
+        self.types = types
+        self.fields = fields
+        self.gens = gens
+
+    @property
+    def prev(self) -> Optional[int]:
+        prev = self.trailer.get("/Prev")
+        return prev if isinstance(prev, int) else None
+
+    def __len__(self) -> int:
+        return len(self.nums)
+
+
+class XrefChain:
+    """
+    Every xref section of a file, newest first as reached through /Prev.
+    recovered is True when the chain could not be followed and sections
+    were found by scanning the file instead.
+    """
+
+    def __init__(self, sections: List[XrefSection], startxref: Optional[int], eof_offsets: List[int],
+                 errors: List[str], recovered: bool = False):
+        self.sections = sections
+        self.startxref = startxref
+        self.eof_offsets = eof_offsets
+        self.errors = errors
+        self.recovered = recovered
+
+    @property
+    def trailer(self) -> dict:
+        return self.sections[0].trailer if self.sections else {}
+
+
+def _empty_arrays():
+    return (np.empty(0, np.int64), np.empty(0, np.uint8), np.empty(0, np.int64), np.empty(0, np.int64))
+
+
+def _concat(parts):
+    if not parts:
+        return _empty_arrays()
+    return tuple(np.concatenate([p[k] for p in parts]) for k in range(4))
+
+
+def _table_rows(buf, pos: int, start: int, count: int):
+    # Fast path: well-formed 20-byte rows, decoded column-wise in NumPy.
+    raw = buf[pos:pos + 20 * count] if count >= VECTOR_MIN_ROWS else b""
+    if len(raw) == 20 * count and count:
+        rows = np.frombuffer(raw, dtype=np.uint8).reshape(count, 20)
+        kinds = rows[:, 17]
+        digits = rows[:, :10].astype(np.int64) - 48
+        gen_digits = rows[:, 11:16].astype(np.int64) - 48
+        if (
+            np.all((kinds == ord("n")) | (kinds == ord("f")))
+            and np.all((digits >= 0) & (digits <= 9))
+            and np.all((gen_digits >= 0) & (gen_digits <= 9))
+            and np.all(rows[:, 10] == 32) and np.all(rows[:, 16] == 32)
+        ):
+            return (
+                np.arange(start, start + count, dtype=np.int64),
+                np.where(kinds == ord("n"), IN_USE, FREE).astype(np.uint8),
+                digits @ _POW10,
+                gen_digits @ _POW10_GEN,
+            ), pos + 20 * count
+    # Tolerant path for odd spacing or line endings.
+    nums, types, fields, gens = [], [], [], []
+    for i in range(count):
+        m = _ENTRY.match(buf, pos)
+        if m is None:
+            break
+        nums.append(start + i)
+        types.append(IN_USE if m.group(3) == b"n" else FREE)
+        fields.append(int(m.group(1)))
+        gens.append(int(m.group(2)))
+        pos = m.end()
+    arrays = (np.array(nums, np.int64), np.array(types, np.uint8), np.array(fields, np.int64), np.array(gens, np.int64))
+    return arrays, pos
+
+
+def _read_table(buf, offset: int) -> XrefSection:
+    pos = offset + 4  # past "xref"
+    parts = []
+    while True:
+        if _TRAILER.match(buf, pos):
+            break
+        m = _SUBSECTION.match(buf, pos)
+        if m is None:
+            raise ValueError(f"malformed xref table at {offset}")
+        arrays, pos = _table_rows(buf, m.end(), int(m.group(1)), int(m.group(2)))
+        parts.append(arrays)
+    trailer_at = _TRAILER.match(buf, pos).end()
+    trailer, _ = parse_object(buf, trailer_at)
+    if not isinstance(trailer, dict):
+        raise ValueError(f"xref table at {offset} has no trailer dictionary")
+    return XrefSection(offset, "table", trailer, *_concat(parts))
+
+
+def _read_stream(buf, offset: int, budget: DecodeBudget) -> XrefSection:
+    header = _OBJ_HEADER.match(buf, offset)
+    if header is None:
+        raise ValueError(f"no xref stream object at {offset}")
+    dictionary, pos = parse_object(buf, header.end())
+    if not isinstance(dictionary, dict) or dictionary.get("/Type") != "/XRef":
+        raise ValueError(f"object at {offset} is not an xref stream")
+    kw = _STREAM_KW.match(buf, pos)
+    length = dictionary.get("/Length")
+    if kw is None or not isinstance(length, int):
+        raise ValueError(f"xref stream at {offset} is not /Length-framed")
+    body = memoryview(buf)[kw.end():kw.end() + length]
+    try:
+        decoded = decode_stream(body, dictionary, budget)
+    finally:
+        body.release()
+    if not decoded.complete:
+        raise ValueError(f"xref stream at {offset} failed to decode: {decoded.error}")
+
+    widths = [int(w) for w in dictionary.get("/W", [])]
+    if len(widths) != 3 or sum(widths) == 0:
+        raise ValueError(f"xref stream at {offset} has invalid /W {widths}")
+    row = sum(widths)
+    index = dictionary.get("/Index") or [0, dictionary.get("/Size", 0)]
+    total = sum(int(c) for c in index[1::2])
+    total = min(total, len(decoded.data) // row)
+    table = np.frombuffer(decoded.data, dtype=np.uint8)[:total * row].reshape(total, row).astype(np.int64)
+
+    columns = []
+    col = 0
+    for w in widths:
+        value = np.zeros(total, np.int64)
+        for k in range(w):
+            value = (value << 8) | table[:, col + k]
+        columns.append(value)
+        col += w
+    types = columns[0].astype(np.uint8) if widths[0] else np.full(total, IN_USE, np.uint8)
+
+    nums = np.empty(total, np.int64)
+    filled = 0
+    for start, count in zip(index[0::2], index[1::2]):
+        count = min(int(count), total - filled)
+        nums[filled:filled + count] = np.arange(int(start), int(start) + count)
+        filled += count
+    return XrefSection(offset, "stream", dictionary, nums[:filled], types[:filled], columns[1][:filled], columns[2][:filled])
+
+
+def _section_at(buf, offset: int, budget: DecodeBudget) -> Tuple[XrefSection, int]:
+    # Read the section at offset, tolerating a small drift.
+    # Returns (section, actual offset).
+    if 0 <= offset < len(buf):
+        if buf[offset:offset + 4] == b"xref":
+            return _read_table(buf, offset), offset
+        if _OBJ_HEADER.match(buf, offset):
+            return _read_stream(buf, offset, budget), offset
+    lo, hi = max(0, offset - OFFSET_SLACK), min(len(buf), offset + OFFSET_SLACK)
+    window = buf[lo:hi]
+    candidates = [m.start() + lo for m in _XREF_KW.finditer(window)]
+    candidates += [m.start() + lo for m in _OBJ_HEADER.finditer(window)]
+    for found in sorted(candidates, key=lambda p: abs(p - offset)):
+        try:
+            if buf[found:found + 4] == b"xref":
+                return _read_table(buf, found), found
+            return _read_stream(buf, found, budget), found
+        except ValueError:
+            continue
+    raise ValueError(f"no xref section at offset {offset}")
+
+
+def _scan_sections(buf, budget: DecodeBudget) -> List[XrefSection]:
+    # Last resort: every xref table and xref stream in file order, newest last.
+    found = []
+    for m in _XREF_LINE.finditer(buf):
+        line_start = m.start() == 0 or buf[m.start() - 1:m.start()] in (b"\n", b"\r")
+        if not line_start:
+            continue
+        try:
+            found.append(_read_table(buf, m.start()))
+        except ValueError:
+            continue
+    for m in _XREF_TYPE.finditer(buf):
+        headers = list(_OBJ_HEADER.finditer(buf, max(0, m.start() - 600), m.start()))
+        if not headers or not _XREF_STREAM.match(buf, headers[-1].start()):
+            continue
+        try:
+            found.append(_read_stream(buf, headers[-1].start(), budget))
+        except ValueError:
+            continue
+    found.sort(key=lambda s: s.offset, reverse=True)
+    return found
+
+
+def eof_offsets(buf) -> List[int]:
+    """
+    End offsets (after the EOL) of every %%EOF marker in the file.
+    """
+    return [m.end() for m in _EOF.finditer(buf)]
+
+
+def read_xref_chain(buf, max_sections: int = 100000, budget: Optional[DecodeBudget] = None) -> XrefChain:
+    """
+    Index every xref section of buf by one backward walk from the final
+    startxref through /Prev (and the /XRefStm of hybrid files). Falls back
+    to scanning the whole file for sections when the chain is broken.
+    Xref streams are decoded against budget, the document's DecodeBudget
+    (a fresh one if None).
+    """
+    budget = budget or DecodeBudget()
+    errors: List[str] = []
+    tail_from = max(0, len(buf) - 4096)
+    matches = list(_STARTXREF.finditer(buf, tail_from))
+    if not matches:
+        matches = list(_STARTXREF.finditer(buf))
+    startxref = int(matches[-1].group(1)) if matches else None
+
+    sections: List[XrefSection] = []
+    seen = set()
+    offset = startxref
+    while offset is not None and len(sections) < max_sections:
+        if offset in seen:
+            errors.append(f"xref /Prev loop at offset {offset}")
+            break
+        seen.add(offset)
+        try:
+            section, actual = _section_at(buf, offset, budget)
+        except ValueError as e:
+            errors.append(str(e))
+            break
+        if actual != offset:
+            errors.append(f"xref section recorded at {offset} found at {actual}")
+        stm = section.trailer.get("/XRefStm")
+        if section.kind == "table" and isinstance(stm, int):
+            try:
+                hidden, _ = _section_at(buf, stm, budget)
+                section = _merge_hybrid(section, hidden)
+            except ValueError as e:
+                errors.append(f"hybrid /XRefStm: {e}")
+        sections.append(section)
+        offset = section.prev
+
+    if startxref is None or (errors and not sections):
+        if startxref is None:
+            errors.append("no startxref")
+        scanned = _scan_sections(buf, budget)
+        if scanned:
+            return XrefChain(scanned, startxref, eof_offsets(buf), errors, recovered=True)
+    return XrefChain(sections, startxref, eof_offsets(buf), errors)
+
+
+def _merge_hybrid(table: XrefSection, stream: XrefSection) -> XrefSection:
+    # Hybrid-reference files list objects hidden from pre-1.5 readers
+    # (usually compressed ones) in the /XRefStm stream; they replace the
+    # table's free entries and fill in missing ones.
+    overridden = (table.types == FREE) & np.isin(table.nums, stream.nums)
+    keep = ~overridden
+    take = ~np.isin(stream.nums, table.nums[keep])
+    if not take.any():
+        return table
+    return XrefSection(
+        table.offset, "hybrid", table.trailer,
+        np.concatenate([table.nums[keep], stream.nums[take]]),
+        np.concatenate([table.types[keep], stream.types[take]]),
+        np.concatenate([table.fields[keep], stream.fields[take]]),
+        np.concatenate([table.gens[keep], stream.gens[take]]),
+    )
@@ -1,20 +1,53 @@
 # zip_bundle.py
 
 import io
-import zipfile
 import json
-from affidavit_writer import generate_affidavit_pdf
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from affidavit_writer import write_affidavit
+from bundle_writer import BundleWriter, iter_bundle
+
+def forensic_output_entries(result: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    """
+    The (name, data) entries of one document's forensic outputs.
+    """
+    base = result["filename"].replace(".pdf", "")
+    yield f"{base}_metadata.json", json.dumps(result["metadata"], indent=2)
+    yield f"{base}_entities.json", json.dumps(result["entities"], indent=2)
+    yield f"{base}_summary.md", result["summary"]
+    yield f"{base}_suppression.json", json.dumps(result["suppression_flags"], indent=2)
+    yield f"{base}_license.json", json.dumps(result["license_flags"], indent=2)
+    affidavit = io.BytesIO()
+    write_affidavit(
+        output_path=affidavit,
+        metadata=result["metadata"],
+        filename=result["filename"],
+        sha256=result.get("sha256"),
+        findings=result.get("fraud_flags", []),
+    )
+    yield f"{base}_affidavit.pdf", affidavit.getbuffer()
+
+def _entries(results: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    for result in results:
+        yield from forensic_output_entries(result)
+
+def write_forensic_outputs(results: Iterable[Dict[str, Any]], target, **options) -> None:
+    """
+    Stream every result's outputs into a ZIP at target (path or binary file)
+    as the results are produced; options are passed to BundleWriter.
+    """
+    with BundleWriter(target, **options) as writer:
+        for name, data in _entries(results):
+            writer.add(name, data)
+
+def iter_forensic_outputs(results: Iterable[Dict[str, Any]], **options) -> Iterator[bytes]:
+    """
+    The same ZIP as write_forensic_outputs, as a generator of byte chunks
+    for a streamed download.
+    """
+    return iter_bundle(_entries(results), **options)
 
 def bundle_forensic_outputs(results):
     zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w") as zipf:
-        for result in results:
-            base = result["filename"].replace(".pdf", "")
-            zipf.writestr(f"{base}_metadata.json", json.dumps(result["metadata"], indent=2))
-            zipf.writestr(f"{base}_entities.json", json.dumps(result["entities"], indent=2))
-            zipf.writestr(f"{base}_summary.md", result["summary"])
-            zipf.writestr(f"{base}_suppression.json", json.dumps(result["suppression_flags"], indent=2))
-            zipf.writestr(f"{base}_license.json", json.dumps(result["license_flags"], indent=2))
-            zipf.writestr(f"{base}_affidavit.pdf", generate_affidavit_pdf(result))
-    zip_buffer.seek(0)
-    return zip_buffer.read()
\ No newline at end of file
+    write_forensic_outputs(results, zip_buffer)
+    return zip_buffer.getvalue()
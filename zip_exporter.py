@@ -1,16 +1,33 @@
-import io, zipfile, yaml
-from .metadata import extract_metadata
+import io, os, yaml
+from bundle_writer import BundleWriter
+from utils.metadata import extract_metadata
+from utils.parsed_pdf import ParsedPdf, as_parsed_pdf
+
+def write_forensic_package(files: list, target, **options) -> None:
+    """
+    Stream each upload (or open binary file / path) and a YAML of its
+    metadata into a ZIP at target. Each PDF is parsed and archived from the
+    same view, stored without recompression, and released once written.
+    """
+    with BundleWriter(target, **options) as writer:
+        for uf in files:
+            pdf = as_parsed_pdf(uf)
+            release = None if isinstance(uf, ParsedPdf) else pdf.close
+            try:
+                name = os.path.basename(pdf.file_path or "document.pdf")
+                md = extract_metadata(pdf)
+            except Exception:
+                if release is not None:
+                    release()
+                raise
+            writer.add(f"pdfs/{name}", pdf.view, release=release)
+            writer.add(f"metadata/{name}.yaml", yaml.safe_dump(md))
 
 def build_forensic_package(files: list) -> bytes:
     """
-    Given a list of Streamlit-UploadedFiles, returns a ZIP (bytes)
-    containing each PDF plus a YAML of its metadata.
+    Given a list of Streamlit-UploadedFiles (or any open binary files / paths),
+    returns a ZIP (bytes) containing each PDF plus a YAML of its metadata.
     """
     mem = io.BytesIO()
-    with zipfile.ZipFile(mem, mode="w") as z:
-        for uf in files:
-            path, b = uf.name, uf.read()
-            z.writestr(f"pdfs/{uf.name}", b)
-            md = extract_metadata(path, b)
-            z.writestr(f"metadata/{uf.name}.yaml", yaml.safe_dump(md))
-    return mem.getvalue()
\ No newline at end of file
+    write_forensic_package(files, mem)
+    return mem.getvalue()